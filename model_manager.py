@@ -44,13 +44,19 @@ def normalize_model_path(value: Any) -> str:
     return os.path.abspath(expanded)
 
 
-def default_model_path() -> str:
+def _local_app_data() -> Path:
     local_app_data = os.environ.get("LOCALAPPDATA", "").strip()
     if local_app_data:
-        base = Path(local_app_data)
-    else:
-        base = Path.home() / "AppData" / "Local"
-    return str(base / "AlicianDictionary" / "Models" / "text2vec-base-chinese")
+        return Path(local_app_data)
+    return Path.home() / "AppData" / "Local"
+
+
+def default_model_path() -> str:
+    return str(_local_app_data() / "AlicianDictionary" / "Models" / "text2vec-base-chinese")
+
+
+def default_embedding_cache_path() -> str:
+    return str(_local_app_data() / "AlicianDictionary" / "Cache" / "text2vec-embeddings")
 
 
 def get_registered_model_path() -> str:
@@ -30,7 +30,7 @@ def main() -> None:
                             continue
                         entry = selected.get(index) or service._best_word_entry(part)
                         if entry:
-                            families.append(service._pos_family(entry["word_class"]))
+                            families.append(service._pos_family(entry.word_class))
                     core = [family for family in families if family in {"n", "pron", "v"}]
                     if core.count("v") != 1 or sum(family in {"n", "pron"} for family in core) < 2:
                         continue
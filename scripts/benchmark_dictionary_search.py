@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import argparse
+import random
+import sqlite3
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from webui_backend.dictionary_core import DatabaseHandler
+
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DB = ROOT / "translated.db"
+
+
+def _sample_queries(handler: DatabaseHandler, count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    words = [str(word) for word, _ in handler.get_all_words() if word]
+    queries = rng.sample(words, min(count, len(words)))
+    # Short fragments hit many rows, which is where the per-row stats lookups hurt.
+    queries += [word[:3] for word in rng.sample(words, min(count, len(words)))]
+    return queries
+
+
+def _per_row_stats(handler: DatabaseHandler, query: str, exact: bool) -> int:
+    alice_rows, chinese_rows = handler.search_words(query, exact)
+    statements = 2
+    for word, _, _ in alice_rows + chinese_rows:
+        handler.get_word_stats(word, exact)
+        statements += 1
+    return statements
+
+
+def _joined_stats(handler: DatabaseHandler, query: str, exact: bool) -> int:
+    handler.search_entries(query, exact)
+    return 2
+
+
+def _measure(
+    name: str, handler: DatabaseHandler, queries: List[str], exact: bool, rounds: int,
+    search: Callable[[DatabaseHandler, str, bool], int],
+) -> float:
+    statements = 0
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for query in queries:
+            statements += search(handler, query, exact)
+    elapsed = time.perf_counter() - started
+    calls = rounds * len(queries)
+    per_call = elapsed / calls * 1000
+    print(f"  {name:<18} {per_call:8.3f} ms/search  {statements / calls:5.1f} statements/search")
+    return per_call
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare per-row stats queries with search_entries.")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    handler = DatabaseHandler(str(args.db))
+    if not handler.connect():
+        raise SystemExit(handler.last_error)
+    try:
+        queries = _sample_queries(handler, args.queries, args.seed)
+        handler.search_entries(queries[0], False)  # build the temp search index up front
+        for exact in (True, False):
+            print(f"exact={exact} ({len(queries)} queries x {args.rounds} rounds)")
+            before = _measure("search + stats", handler, queries, exact, args.rounds, _per_row_stats)
+            after = _measure("search_entries", handler, queries, exact, args.rounds, _joined_stats)
+            print(f"  speedup            {before / after:8.2f}x")
+    except sqlite3.Error as exc:
+        raise SystemExit(f"benchmark failed: {exc}")
+    finally:
+        handler.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from webui_backend import similarity_matcher
+from webui_backend.similarity_matcher import STORAGE_MODES, SemanticEngine, SimilarityMatcher
+
+
+class _TableModel:
+    """Stands in for text2vec: "e<i>" and "q<i>" map to fixed random vectors."""
+
+    def __init__(self, rows: int, queries: int, dimension: int, spread: float, seed: int) -> None:
+        rng = np.random.default_rng(seed)
+        # Clustered data, closer to real sentence embeddings than uniform noise.
+        centers = rng.normal(size=(max(8, rows // 50), dimension))
+        self.entries = centers[rng.integers(len(centers), size=rows)] + spread * rng.normal(size=(rows, dimension))
+        self.queries = centers[rng.integers(len(centers), size=queries)] + spread * rng.normal(size=(queries, dimension))
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return np.stack([
+            (self.entries if text[0] == "e" else self.queries)[int(text[1:])] for text in texts
+        ])
+
+
+def _sentences(db_path: Path) -> List[str]:
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        rows = conn.execute(
+            "SELECT chinese_translation FROM sentence_alignments WHERE chinese_translation <> '' ORDER BY id"
+        ).fetchall()
+    finally:
+        conn.close()
+    return list(dict.fromkeys(str(text).strip() for text, in rows if str(text).strip()))
+
+
+def _median_ms(func: Callable[[int], object], count: int) -> float:
+    timings = []
+    for index in range(count):
+        started = time.perf_counter()
+        func(index)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare SimilarityMatcher storage and search modes on synthetic embeddings, "
+        "or with --db on text2vec embeddings of sentence_alignments.chinese_translation."
+    )
+    parser.add_argument("--db", type=Path, help="use real sentences from this database; needs text2vec")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=8)
+    parser.add_argument("--spread", type=float, default=1.0, help="noise around each cluster centre")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--storage", choices=STORAGE_MODES, nargs="+", default=list(STORAGE_MODES))
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32])
+    args = parser.parse_args()
+
+    # The matcher reaches numpy through text2vec's optional import; wire it
+    # directly. The extra client keeps the model loaded between matchers.
+    similarity_matcher._NP = np
+    engine = similarity_matcher._ENGINE = SemanticEngine()
+    engine.attach()
+    if args.db is None:
+        engine._model = _TableModel(args.rows, args.queries, args.dimension, args.spread, args.seed)
+        texts = [f"e{index}" for index in range(args.rows)]
+        queries = [f"q{index}" for index in range(args.queries)]
+        cache_dir: Optional[str] = ""
+    else:
+        if not engine.ensure_model():
+            print("text2vec 模型不可用，无法测量真实向量。")
+            sys.exit(1)
+        sentences = _sentences(args.db)
+        # Held-out sentences are the queries; the rest are indexed.
+        held_out = set(np.random.default_rng(args.seed).choice(
+            len(sentences), min(args.queries, len(sentences) // 5), replace=False
+        ).tolist())
+        texts = [text for index, text in enumerate(sentences) if index not in held_out]
+        queries = [text for index, text in enumerate(sentences) if index in held_out]
+        # Sentence rows are cached apart from the app's word explanations.
+        cache_dir = None
+        if len(texts) < similarity_matcher._IVF_MIN_ROWS:
+            print(f"only {len(texts)} sentences; IVF enabled below its usual {similarity_matcher._IVF_MIN_ROWS} rows")
+            similarity_matcher._IVF_MIN_ROWS = 0
+    args.rows, args.queries = len(texts), len(queries)
+    pairs = [(f"w{index}", text) for index, text in enumerate(texts)]
+    query_vectors = engine.encode(queries)
+    args.dimension = query_vectors.shape[1]
+
+    baseline = np.asarray(engine.encode(texts), dtype=float)
+
+    def old_search(index: int) -> object:
+        scores = np.clip(np.dot(query_vectors[index:index + 1].astype(float), baseline.T)[0], -1.0, 1.0)
+        return np.argsort(scores)[-args.top_k:][::-1]
+
+    expected = [set(old_search(index).tolist()) for index in range(args.queries)]
+    print(f"{args.rows} rows x {args.dimension} dims, {args.queries} queries, top {args.top_k}")
+    baseline_ms = _median_ms(old_search, args.queries)
+    print(f"  {'float64 argsort':<16} {baseline.nbytes / 1024 / 1024:8.2f} MiB  {baseline_ms:7.3f} ms/query")
+
+    words = {f"w{row}": row for row in range(args.rows)}
+
+    def report(name: str, matcher: SimilarityMatcher, index_bytes: int, nprobe: Optional[int] = None) -> None:
+        def search(index: int) -> object:
+            return matcher.find_similar(queries[index], top_k=args.top_k, nprobe=nprobe)
+
+        latency = _median_ms(search, args.queries)
+        hits = []
+        for index in range(args.queries):
+            found = {words[item["words"][0]] for item in search(index)}
+            hits.append(len(found & expected[index]) / args.top_k)
+        print(
+            f"  {name:<16} {index_bytes / 1024 / 1024:8.2f} MiB  {latency:7.3f} ms/query"
+            f" ({latency / baseline_ms:5.2f}x argsort)  recall@{args.top_k} {statistics.mean(hits):.3f}"
+        )
+
+    for storage in args.storage:
+        matcher = SimilarityMatcher(cache_dir, namespace="benchmark-sentences")
+        matcher.build_index(pairs, storage=storage)
+        report(storage, matcher, engine.index(matcher._state.index_key).data.nbytes)
+        matcher.close()
+
+    for storage in args.storage:
+        matcher = SimilarityMatcher(cache_dir, namespace="benchmark-sentences")
+        started = time.perf_counter()
+        matcher.build_index(pairs, storage=storage, search="ivf")
+        ivf = matcher._state.ivf
+        if ivf is None:
+            print(f"  ivf needs at least {similarity_matcher._IVF_MIN_ROWS} rows")
+            break
+        print(f"  ivf/{storage}: {len(ivf.centroids)} lists, trained in {time.perf_counter() - started:.2f} s")
+        for nprobe in args.nprobe:
+            report(f"  nprobe {nprobe}", matcher, engine.index(matcher._state.index_key).data.nbytes + ivf.nbytes, nprobe)
+        matcher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from webui_backend.translation_service import TranslationService
+
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DB = ROOT / "translated.db"
+
+
+def _add_shared_glosses(db_path: str, count: int, seed: int) -> None:
+    """Append synthetic senses that reuse a few glosses, the worst case for term buckets."""
+    rng = random.Random(seed)
+    glosses = ["光", "爱", "世界", "天空", "歌声，旋律", "梦"]
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executemany(
+            "INSERT INTO dictionary (headword_id, words, explanation, class, sense_order) VALUES (0, ?, ?, 'n.', 1)",
+            [(f"Synth{index}", rng.choice(glosses)) for index in range(count)],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _measure(name: str, rounds: int, build: Callable[[], TranslationService]) -> Tuple[float, float]:
+    timings: List[float] = []
+    for _ in range(rounds):
+        gc.collect()
+        started = time.perf_counter()
+        build().close()
+        timings.append(time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    service = build()
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    service.close()
+
+    median = statistics.median(timings) * 1000
+    print(f"  {name:<18} {median:8.1f} ms (min {min(timings) * 1000:.1f})  {retained / 1024 / 1024:6.2f} MiB retained")
+    return median, retained
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time TranslationService construction from the database and from its snapshot.")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--shared-glosses", type=int, default=0, help="extra synthetic senses sharing a few glosses")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = str(Path(directory) / "translated.db")
+        shutil.copyfile(args.db, db_path)
+        if args.shared_glosses:
+            _add_shared_glosses(db_path, args.shared_glosses, args.seed)
+        snapshot_path = db_path + ".translator-cache"
+
+        def usable_from_database() -> TranslationService:
+            Path(snapshot_path).unlink(missing_ok=True)
+            return TranslationService(db_path)
+
+        def build_from_database() -> TranslationService:
+            service = usable_from_database()
+            service.wait_until_ready()
+            return service
+
+        print(f"{args.db} + {args.shared_glosses} shared-gloss senses ({args.rounds} rounds)")
+        _measure("usable from db", args.rounds, usable_from_database)
+        _measure("build from db", args.rounds, build_from_database)
+        _measure("restore snapshot", args.rounds, lambda: TranslationService(db_path))
+
+        service = TranslationService(db_path)
+        try:
+            service.wait_until_ready()
+            print(
+                f"  entries {len(service._entries)}  word senses {len(service._word_entries)}  "
+                f"terms {len(service._term_candidates)}"
+            )
+        finally:
+            service.close()
+
+
+if __name__ == "__main__":
+    main()
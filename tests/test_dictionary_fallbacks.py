@@ -7,9 +7,10 @@ import Levenshtein
 import numpy as np
 
 from webui_backend.build_mode import feature_flags
-from webui_backend.dictionary_service import DictionaryService
+from webui_backend.dictionary_service import DictionaryService, _SpellingIndex
+from webui_backend.search_utils import ResultCache
 from webui_backend import similarity_matcher as similarity_module
-from webui_backend.similarity_matcher import SimilarityMatcher
+from webui_backend.similarity_matcher import SemanticEngine, SimilarityMatcher
 
 
 class _History:
@@ -36,9 +37,18 @@ class _Database:
     def search_words(self, query, exact):
         return [], []
 
+    def search_entries(self, query, exact, is_phrase=False):
+        return {"phrase": []} if is_phrase else {"alice": [], "chinese": []}
+
     def get_all_words(self):
         return list(self.rows)
 
+    def content_version(self):
+        return 0, 0
+
+    def get_autocomplete_rows(self):
+        return {"headwords": [(word, explanation, 0, 0) for word, explanation in self.rows]}
+
 
 class _SemanticMatcher:
     def __init__(self):
@@ -73,7 +83,9 @@ def _service(semantic_matcher=None):
     service.history_manager = _History()
     service.similarity_matcher = semantic_matcher
     service._similarity_index_built = True
-    service._spelling_candidates = None
+    service._spelling_index = None
+    service._result_cache = ResultCache()
+    service._autocomplete_index = None
     service._ensure_connection = lambda: None
     service._get_examples_payload = lambda query, position: {
         "ok": True, "word": query, "examples": [], "song_stats": [],
@@ -93,6 +105,43 @@ class DictionaryFallbackTests(unittest.TestCase):
         self.assertEqual(result["suggestions"][0]["distance"], 1)
         self.assertEqual(result["suggestions"][0]["method"], "spelling")
 
+    def test_spelling_index_finds_every_headword_within_distance(self):
+        rows = [("Aasye", ""), ("aasye", ""), ("Abelu", ""), ("Ailent", ""), ("Shelista", ""),
+                ("Harmiy", ""), ("Laiscall", ""), ("Mi", "")]
+        index = _SpellingIndex(rows)
+        self.assertEqual(len(index.entries), 7)
+        for query, max_distance in (("asye", 1), ("shelsita", 2), ("laiscal", 2), ("harmiyyy", 2), ("mii", 1)):
+            expected = {
+                entry[0] for entry in index.entries
+                if Levenshtein.distance(query, entry[0]) <= max_distance
+            }
+            found = {entry[0] for entry in index.lookup(query, max_distance)}
+            self.assertTrue(expected <= found, query)
+        self.assertEqual(index.lookup("x" * 30, 8), [])
+
+        long_index = _SpellingIndex([("Shelistaharmiy", "")])
+        self.assertEqual(long_index._deep, [0])
+        self.assertEqual(len(long_index.lookup("shelistaharmiyyy", 4)), 1)
+
+    def test_spelling_index_is_rebuilt_only_when_headwords_change(self):
+        service = _service()
+        versions = iter(range(100))
+        service.db_handler.content_version = lambda: (next(versions), 0)
+        with patch.object(threading.Thread, "start", lambda thread: thread.run()):
+            first = service._current_spelling_index()
+            self.assertTrue(first.indexed)
+            # A lyric save moves the version but keeps the headwords.
+            service.db_handler.rows[0] = ("Aasye", "升起，上升")
+            with patch.object(_SpellingIndex, "deletion_map", side_effect=AssertionError("rebuilt")):
+                refreshed = service._current_spelling_index()
+            self.assertIs(refreshed._variants, first._variants)
+            self.assertEqual(refreshed.lookup("aasyf", 1)[0][2], "升起，上升")
+
+        service.db_handler.rows.append(("Aasyf", "新词"))
+        pending = service._current_spelling_index()
+        self.assertEqual(pending.words[-1], "aasyf")
+        self.assertEqual(len(pending.lookup("aasyg", 1)), 2)
+
     def test_chinese_miss_uses_semantic_matcher_not_spelling(self):
         matcher = _SemanticMatcher()
         result = _service(matcher).search("开花")
@@ -100,15 +149,67 @@ class DictionaryFallbackTests(unittest.TestCase):
         self.assertEqual(result["suggestions"][0]["method"], "semantic")
         self.assertNotIn("distance", result["suggestions"][0])
 
+    def test_semantic_suggestions_wait_for_background_warm_up(self):
+        matcher = _SemanticMatcher()
+        matcher.available = True
+        service = _service(matcher)
+        service._similarity_index_built = False
+        service.defer_similarity_index()
+        pending = service.search("开花")
+        self.assertEqual(matcher.queries, [])
+        self.assertEqual(pending["suggestions"], [])
+        self.assertIn("语义模型正在后台加载", pending["message"])
+
+        built = []
+        service._build_similarity_index = lambda pairs=None: built.append(pairs)
+        self.assertTrue(service.warm_up_similarity_index())
+        self.assertEqual(built, [_Database().rows])
+        result = service.search("开花")
+        self.assertEqual(matcher.queries, ["开花"])
+        self.assertEqual(result["suggestions"][0]["method"], "semantic")
+
+    def test_searches_and_example_lookups_share_the_result_cache(self):
+        service = _service()
+        for _ in range(5):
+            service.search("Aasyf")
+            service.get_examples("Aasye")
+        self.assertEqual(service.cache_stats()["hits"], 8)
+        self.assertEqual(service.cache_stats()["misses"], 2)
+
+        service._similarity_index_built = False
+        service.search("Aasyf")
+        service.get_examples("Aasye")
+        self.assertEqual(service.cache_stats()["hits"], 9)
+        self.assertEqual(service.cache_stats()["misses"], 3)
+
     def test_text2vec_scores_are_cosine_normalized(self):
-        matcher = SimilarityMatcher()
-        matcher._model = _VectorModel()
-        with patch.object(similarity_module, "_NP", np):
+        engine = SemanticEngine()
+        with patch.object(similarity_module, "_NP", np), patch.object(similarity_module, "_ENGINE", engine):
+            matcher = SimilarityMatcher(cache_dir="")
+            engine._model = _VectorModel()
             matcher.build_index([("Abelu", "绽开，开放"), ("Aasye", "升起，上升")])
             result = matcher.find_similar("花朵开放", top_k=1)
         self.assertEqual(result[0]["words"], ["Abelu"])
         self.assertEqual(result[0]["similarity"], 1.0)
 
+    def test_similarity_index_uses_the_configured_storage_and_search(self):
+        builds = []
+
+        class _Matcher:
+            def build_index(self, pairs, **options):
+                builds.append(options)
+
+        service = _service()
+        service.similarity_matcher = _Matcher()
+        service._build_similarity_index()
+        env = {"ALICIAN_EMBEDDING_STORAGE": "INT8", "ALICIAN_SIMILARITY_SEARCH": "hnsw"}
+        with patch.dict(os.environ, env), self.assertLogs(similarity_module.logger, "WARNING"):
+            service._build_similarity_index()
+        self.assertEqual(builds, [
+            {"storage": "float32", "search": "flat"},
+            {"storage": "int8", "search": "flat"},
+        ])
+
     def test_lite_keeps_spelling_fallback_but_disables_bundled_semantic_model(self):
         with patch.dict(os.environ, {"ALICIAN_LITE_BUILD": "1"}):
             flags = feature_flags()
@@ -0,0 +1,37 @@
+const assert = require("node:assert/strict");
+const fs = require("node:fs");
+const path = require("node:path");
+const test = require("node:test");
+const vm = require("node:vm");
+
+function loadDictionaryCode(responses) {
+  const calls = [];
+  const context = {
+    console,
+    callApi: async (name, ...args) => {
+      calls.push([name, ...args]);
+      return responses.shift();
+    },
+  };
+  vm.createContext(context);
+  const source = fs.readFileSync(path.join(__dirname, "..", "webui", "js", "dictionary.js"), "utf8");
+  vm.runInContext(source, context, { filename: "dictionary.js" });
+  return { context, calls };
+}
+
+test("a failed lyric fetch is reported and not cached", async () => {
+  const { context, calls } = loadDictionaryCode([
+    { ok: false, message: "未找到该歌曲。" },
+    { ok: true, lyric: "Mii Amie Shelista" },
+  ]);
+  const payload = { songs: { 1: { title: "Song", album: "Album1" } } };
+  const example = { song_id: 1 };
+
+  await assert.rejects(context.loadExampleSong(payload, example), /未找到该歌曲/);
+  assert.equal(payload.songs[1].lyric, undefined);
+
+  const song = await context.loadExampleSong(payload, example);
+  assert.equal(song.lyric, "Mii Amie Shelista");
+  await context.loadExampleSong(payload, example);
+  assert.equal(calls.length, 2);
+});
@@ -0,0 +1,283 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from webui_backend.dictionary_core import DatabaseHandler, TextProcessor
+from webui_backend.dictionary_service import DictionaryService, _AutocompleteIndex
+from webui_backend.search_utils import ResultCache
+
+
+_SCHEMA = (
+    "CREATE TABLE dictionary_headwords (id INTEGER PRIMARY KEY AUTOINCREMENT, words TEXT NOT NULL, "
+    "display_explanation TEXT, display_class TEXT, count INTEGER DEFAULT 0, variety INTEGER DEFAULT 0)",
+    "CREATE TABLE dictionary (id INTEGER PRIMARY KEY AUTOINCREMENT, headword_id INTEGER NOT NULL, "
+    "words TEXT NOT NULL, explanation TEXT NOT NULL, class TEXT, sense_order INTEGER NOT NULL, "
+    "count INTEGER DEFAULT 0, variety INTEGER DEFAULT 0)",
+    "CREATE TABLE songs (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, lyric TEXT, Album TEXT)",
+    "CREATE TABLE phrase (id INTEGER PRIMARY KEY AUTOINCREMENT, PHRASE TEXT, explanation TEXT, "
+    "count INTEGER, variety INTEGER)",
+)
+
+_HEADWORDS = [
+    ("Aasye", "升起", "v.", 4, 2),
+    ("Abelu", "绽开", "v.", 3, 1),
+    ("Ailent", "日子，每一天", "n.", 7, 5),
+    ("Shelista", "世界", "n.", 12, 6),
+]
+
+_LYRIC = (
+    "Mii Amie Shelista\n"
+    "Mii：pron. 我\n"
+    "\n"
+    "Shelista, Amie Mii\n"
+    "\n"
+    "Mii Amie Shelista\n"
+    "\n"
+    "Ranya Shelista Mii"
+)
+
+
+def _create_database(path):
+    conn = sqlite3.connect(path)
+    for statement in _SCHEMA:
+        conn.execute(statement)
+    for index, (word, explanation, word_class, count, variety) in enumerate(_HEADWORDS, 1):
+        conn.execute(
+            "INSERT INTO dictionary_headwords (words, display_explanation, display_class, count, variety) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (word, explanation, word_class, count, variety),
+        )
+        conn.execute(
+            "INSERT INTO dictionary (headword_id, words, explanation, class, sense_order, count, variety) "
+            "VALUES (?, ?, ?, ?, 1, ?, ?)",
+            (index, word, explanation, word_class, count, variety),
+        )
+    conn.execute(
+        "INSERT INTO phrase (PHRASE, explanation, count, variety) VALUES ('Mii Amie', '我爱', 2, 1)"
+    )
+    conn.execute(
+        "INSERT INTO songs (title, lyric, Album) VALUES (?, ?, 'Album1')",
+        ("Song", _LYRIC),
+    )
+    conn.commit()
+    conn.close()
+
+
+class DictionarySearchIndexTests(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self._directory.name, "translated.db")
+        _create_database(self.db_path)
+        self.handler = DatabaseHandler(self.db_path)
+        self.assertTrue(self.handler.connect())
+
+    def tearDown(self):
+        self.handler.close()
+        self._directory.cleanup()
+
+    def _like_search(self, query):
+        self.handler._search_index_failed = True
+        try:
+            return self.handler.search_words(query, False), self.handler.search_phrases(query, False)
+        finally:
+            self.handler._search_index_failed = False
+
+    def test_trigram_index_matches_like_scan(self):
+        for query in ("asy", "ELIS", "每一天", "ent", "ii Am", "Ai"):
+            indexed = self.handler.search_words(query, False), self.handler.search_phrases(query, False)
+            self.assertEqual(indexed, self._like_search(query), query)
+        self.assertEqual(self.handler.search_words("elis", False)[0][0][0], "Shelista")
+
+    def test_search_entries_join_stats(self):
+        self.assertEqual(self.handler.search_entries("elis", False), {
+            "alice": [("Shelista", "世界", "n.", 12, 6)], "chinese": [],
+        })
+        self.assertEqual(self.handler.search_entries("每一天", True)["chinese"], [])
+        self.assertEqual(
+            self.handler.search_entries("mii am", False, is_phrase=True),
+            {"phrase": [("Mii Amie", "我爱", "", 2, 1)]},
+        )
+
+    def test_index_lives_in_temp_schema(self):
+        self.assertTrue(self.handler._ensure_search_index())
+        main_tables = {
+            row[0] for row in self.handler.conn.execute("SELECT name FROM sqlite_master")
+        }
+        self.assertNotIn("headword_fts", main_tables)
+
+    def test_triggers_follow_writes_on_the_same_connection(self):
+        self.handler.search_words("Aasye", False)
+        self.handler.conn.execute(
+            "UPDATE dictionary_headwords SET words = 'Aasyeru' WHERE words = 'Aasye'"
+        )
+        self.handler.conn.commit()
+        self.assertEqual(self.handler.search_words("syeru", False)[0][0][0], "Aasyeru")
+
+    def test_external_commit_rebuilds_index(self):
+        self.handler.search_words("Aasye", False)
+        other = sqlite3.connect(self.db_path)
+        other.execute(
+            "INSERT INTO dictionary_headwords (words, display_explanation, display_class) "
+            "VALUES ('Lumielle', '光辉', 'n.')"
+        )
+        other.commit()
+        other.close()
+        self.assertEqual(self.handler.search_words("mielle", False)[0], [("Lumielle", "光辉", "n.")])
+
+    def _examples(self, handler, word, position):
+        service = DictionaryService.__new__(DictionaryService)
+        service.db_handler = handler
+        return service._get_examples_payload(word, position)
+
+    def test_lyric_index_matches_paragraph_scan(self):
+        scanning = DatabaseHandler(self.db_path)
+        self.assertTrue(scanning.connect())
+        scanning.find_word_paragraphs = lambda word, position="any": None
+        try:
+            for word in ("Mii", "amie", "SHELISTA", "Ranya", "pron"):
+                for position in ("any", "start", "end"):
+                    self.assertEqual(
+                        self._examples(self.handler, word, position),
+                        self._examples(scanning, word, position),
+                        (word, position),
+                    )
+        finally:
+            scanning.close()
+        payload = self._examples(self.handler, "Mii", "start")
+        self.assertEqual([example["paragraph"] for example in payload["examples"]], [
+            "Mii Amie Shelista\nMii：pron. 我\n", "Mii Amie Shelista\n",
+        ])
+        self.assertEqual(payload["song_stats"][0]["before"], 2)
+
+    def test_examples_reference_songs_by_id(self):
+        payload = self._examples(self.handler, "Shelista", "any")
+        self.assertEqual(payload["songs"], {1: {"title": "Song", "album": "Album1"}})
+        self.assertNotIn("lyric", payload["examples"][0])
+        for example in payload["examples"]:
+            self.assertEqual(example["song_id"], 1)
+            self.assertEqual(_LYRIC[example["start"]:example["end"]], example["paragraph"])
+
+        service = DictionaryService.__new__(DictionaryService)
+        service._lock = threading.RLock()
+        service.db_handler = self.handler
+        self.assertEqual(service.get_song_lyric(1), {
+            "ok": True, "song_id": 1, "title": "Song", "album": "Album1", "lyric": _LYRIC,
+        })
+        self.assertFalse(service.get_song_lyric(99)["ok"])
+
+    def test_result_cache_is_invalidated_by_writes(self):
+        service = DictionaryService.__new__(DictionaryService)
+        service._lock = threading.RLock()
+        service.db_handler = self.handler
+        service._result_cache = ResultCache(max_size=2)
+        service._autocomplete_index = None
+        service.get_examples("Ranya")
+        service.get_examples("Ranya")
+        self.assertEqual(service.cache_stats()["hits"], 1)
+
+        service.update_song_lyric("Song", "Album1", "Ranya Abelu")
+        self.assertEqual(service.get_examples("Ranya")["examples"][0]["paragraph"], "Ranya Abelu")
+
+        other = sqlite3.connect(self.db_path)
+        other.execute("UPDATE songs SET lyric = 'Abelu'")
+        other.commit()
+        other.close()
+        self.assertEqual(service.get_examples("Ranya")["examples"], [])
+        self.assertEqual(service.cache_stats(), {"hits": 1, "misses": 3, "size": 1, "max_size": 2})
+
+    def test_autocomplete_ranks_prefix_matches_by_stats(self):
+        index = _AutocompleteIndex(self.handler.get_autocomplete_rows())
+        self.assertEqual([item["text"] for item in index.lookup("a", 10)], ["Ailent", "Aasye", "Abelu"])
+        self.assertEqual([item["text"] for item in index.lookup("mii", 10)], ["Mii Amie"])
+        self.assertEqual(index.lookup("日子", 10)[0], {
+            "text": "日子", "kind": "chinese", "word": "Ailent",
+            "explanation": "日子，每一天", "count": 7, "variety": 5,
+        })
+        self.assertEqual(index.lookup("每一天x", 10), [])
+
+    def test_autocomplete_index_follows_writes(self):
+        service = DictionaryService.__new__(DictionaryService)
+        service._lock = threading.RLock()
+        service.db_handler = self.handler
+        service._autocomplete_index = None
+        self.assertEqual(service.autocomplete("lumi")["items"], [])
+        service.refresh_autocomplete()
+        self.assertEqual(service.autocomplete("lumi")["items"], [])
+
+        other = sqlite3.connect(self.db_path)
+        other.execute(
+            "INSERT INTO dictionary_headwords (words, display_explanation, display_class, count) "
+            "VALUES ('Lumielle', '光辉', 'n.', 1)"
+        )
+        other.commit()
+        other.close()
+        service.refresh_autocomplete()
+        self.assertEqual([item["word"] for item in service.autocomplete("LUMI", 0)["items"]], ["Lumielle"])
+
+    def test_autocomplete_follows_the_version_check_not_search_misses(self):
+        service = DictionaryService.__new__(DictionaryService)
+        service._lock = threading.RLock()
+        service.db_handler = self.handler
+        service._result_cache = ResultCache()
+        service._autocomplete_index = None
+        service.refresh_autocomplete()
+        index = service._autocomplete_index
+
+        # Lyric saves move the version but leave the completion rows alone.
+        self.assertTrue(service.update_song_lyric("Song", "Album1", _LYRIC + "\nAbelu")["ok"])
+        self.assertIs(service._autocomplete_index, index)
+        self.assertEqual(index.version, self.handler.content_version())
+
+        service.get_examples("Ranya")
+        other = sqlite3.connect(self.db_path)
+        other.execute("UPDATE dictionary_headwords SET words = 'Lumielle' WHERE words = 'Abelu'")
+        other.commit()
+        other.close()
+        # A cached examples payload is still checked against the version.
+        service.get_examples("Ranya")
+        self.assertEqual([item["word"] for item in service.autocomplete("lumi")["items"]], ["Lumielle"])
+
+    def test_paragraph_cache_is_bounded_and_invalidated(self):
+        TextProcessor.invalidate_paragraphs()
+        paragraphs = TextProcessor.find_valid_paragraphs(_LYRIC, "mii", "end", song_id=1)
+        self.assertEqual([(p["text"], p["start"], p["end"]) for p in paragraphs], [
+            ("Shelista, Amie Mii\n", 31, 50), ("Ranya Shelista Mii", 70, 88),
+        ])
+        self.assertIs(TextProcessor.get_paragraphs(_LYRIC, 1), TextProcessor.get_paragraphs(_LYRIC, 1))
+
+        self.handler.update_song_lyric("Song", "Album1", "Abelu")
+        self.assertEqual(list(TextProcessor._paragraph_cache), [])
+        for song_id in range(TextProcessor._PARAGRAPH_CACHE_SIZE + 5):
+            TextProcessor.get_paragraphs(_LYRIC, song_id)
+        self.assertEqual(len(TextProcessor._paragraph_cache), TextProcessor._PARAGRAPH_CACHE_SIZE)
+        TextProcessor.invalidate_paragraphs()
+
+    def test_batched_word_matching_matches_single_words(self):
+        words = ["Mii", "SHELISTA", "amie", "Mii Amie", "Ranya", "pron", "Lumielle"]
+        for position in ("any", "start", "end"):
+            batched = TextProcessor.find_paragraphs_for_words(_LYRIC, words, position)
+            for word in words:
+                single = [
+                    paragraph for paragraph in TextProcessor.split_paragraphs(_LYRIC)
+                    if paragraph["text"] in TextProcessor.extract_all_valid_paragraphs(_LYRIC, word)
+                    and TextProcessor.matches_position(paragraph["text"], word, position)
+                ]
+                self.assertEqual([p["start"] for p in batched[word]], [p["start"] for p in single], (word, position))
+
+    def test_compiled_patterns_are_bounded(self):
+        for index in range(TextProcessor._PATTERN_CACHE_SIZE + 10):
+            TextProcessor._get_compiled_pattern(f"word{index}")
+        self.assertEqual(len(TextProcessor._compiled_patterns), TextProcessor._PATTERN_CACHE_SIZE)
+        self.assertNotIn("word0", TextProcessor._compiled_patterns)
+
+    def test_updated_lyric_is_reindexed(self):
+        self.assertEqual(len(self.handler.find_word_paragraphs("Ranya")), 1)
+        self.assertTrue(self.handler.update_song_lyric("Song", "Album1", "Abelu Aasye"))
+        self.assertEqual(self.handler.find_word_paragraphs("Ranya"), [])
+        self.assertEqual(self.handler.find_word_paragraphs("aasye")[0][3], [(0, 11)])
+
+
+if __name__ == "__main__":
+    unittest.main()
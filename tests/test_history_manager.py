@@ -0,0 +1,48 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from webui_backend.dictionary_core import HistoryManager
+
+
+class HistoryManagerTests(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._directory.name, "search_history.json")
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def _saved(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_records_are_written_behind_and_coalesced(self):
+        manager = HistoryManager(self.path, max_records=3, flush_delay=60)
+        for record in ("Mii", "Amie", "Mii", "Shelista", "Ranya"):
+            manager.add_record(record)
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(manager.get_history(), ["Ranya", "Shelista", "Mii"])
+
+        manager.flush()
+        self.assertEqual(self._saved(), ["Ranya", "Shelista", "Mii"])
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+        self.assertEqual(HistoryManager(self.path).get_history(), ["Ranya", "Shelista", "Mii"])
+
+    def test_timer_flushes_pending_changes(self):
+        manager = HistoryManager(self.path, flush_delay=0.01)
+        manager.add_record("Mii")
+        manager.delete_record("Mii")
+        manager.add_record("Amie")
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if os.path.exists(self.path) and self._saved() == ["Amie"]:
+                break
+            time.sleep(0.01)
+        self.assertEqual(self._saved(), ["Amie"])
+
+
+if __name__ == "__main__":
+    unittest.main()
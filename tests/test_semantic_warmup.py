@@ -0,0 +1,71 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from webui_backend import similarity_matcher
+from webui_backend.semantic_warmup import SemanticWarmup
+from webui_backend.similarity_matcher import SemanticEngine
+
+
+class _Service:
+    def __init__(self, calls, name, available=True):
+        self.calls = calls
+        self.name = name
+        self.available = available
+
+    def defer_similarity_index(self):
+        self.calls.append(("defer", self.name))
+
+    def warm_up_similarity_index(self):
+        self.calls.append(("warm_up", self.name))
+        return self.available
+
+
+class _Model:
+    def encode(self, texts):
+        return [[1.0] for _ in texts]
+
+
+class SemanticWarmupTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = SemanticEngine()
+        patcher = patch.object(similarity_matcher, "_ENGINE", self.engine)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _run(self, warmup, services):
+        worker_ready = threading.Event()
+        self.assertTrue(warmup.start(worker_ready, lambda: services))
+        self.assertFalse(warmup.start(worker_ready, lambda: services))
+        self.assertEqual(warmup.status()["state"], "pending")
+        worker_ready.set()
+        self.assertTrue(warmup.done.wait(10))
+        return warmup.status()
+
+    def test_services_are_deferred_before_the_model_loads(self):
+        calls = []
+        self.engine._model = _Model()
+        status = self._run(SemanticWarmup(True, delay=0), [_Service(calls, "dictionary"), None, _Service(calls, "translator")])
+        self.assertEqual(calls, [
+            ("defer", "dictionary"), ("defer", "translator"),
+            ("warm_up", "dictionary"), ("warm_up", "translator"),
+        ])
+        self.assertEqual(status, {"state": "ready", "ready": True, "progress": 1.0, "message": "语义模型已就绪。"})
+
+    def test_missing_model_still_releases_the_services(self):
+        calls = []
+        with patch.object(SemanticEngine, "ensure_model", lambda engine: False):
+            status = self._run(SemanticWarmup(True, delay=0), [_Service(calls, "dictionary", available=False)])
+        self.assertEqual(calls, [("defer", "dictionary"), ("warm_up", "dictionary")])
+        self.assertEqual(status["state"], "unavailable")
+        self.assertFalse(status["ready"])
+
+    def test_lite_build_never_starts(self):
+        warmup = SemanticWarmup(False)
+        self.assertFalse(warmup.start(threading.Event(), lambda: []))
+        self.assertTrue(warmup.done.is_set())
+        self.assertEqual(warmup.status()["state"], "disabled")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,296 @@
+import os
+import tempfile
+import threading
+import unittest
+import zlib
+from unittest.mock import patch
+
+import numpy as np
+
+from webui_backend import similarity_matcher
+from webui_backend.similarity_matcher import STORAGE_MODES, SemanticEngine, SimilarityMatcher
+
+
+class _FakeModel:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts):
+        self.encoded.extend(texts)
+        return np.stack([
+            np.random.RandomState(zlib.crc32(text.encode("utf-8"))).normal(size=16) for text in texts
+        ])
+
+
+_PAIRS = [("Aasye", "升起"), ("Abelu", "绽开"), ("Ailent", "日子，每一天"), ("Shelista", "世界")]
+
+
+class EmbeddingCacheTests(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.cache_dir = self._directory.name
+        self.engine = SemanticEngine()
+        for name, value in (("_NP", np), ("_ENGINE", self.engine)):
+            patcher = patch.object(similarity_matcher, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def _build(self, pairs, cache_dir=None):
+        model = _FakeModel()
+        matcher = SimilarityMatcher(self.cache_dir if cache_dir is None else cache_dir)
+        self.addCleanup(matcher.close)
+        self.engine._model = model
+        matcher.build_index(pairs)
+        self.assertTrue(matcher.available)
+        return matcher, model
+
+    def _matrix(self, matcher):
+        return self.engine._indexes[matcher._state.index_key].data.stored
+
+    def _vectors(self, matcher):
+        return np.asarray(self._matrix(matcher))[matcher._state.rows]
+
+    def test_unchanged_explanations_are_loaded_from_the_cache(self):
+        first, model = self._build(_PAIRS)
+        self.assertEqual(model.encoded, ["升起", "绽开", "日子，每一天", "世界"])
+        first.close()
+        uncached, _ = self._build(_PAIRS, cache_dir="")
+
+        second, model = self._build(_PAIRS)
+        self.assertEqual(model.encoded, [])
+        self.assertIsInstance(self._matrix(second), np.memmap)
+        self.assertEqual(self._matrix(second).dtype, np.float32)
+        np.testing.assert_array_equal(self._vectors(second), self._vectors(uncached))
+        self.assertEqual(second.find_similar("世界", top_k=2), uncached.find_similar("世界", top_k=2))
+        self.assertEqual(second.find_similar("世界", top_k=1)[0]["words"], ["Shelista"])
+
+    def test_only_new_or_changed_explanations_are_encoded(self):
+        self._build(_PAIRS)[0].close()
+        changed = [("Aasye", "升起，上升")] + _PAIRS[1:] + [("Ranya", "看见")]
+        matcher, model = self._build(changed)
+        self.assertEqual(model.encoded, ["升起，上升", "看见"])
+        np.testing.assert_array_equal(self._vectors(matcher), self._vectors(self._build(changed, cache_dir="")[0]))
+        matcher.close()
+
+        revision_dir = os.path.join(self.cache_dir, similarity_matcher._model_revision())
+        self.assertEqual(len([name for name in os.listdir(revision_dir) if name.endswith(".npy")]), 1)
+        with patch.object(similarity_matcher, "_model_revision", lambda: "other-revision"):
+            self.assertEqual(len(self._build(changed)[1].encoded), len(changed))
+
+    def test_unreadable_cache_falls_back_to_encoding(self):
+        self._build(_PAIRS)[0].close()
+        revision_dir = os.path.join(self.cache_dir, similarity_matcher._model_revision())
+        with open(os.path.join(revision_dir, "manifest.json"), "w", encoding="utf-8") as f:
+            f.write("{broken")
+        matcher, model = self._build(_PAIRS)
+        self.assertEqual(len(model.encoded), len(_PAIRS))
+        matcher.close()
+        self.assertEqual(self._build(_PAIRS)[1].encoded, [])
+
+    def test_namespaced_corpus_survives_compaction_of_the_default_one(self):
+        sentences = [(f"Line{index}", f"句子{index}") for index in range(40)]
+        model = _FakeModel()
+        corpus = SimilarityMatcher(self.cache_dir, namespace="sentences")
+        self.engine._model = model
+        corpus.build_index(sentences)
+        corpus.close()
+        # Far more rows than _EMBEDDING_CACHE_MAX_GROWTH times one explanation.
+        self._build(_PAIRS[:1])[0].close()
+        self._build(_PAIRS[1:2])[0].close()
+
+        reopened = SimilarityMatcher(self.cache_dir, namespace="sentences")
+        self.addCleanup(reopened.close)
+        self.engine._model = model = _FakeModel()
+        reopened.build_index(sentences)
+        self.assertEqual(model.encoded, [])
+        revision_dir = os.path.join(self.cache_dir, similarity_matcher._model_revision())
+        self.assertTrue(os.path.isfile(os.path.join(revision_dir, "sentences", "manifest.json")))
+
+    def test_matchers_share_one_model_and_reference_counted_rows(self):
+        model = _FakeModel()
+        dictionary = SimilarityMatcher("")
+        translator = SimilarityMatcher("")
+        self.engine._model = model
+        dictionary.build_index(_PAIRS[:3])
+        translator.build_index(_PAIRS[1:])
+        self.assertEqual(model.encoded, ["升起", "绽开", "日子，每一天", "世界"])
+        self.assertEqual(list(dictionary._state.rows[1:]), list(translator._state.rows[:2]))
+        stats = self.engine.stats()
+        self.assertEqual((stats["clients"], stats["rows"], stats["live_rows"]), (2, 4, 4))
+        self.assertEqual(stats["embedding_bytes"], 4 * 16 * 4)
+
+        dictionary.close()
+        self.assertEqual(self.engine.stats()["live_rows"], 3)
+        self.assertEqual(translator.find_similar("世界", top_k=1)[0]["words"], ["Shelista"])
+        self.assertEqual(dictionary.find_similar("世界"), [])
+        translator.close()
+        stats = self.engine.stats()
+        self.assertEqual((stats["clients"], stats["model_loaded"], stats["rows"]), (0, False, 0))
+
+    def test_queries_see_one_consistent_index_while_it_grows(self):
+        self.engine._model = _FakeModel()
+        reader = SimilarityMatcher("")
+        writer = SimilarityMatcher("")
+        self.addCleanup(reader.close)
+        self.addCleanup(writer.close)
+        reader.build_index(_PAIRS, storage="int8")
+        expected = reader.find_similar("世界", top_k=1)
+        index = self.engine.index(reader._state.index_key)
+        published = index.data
+
+        failures = []
+        stop = threading.Event()
+
+        def query():
+            while not stop.is_set():
+                result = reader.find_similar("世界", top_k=1)
+                if result != expected:
+                    failures.append(result)
+                    return
+
+        thread = threading.Thread(target=query)
+        thread.start()
+        try:
+            for batch in range(40):
+                writer.build_index([(f"Word{batch}-{item}", f"释义{batch}-{item}") for item in range(20)], storage="int8")
+                reader.build_index(_PAIRS, storage="int8")
+        finally:
+            stop.set()
+            thread.join()
+        self.assertEqual(failures, [])
+
+        self.assertEqual(len(published.explanations), len(published.stored))
+        self.assertEqual(len(published.explanations), len(_PAIRS))
+        data = index.data
+        self.assertIsNot(data, published)
+        self.assertEqual(len(data.explanations), len(data.stored))
+        self.assertEqual(len(data.explanations), len(data.scales))
+
+
+
+class StorageModeTests(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self._directory.cleanup)
+        self.engine = SemanticEngine()
+        self.engine._model = _FakeModel()
+        for name, value in (("_NP", np), ("_ENGINE", self.engine)):
+            patcher = patch.object(similarity_matcher, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.pairs = [(f"Word{index}", f"释义{index}") for index in range(300)]
+        self.queries = [f"查询{index}" for index in range(40)]
+
+    def _matcher(self, storage, cache_dir=""):
+        matcher = SimilarityMatcher(cache_dir)
+        self.addCleanup(matcher.close)
+        matcher.build_index(self.pairs, storage=storage)
+        self.assertTrue(matcher.available)
+        return matcher
+
+    def _brute_force(self, vectors, query, top_k):
+        scores = np.clip(vectors @ self.engine.encode([query])[0], -1.0, 1.0)
+        return [
+            (f"释义{index}", round(float(scores[index]), 4))
+            for index in np.argsort(-scores, kind="stable")[:top_k] if scores[index] > 0
+        ]
+
+    def test_argpartition_matches_a_full_sort(self):
+        matcher = self._matcher("float32")
+        vectors = self.engine.encode([explanation for _, explanation in self.pairs])
+        for query in self.queries:
+            found = [(item["explanation"], item["similarity"]) for item in matcher.find_similar(query, top_k=5)]
+            self.assertEqual(found, self._brute_force(vectors, query, 5), query)
+        buffers = matcher._buffers
+        matcher.find_similar(self.queries[0], top_k=300)
+        self.assertIs(matcher._buffers, buffers)
+
+    def test_reduced_storage_shrinks_the_index(self):
+        sizes = {storage: self.engine.index(self._matcher(storage)._state.index_key).data.nbytes for storage in STORAGE_MODES}
+        self.assertEqual(sizes["float16"] * 2, sizes["float32"])
+        self.assertEqual(sizes["int8"], 300 * 16 + 300 * 4)
+        with self.assertRaises(ValueError):
+            SimilarityMatcher("").build_index(self.pairs, storage="float64")
+
+    def test_reduced_storage_ranks_like_float32(self):
+        exact = self._matcher("float32")
+        for storage in ("float16", "int8"):
+            approximate = self._matcher(storage)
+            for query in self.queries:
+                expected = exact.find_similar(query, top_k=3)
+                found = approximate.find_similar(query, top_k=3)
+                self.assertEqual(found[0]["explanation"], expected[0]["explanation"], (storage, query))
+                for item, reference in zip(found, expected):
+                    self.assertAlmostEqual(item["similarity"], reference["similarity"], delta=0.03)
+
+    def test_quantized_results_are_rescored_against_the_cache_file(self):
+        exact = self._matcher("float32")
+        rescored = self._matcher("int8", cache_dir=self._directory.name)
+        self.assertIsInstance(self.engine.index(rescored._state.index_key).data.source, np.memmap)
+        for query in self.queries:
+            self.assertEqual(rescored.find_similar(query, top_k=3), exact.find_similar(query, top_k=3), query)
+
+
+class IvfSearchTests(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self._directory.cleanup)
+        self.engine = SemanticEngine()
+        self.engine._model = _FakeModel()
+        for name, value in (("_NP", np), ("_ENGINE", self.engine), ("_IVF_MIN_ROWS", 100)):
+            patcher = patch.object(similarity_matcher, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.pairs = [(f"Word{index}", f"释义{index}") for index in range(400)]
+        self.queries = [f"查询{index}" for index in range(30)]
+
+    def _matcher(self, cache_dir="", **options):
+        matcher = SimilarityMatcher(cache_dir)
+        self.addCleanup(matcher.close)
+        matcher.build_index(self.pairs, **options)
+        return matcher
+
+    def test_probing_every_list_matches_brute_force(self):
+        flat = self._matcher()
+        for storage in ("float32", "int8"):
+            ivf = self._matcher(search="ivf", storage=storage)
+            self.assertEqual(len(ivf._state.ivf.centroids), 20)
+            exact = flat if storage == "float32" else self._matcher(storage=storage)
+            for query in self.queries:
+                self.assertEqual(ivf.find_similar(query, top_k=4, nprobe=20), exact.find_similar(query, top_k=4), query)
+
+        query_embedding = self.engine.encode([self.queries[0]])[0]
+        probed = ivf._state.ivf.candidates(query_embedding, 2)
+        self.assertLess(len(probed), len(self.pairs))
+        self.assertTrue(np.all(np.diff(probed) > 0))
+        for item in ivf.find_similar(self.queries[0], top_k=3, nprobe=2):
+            self.assertIn(ivf._state.explanations.index(item["explanation"]), probed)
+
+    def test_small_corpora_and_unknown_modes(self):
+        with patch.object(similarity_matcher, "_IVF_MIN_ROWS", 1000):
+            self.assertIsNone(self._matcher(search="ivf")._state.ivf)
+        with self.assertRaises(ValueError):
+            SimilarityMatcher("").build_index(self.pairs, search="hnsw")
+
+    def test_trained_lists_are_persisted_next_to_the_embeddings(self):
+        cache_dir = self._directory.name
+        first = self._matcher(cache_dir, search="ivf")
+        revision_dir = os.path.join(cache_dir, similarity_matcher._model_revision())
+        self.assertEqual(len([name for name in os.listdir(revision_dir) if name.startswith("ivf-")]), 1)
+        assignments = first._state.ivf.assignments
+        first.close()
+        self.engine._model = _FakeModel()
+
+        with patch.object(similarity_matcher, "_train_ivf", side_effect=AssertionError("retrained")):
+            second = self._matcher(cache_dir, search="ivf", storage="int8")
+        np.testing.assert_array_equal(second._state.ivf.assignments, assignments)
+        flat = self._matcher()
+        for query in self.queries[:5]:
+            self.assertEqual(second.find_similar(query, top_k=3, nprobe=20), flat.find_similar(query, top_k=3))
+
+
+if __name__ == "__main__":
+    unittest.main()
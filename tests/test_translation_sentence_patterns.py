@@ -1,18 +1,27 @@
 from __future__ import annotations
 
+import os
+import random
+import tempfile
 import unittest
 
-from webui_backend.translation_service import TranslationService
+from webui_backend.search_utils import lev_ratio
+from webui_backend.translation_service import _ALICIAN_PART_RE, TranslationService, _LexiconEntry, _TermAutomaton
 
 
 class TranslationSentencePatternTests(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
-        cls.service = TranslationService()
+        cls._directory = tempfile.TemporaryDirectory()
+        cls.service = TranslationService(
+            snapshot_path=os.path.join(cls._directory.name, "translated.db.translator-cache"),
+        )
+        cls.service.wait_until_ready()
 
     @classmethod
     def tearDownClass(cls) -> None:
         cls.service.close()
+        cls._directory.cleanup()
 
     def test_pattern_resolves_ambiguous_chinese_noun_as_verb(self) -> None:
         result = self.service.translate("我爱世界", "zh_to_alician")
@@ -42,6 +51,145 @@ class TranslationSentencePatternTests(unittest.TestCase):
         self.assertEqual(result["result_text"], "我看见世界")
         self.assertTrue(all(token.get("matched_sentence_pattern") for token in semantic))
 
+    def test_character_index_scores_like_a_full_scan(self) -> None:
+        queries = ["星空", "美丽", "跑", "日子好", "看见了", "爱情故事", "无实义", "蓝色大海"]
+        indexed = [self.service._find_chinese_candidate(query) for query in queries]
+        full_scan = self.service._chinese_candidate_ids
+        self.service._chinese_candidate_ids = lambda query_set: range(len(self.service._entries))
+        try:
+            self.assertEqual(indexed, [self.service._find_chinese_candidate(query) for query in queries])
+        finally:
+            self.service._chinese_candidate_ids = full_scan
+
+    def test_precomputed_senses_match_ranking_the_bucket(self) -> None:
+        service = self.service
+        self.assertTrue(service._templates_by_lower)
+        for word, bucket in service._word_by_lower.items():
+            self.assertIs(service._best_word_entry(word.upper()), sorted(
+                bucket, key=lambda entry: (entry.sense_order, -entry.count, -entry.variety),
+            )[0])
+            templates = [entry for entry in bucket if service._template_arity(entry.explanation) > 0]
+            for following in range(4):
+                parts = [word] + [" ", "Mii"] * following + [","]
+                eligible = [
+                    entry for entry in templates if service._template_arity(entry.explanation) <= following
+                ]
+                expected = min(eligible, key=lambda entry: entry.sense_order) if eligible else None
+                self.assertIs(service._sentence_template_entry(parts, 0, word), expected)
+
+    def test_document_translation_reuses_repeated_sentences(self) -> None:
+        self.assertEqual(TranslationService.split_sentences(" 我爱世界。你好！\n\n第二行\nMii. Amie “引号。”"), [
+            ("我爱世界。", ""), ("你好！", "\n\n"), ("第二行", "\n"), ("Mii.", " "), ("Amie “引号。”", ""),
+        ])
+        document = self.service.translate_document("我爱世界。你好！\n我爱世界。")
+        self.assertEqual(document["direction"], "zh_to_alician")
+        self.assertEqual([item["repeated"] for item in document["sentences"]], [False, False, True])
+        single = self.service.translate("我爱世界。")["result_text"]
+        lines = document["result_text"].split("\n")
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith(single))
+        self.assertEqual(lines[1], single)
+        self.assertEqual(
+            document["stats"]["exact"],
+            sum(self.service.translate(text)["stats"]["exact"] for text in ("我爱世界。", "你好！", "我爱世界。")),
+        )
+
+        batch = self.service.translate_batch(["Ranya Shelista Mii", " Ranya Shelista Mii ", ""])
+        self.assertEqual([result["ok"] for result in batch["results"]], [True, True, False])
+        self.assertEqual(batch["results"][0]["result_text"], "我看见世界")
+
+    def test_term_buckets_hold_unique_entry_ids(self) -> None:
+        service = self.service
+        self.assertEqual([entry.entry_id for entry in service._entries], list(range(len(service._entries))))
+        for term, ids in service._term_candidates.items():
+            self.assertEqual(len(ids), len(set(ids)), term)
+            self.assertEqual(ids, sorted(ids), term)
+            self.assertTrue(all(term in entry.terms for entry in service._term_entries(term)), term)
+        self.assertEqual(service._term_entries("不存在的词"), [])
+
+    def test_similar_word_search_matches_a_full_scan(self) -> None:
+        service = self.service
+        rng = random.Random(15)
+        words = [entry.target for entry in service._word_entries]
+        queries = ["", "x", "Shelistaa", "mie", "Ranyaa", "qqqqqqqqqqqqqqqqqqqq"]
+        for _ in range(300):
+            letters = list(rng.choice(words))
+            position = rng.randrange(len(letters))
+            operation = rng.randrange(3)
+            if operation == 0:
+                letters[position] = rng.choice("aeilmnorsty")
+            elif operation == 1:
+                letters.insert(position, rng.choice("aeilmnorsty"))
+            elif len(letters) > 1:
+                del letters[position]
+            queries.append("".join(letters))
+
+        service._similar_memo.clear()
+        for query in queries + queries:
+            best_entry, best_score = None, 0.0
+            for entry in service._word_entries:
+                score = lev_ratio(query.lower(), entry.target.lower())
+                if score > best_score:
+                    best_entry, best_score = entry, score
+            expected = (best_entry, best_score) if best_entry and best_score >= 0.72 else (None, 0.0)
+            found = service._find_similar_alician_word(query)
+            self.assertIs(found[0], expected[0], query)
+            self.assertEqual(found[1], expected[1], query)
+        self.assertLessEqual(len(service._similar_memo), 512)
+
+
+class TermAutomatonTests(unittest.TestCase):
+    def test_longest_matches_agree_with_brute_force(self) -> None:
+        rng = random.Random(5)
+        alphabet = "我爱世界天空的星"
+        terms = {"".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(40)}
+        automaton = _TermAutomaton(terms)
+        for _ in range(200):
+            text = "".join(rng.choice(alphabet + "x") for _ in range(rng.randint(0, 30)))
+            expected = [
+                max((size for size in range(1, len(text) - start + 1) if text[start:start + size] in terms), default=0)
+                for start in range(len(text))
+            ]
+            self.assertEqual(automaton.longest_matches(text), expected, text)
+            self.assertEqual([automaton.longest_at(text, i) for i in range(len(text))], expected, text)
+
+
+class PhraseTrieTests(unittest.TestCase):
+    @staticmethod
+    def _linear_match(phrases, parts, start):
+        for phrase in phrases:
+            pos = start
+            for expected in phrase.phrase_words:
+                while pos < len(parts) and parts[pos].isspace():
+                    pos += 1
+                if pos >= len(parts) or parts[pos].lower() != expected:
+                    break
+                pos += 1
+            else:
+                return phrase, pos
+        return None, start
+
+    def test_trie_matches_longest_first_scan(self) -> None:
+        rng = random.Random(9)
+        vocabulary = ["mii", "amie", "shelista", "ranya", "nai"]
+        phrases = []
+        for index in range(30):
+            phrase = _LexiconEntry(index, "phrase", str(index), "", "phrase", 0, 0, 1)
+            phrase.phrase_words = [rng.choice(vocabulary) for _ in range(rng.randint(1, 4))]
+            phrases.append(phrase)
+        phrases.sort(key=lambda item: len(item.phrase_words), reverse=True)
+        service = TranslationService.__new__(TranslationService)
+        service._phrase_trie = TranslationService._build_phrase_trie(phrases)
+        for _ in range(300):
+            text = " ".join(rng.choice(vocabulary + ["Mii", "x", ",", "\n"]) for _ in range(rng.randint(1, 8)))
+            parts = _ALICIAN_PART_RE.findall(text)
+            for start, part in enumerate(parts):
+                if part.isspace():
+                    continue
+                self.assertEqual(
+                    service._match_phrase(parts, start), self._linear_match(phrases, parts, start), text,
+                )
+
 
 if __name__ == "__main__":
     unittest.main()
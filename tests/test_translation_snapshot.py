@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import copy
+import json
+import os
+import pickle
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from webui_backend import translation_service
+from webui_backend.translation_service import TranslationService, _default_db_path
+
+
+class TranslationSnapshotTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self._directory.name, "translated.db")
+        shutil.copyfile(_default_db_path(), self.db_path)
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def _translate(self, service: TranslationService):
+        return [
+            service.translate(text, direction)["result_text"]
+            for text, direction in (
+                ("我爱世界", "zh_to_alician"),
+                ("我将爱世界", "zh_to_alician"),
+                ("Ranya Shelista Mii", "alician_to_zh"),
+                ("Shelistaa Mii", "alician_to_zh"),
+            )
+        ]
+
+    def test_snapshot_restores_the_compiled_state(self) -> None:
+        built = TranslationService(self.db_path)
+        self.assertFalse(built.loaded_from_snapshot)
+        self.assertTrue(built.wait_until_ready(30))
+        self.assertTrue(os.path.exists(built._snapshot_path))
+        restored = TranslationService(self.db_path)
+        try:
+            self.assertTrue(restored.loaded_from_snapshot)
+            self.assertTrue(restored.patterns_ready)
+            self.assertEqual(self._translate(restored), self._translate(built))
+            self.assertEqual(restored._sentence_patterns, built._sentence_patterns)
+            for word, entry in restored._best_by_lower.items():
+                self.assertTrue(any(entry is sense for sense in restored._word_by_lower[word]))
+        finally:
+            built.close()
+            restored.close()
+
+    def test_database_change_rebuilds_the_snapshot(self) -> None:
+        service = TranslationService(self.db_path)
+        service.wait_until_ready(30)
+        service.close()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("UPDATE dictionary SET explanation = '宇宙' WHERE words = 'Shelista'")
+        conn.commit()
+        conn.close()
+
+        service = TranslationService(self.db_path)
+        try:
+            self.assertFalse(service.loaded_from_snapshot)
+            self.assertEqual(service.translate("Shelista", "alician_to_zh")["result_text"], "宇宙")
+            self.assertTrue(service.wait_until_ready(30))
+        finally:
+            service.close()
+        service = TranslationService(self.db_path)
+        try:
+            self.assertTrue(service.loaded_from_snapshot)
+        finally:
+            service.close()
+
+    def test_corrupt_snapshot_is_ignored(self) -> None:
+        with open(self.db_path + ".translator-cache", "wb") as f:
+            f.write(b"not a snapshot")
+        service = TranslationService(self.db_path)
+        try:
+            self.assertFalse(service.loaded_from_snapshot)
+            self.assertTrue(service.wait_until_ready(30))
+            self.assertEqual(service.translate("我爱世界", "zh_to_alician")["result_text"], "Mii Amie Shelista")
+        finally:
+            service.close()
+
+    def test_version_bumps_and_unpicklable_state_rebuild_the_snapshot(self) -> None:
+        snapshot_path = os.path.join(self._directory.name, "custom.translator-cache")
+        built = TranslationService(self.db_path, snapshot_path=snapshot_path)
+        built.wait_until_ready(30)
+        built.close()
+        self.assertTrue(os.path.exists(snapshot_path))
+        self.assertFalse(os.path.exists(self.db_path + ".translator-cache"))
+
+        with mock.patch.object(translation_service, "_SNAPSHOT_VERSION", translation_service._SNAPSHOT_VERSION + 1):
+            service = TranslationService(self.db_path, snapshot_path=snapshot_path)
+            service.close()
+        self.assertFalse(service.loaded_from_snapshot)
+
+        with open(snapshot_path, "rb") as f:
+            header = pickle.load(f)
+        with open(snapshot_path, "wb") as f:
+            pickle.dump(header, f)
+            f.write(b"\x80\x05truncated state")
+        service = TranslationService(self.db_path, snapshot_path=snapshot_path)
+        try:
+            self.assertFalse(service.loaded_from_snapshot)
+            self.assertTrue(service.wait_until_ready(30))
+            self.assertEqual(service.translate("我爱世界", "zh_to_alician")["result_text"], "Mii Amie Shelista")
+        finally:
+            service.close()
+
+    def test_translation_works_before_patterns_are_mined(self) -> None:
+        gate = threading.Event()
+        mine = TranslationService._load_sentence_patterns
+
+        def slow_patterns(self, cancel=None):
+            gate.wait(30)
+            return mine(self, cancel)
+
+        with mock.patch.object(TranslationService, "_load_sentence_patterns", slow_patterns):
+            service = TranslationService(self.db_path)
+            try:
+                early = service.translate("我爱世界", "zh_to_alician")
+                self.assertFalse(early["patterns_ready"])
+                self.assertFalse(service.status()["patterns_ready"])
+                self.assertTrue(early["result_text"])
+                self.assertFalse(os.path.exists(service._snapshot_path))
+                gate.set()
+                self.assertTrue(service.wait_until_ready(30))
+                ready = service.translate("我爱世界", "zh_to_alician")
+                self.assertTrue(ready["patterns_ready"])
+                self.assertEqual(ready["result_text"], "Mii Amie Shelista")
+            finally:
+                gate.set()
+                service.close()
+
+    def test_sentence_memo_returns_read_only_results(self) -> None:
+        service = TranslationService(self.db_path)
+        try:
+            service.wait_until_ready(30)
+            first = service.translate(" 我爱世界 ", "zh_to_alician")
+            self.assertIs(service.translate("我爱世界", "zh_to_alician"), first)
+            self.assertIsNot(service.translate("我爱世界", "alician_to_zh"), first)
+            self.assertEqual(service.cache_stats()["hits"], 1)
+            with self.assertRaises(TypeError):
+                first["result_text"] = ""
+            with self.assertRaises(TypeError):
+                first["tokens"][0]["target"] = ""
+            self.assertEqual(json.loads(json.dumps(first))["result_text"], "Mii Amie Shelista")
+            self.assertEqual(copy.deepcopy(first), first)
+        finally:
+            service.close()
+
+    def test_database_change_reloads_the_running_service(self) -> None:
+        service = TranslationService(self.db_path)
+        try:
+            service.wait_until_ready(30)
+            self.assertEqual(service.translate("Shelista", "alician_to_zh")["result_text"], "世界")
+            conn = sqlite3.connect(self.db_path)
+            conn.execute("UPDATE dictionary SET explanation = '宇宙' WHERE words = 'Shelista'")
+            conn.commit()
+            conn.close()
+            self.assertEqual(service.translate("Shelista", "alician_to_zh")["result_text"], "宇宙")
+            self.assertTrue(service.wait_until_ready(30))
+            self.assertEqual(service.translate("Mii Amie Shelista", "alician_to_zh")["result_text"], "我爱宇宙")
+        finally:
+            service.close()
+        restored = TranslationService(self.db_path)
+        try:
+            self.assertTrue(restored.loaded_from_snapshot)
+            self.assertEqual(restored.translate("Shelista", "alician_to_zh")["result_text"], "宇宙")
+        finally:
+            restored.close()
+
+    def _append_lyric(self, line: str) -> None:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("UPDATE songs SET lyric = lyric || char(10) || ? WHERE id = 1", (line,))
+        conn.commit()
+        conn.close()
+
+    def test_lyric_saves_keep_the_lexicon_and_memo(self) -> None:
+        hashed_on = []
+        fingerprint = translation_service._database_fingerprint
+
+        def watched_fingerprint(db_path):
+            hashed_on.append(threading.current_thread().name)
+            return fingerprint(db_path)
+
+        service = TranslationService(self.db_path)
+        try:
+            service.wait_until_ready(30)
+            automaton = service._term_automaton
+            first = service.translate("我爱世界", "zh_to_alician")
+            self.assertIn("4 条实例", first["tokens"][0]["note"])
+            # Too short to be a pattern: the memo survives the re-mining.
+            self._append_lyric("Mii Amie")
+            with mock.patch.object(translation_service, "_database_fingerprint", watched_fingerprint):
+                self.assertIs(service.translate("我爱世界", "zh_to_alician"), first)
+                service._pattern_thread.join(30)
+            self.assertEqual(hashed_on, ["TranslationPatternMiner"])
+            self.assertIs(service.translate("我爱世界", "zh_to_alician"), first)
+
+            self._append_lyric("Mii Amie Shelista")
+            service.translate("我爱世界", "zh_to_alician")
+            service._pattern_thread.join(30)
+            self.assertIn("5 条实例", service.translate("我爱世界", "zh_to_alician")["tokens"][0]["note"])
+            self.assertIs(service._term_automaton, automaton)
+        finally:
+            service.close()
+        restored = TranslationService(self.db_path)
+        try:
+            self.assertTrue(restored.loaded_from_snapshot)
+        finally:
+            restored.close()
+
+    def test_close_cancels_pattern_mining(self) -> None:
+        cancelled = []
+        mine = TranslationService._load_sentence_patterns
+
+        def watched_patterns(self, cancel=None):
+            cancel.wait(30)
+            finished = mine(self, cancel)
+            cancelled.append(not finished)
+            return finished
+
+        with mock.patch.object(TranslationService, "_load_sentence_patterns", watched_patterns):
+            service = TranslationService(self.db_path)
+            service.close()
+        self.assertEqual(cancelled, [True])
+        self.assertFalse(service.patterns_ready)
+        self.assertFalse(os.path.exists(service._snapshot_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
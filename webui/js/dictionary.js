@@ -133,6 +133,21 @@ async function loadDictionaryExamples(word) {
   } catch (err) { toast("加载例句失败：" + err.message, "warn", 3200); }
 }
 
+function exampleSong(payload, example) {
+  return (payload?.songs || {})[example?.song_id] || {};
+}
+
+async function loadExampleSong(payload, example) {
+  var song = exampleSong(payload, example);
+  if (typeof song.lyric !== "string") {
+    var ret = await callApi("dictionary_song_lyric", example.song_id);
+    // Only cache a real lyric: an empty one would open an empty editor and be saved back.
+    if (!ret?.ok) throw new Error(ret?.message || "未能读取歌词");
+    song.lyric = ret.lyric || "";
+  }
+  return song;
+}
+
 function renderDictionaryExamples(payload) {
   var examples = payload?.examples || [];
   if (!examples.length) {
@@ -142,9 +157,10 @@ function renderDictionaryExamples(payload) {
   }
   var word = payload.word || "";
   els.dictExamples.innerHTML = examples.map(function (ex, idx) {
+    var song = exampleSong(payload, ex);
     return '<div class="example-item">' +
-      '<div class="example-source"><span class="no-alic-font">' + escapeHtml(ex.album || "") + ' - ' +
-      escapeHtml(ex.title || "") + '</span></div>' +
+      '<div class="example-source"><span class="no-alic-font">' + escapeHtml(song.album || "") + ' - ' +
+      escapeHtml(song.title || "") + '</span></div>' +
       '<div class="example-paragraph">' + _stripColonsFromAlicFont(applyWordHighlight(ex.paragraph || "", word)) + '</div>' +
       '<div class="result-actions">' +
       '<button class="small dict-context-btn" type="button" data-index="' + idx +
@@ -234,15 +250,20 @@ function openLyricContext(payload, sourceIndex) {
         }
       }
 
-      function renderAt() {
-        var current = allExamples[currentIndex];
+      async function renderAt() {
+        var index = currentIndex;
+        var current = allExamples[index];
         if (!current) return;
-        titleEl.innerHTML = "当前歌曲：<span class=\"no-alic-font\">" + escapeHtml(current.title) +
-          " - " + escapeHtml(current.album) + "</span>";
+        var song;
+        try { song = await loadExampleSong(payload, current); }
+        catch (err) { toast("加载歌词失败：" + err.message, "warn", 3200); return; }
+        if (index !== currentIndex) return;
+        titleEl.innerHTML = "当前歌曲：<span class=\"no-alic-font\">" + escapeHtml(song.title) +
+          " - " + escapeHtml(song.album) + "</span>";
         counterEl.textContent = "当前例句 " + (currentIndex + 1) + "/" +
           allExamples.length + "（原始例句总数：" + originalTotal + "）";
-        viewEl.innerHTML = renderLyricWithFocus(current.lyric, payload.word, current.start, current.end);
-        if (editing) editorEl.value = current.lyric || "";
+        viewEl.innerHTML = renderLyricWithFocus(song.lyric, payload.word, current.start, current.end);
+        if (editing) editorEl.value = song.lyric || "";
         prevBtn.disabled = currentIndex <= 0;
         nextBtn.disabled = currentIndex >= allExamples.length - 1;
         var focus = viewEl.querySelector(".lyric-paragraph-focus");
@@ -255,10 +276,11 @@ function openLyricContext(payload, sourceIndex) {
       nextBtn.addEventListener("click", function () {
         if (currentIndex < allExamples.length - 1) currentIndex += 1; renderAt();
       });
-      editBtn.addEventListener("click", function () {
+      editBtn.addEventListener("click", async function () {
         var c = allExamples[currentIndex];
         if (!c) return;
-        editorEl.value = c.lyric || "";
+        try { editorEl.value = (await loadExampleSong(payload, c)).lyric || ""; }
+        catch (err) { toast("加载歌词失败：" + err.message, "warn", 3200); return; }
         setEditMode(true);
       });
       cancelBtn.addEventListener("click", function () { setEditMode(false); });
@@ -266,7 +288,8 @@ function openLyricContext(payload, sourceIndex) {
         var c = allExamples[currentIndex];
         if (!c) return;
         try {
-          var ret = await callApi("dictionary_update_lyric", c.title, c.album, editorEl.value || "");
+          var song = exampleSong(payload, c);
+          var ret = await callApi("dictionary_update_lyric", song.title, song.album, editorEl.value || "");
           toast(ret?.message || "保存完成", ret?.ok ? "info" : "warn");
           if (ret?.ok) {
             await loadDictionaryExamples(payload.word);
@@ -278,11 +301,33 @@ function openLyricContext(payload, sourceIndex) {
     });
 }
 
+var dictSuggestSeq = 0;
+
+async function updateDictionarySuggestions() {
+  var list = document.getElementById("dictSuggestList");
+  if (!list) return;
+  var seq = ++dictSuggestSeq;
+  var prefix = String(els.dictQuery.value || "").trim();
+  var items = [];
+  if (prefix) {
+    try { items = (await callApi("dictionary_autocomplete", prefix, 10)).items || []; }
+    catch (_) { items = []; }
+  }
+  if (seq !== dictSuggestSeq) return;
+  list.replaceChildren.apply(list, items.map(function (item) {
+    var option = document.createElement("option");
+    option.value = item.text;
+    option.label = item.kind === "chinese" ? item.word : item.explanation;
+    return option;
+  }));
+}
+
 function bindDictionaryEvents() {
   els.dictSearchBtn.addEventListener("click", function () { runDictionarySearch(); });
   els.dictQuery.addEventListener("keydown", function (e) {
     if (e.key === "Enter") runDictionarySearch();
   });
+  els.dictQuery.addEventListener("input", updateDictionarySuggestions);
   els.dictHistoryBtn.addEventListener("click", async function () {
     state.dictionary.historyVisible = !state.dictionary.historyVisible;
     if (state.dictionary.historyVisible && els.dictHistory.childElementCount === 0) {
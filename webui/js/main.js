@@ -4,6 +4,7 @@ async function bootstrap() {
     applyFeatureFlags(ret?.features || {});
     applyWritingSettings(ret?.writing_settings || state.writing.settings);
     applyAppSettings(ret?.app_settings || state.settings);
+    applySemanticStatus(ret?.semantic_status);
     els.writingStatus.textContent = ret?.writing_status || "";
     renderDictionaryHistory(ret?.dictionary_history || []);
 
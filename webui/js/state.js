@@ -59,11 +59,11 @@ var state = {
   },
   translator: {
     direction: "zh_to_alician", lastResult: null, isBusy: false,
-    tokenOrder: [], draggedTokenIndex: null,
+    tokenOrder: [], draggedTokenIndex: null, patternsReady: false, document: null,
   },
   settings: {
     alicFont: false, alicHoverEnabled: true, alicHoverDelay: 300,
-    modelPath: "", modelAvailable: false, modelStatus: "",
+    modelPath: "", modelAvailable: false, modelStatus: "", semanticStatus: null,
   },
 };
 
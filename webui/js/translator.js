@@ -42,13 +42,17 @@ function getTranslatorTokensInDisplayOrder(payload) {
   });
 }
 
+function isTranslatorLineBreak(token) {
+  return token.method === "sentence_break" && String(token.source || "").indexOf("\n") >= 0;
+}
+
 function composeTranslatorResult(payload) {
   if (!payload) return "";
   var tokens = getTranslatorTokensInDisplayOrder(payload);
   var direction = payload.direction || "zh_to_alician";
   if (direction === "alician_to_zh") {
     return tokens.map(function (token) {
-      if (token.status === "space") return "";
+      if (token.status === "space") return isTranslatorLineBreak(token) ? "\n" : "";
       return token.target || "";
     }).join("").trim();
   }
@@ -60,6 +64,11 @@ function composeTranslatorResult(payload) {
     var target = String(token.target || "");
     if (!target) continue;
     if (status === "space") {
+      if (isTranslatorLineBreak(token)) {
+        while (out.length && out[out.length - 1] === " ") out.pop();
+        out.push("\n");
+        continue;
+      }
       if (out.length && out[out.length - 1] !== " " && out[out.length - 1] !== "\n") out.push(" ");
       continue;
     }
@@ -136,10 +145,12 @@ function renderTranslatorResult(payload) {
   els.translatorOutput.value = payload.result_text;
 
   var stats = payload.stats || {};
+  if (payload.patterns_ready === false) pollTranslatorReadiness();
   els.translatorStatus.textContent = (payload.message || "翻译完成。") +
     " 精确 " + (stats.exact || 0) +
     "，近似 " + (stats.approximate || 0) +
-    "，缺词 " + (stats.unknown || 0);
+    "，缺词 " + (stats.unknown || 0) +
+    (payload.patterns_ready === false ? "（句型库加载中，语序暂按默认规则）" : "");
 
   var rows = getTranslatorWordRows(payload);
 
@@ -339,6 +350,103 @@ function updateTranslatorPlaceholder() {
   els.translatorInput.placeholder = "输入中文自然语言，例如：升起的花";
 }
 
+var _translatorDocumentSeq = 0;
+
+function looksLikeTranslatorDocument(text) {
+  var body = text.replace(/[。！？!?；;….\s"'”’」』）)]+$/, "");
+  return /[。！？!?；;…\n]|\.\s/.test(body);
+}
+
+function translatorMessage(stats) {
+  if (stats.unknown) return "翻译完成，但仍有词未解决。";
+  if (stats.approximate) return "翻译完成，其中部分词使用了近似匹配。";
+  return "翻译完成。";
+}
+
+function mergeTranslatorSentences(sentences) {
+  var tokens = [];
+  var stats = { exact: 0, approximate: 0, unknown: 0 };
+  var direction = "zh_to_alician";
+  var patternsReady = true;
+  sentences.forEach(function (item) {
+    if (!item) return;
+    var result = item.result || {};
+    direction = item.direction || direction;
+    tokens = tokens.concat(result.tokens || []);
+    Object.keys(stats).forEach(function (key) { stats[key] += Number(result.stats?.[key] || 0); });
+    if (result.patterns_ready === false) patternsReady = false;
+    if (item.separator) {
+      tokens.push({
+        source: item.separator, target: item.separator, status: "space", method: "sentence_break",
+        confidence: 1, explanation: "", word_class: "", count: 0, variety: 0, alternatives: [], note: "",
+      });
+    }
+  });
+  return {
+    ok: true, direction: direction, tokens: tokens, stats: stats,
+    message: translatorMessage(stats), patterns_ready: patternsReady,
+  };
+}
+
+function finishTranslatorDocument(errorMessage) {
+  var doc = state.translator.document;
+  state.translator.document = null;
+  state.translator.isBusy = false;
+  els.translatorTranslateBtn.disabled = false;
+  if (errorMessage) {
+    els.translatorStatus.textContent = "翻译失败";
+    toast("翻译失败：" + errorMessage, "warn", 3600);
+    return;
+  }
+  if (doc && state.translator.lastResult) renderTranslatorResult(state.translator.lastResult);
+  saveModuleSnapshot("translator");
+}
+
+window.__translatorDocumentProgress = function (event) {
+  var doc = state.translator.document;
+  if (!doc || !event || event.job_id !== doc.jobId) return;
+  if (event.done) {
+    finishTranslatorDocument(event.error || "");
+    return;
+  }
+  doc.sentences[event.index] = event;
+  state.translator.lastResult = mergeTranslatorSentences(doc.sentences);
+  state.translator.tokenOrder = [];
+  renderTranslatorResult(state.translator.lastResult);
+  els.translatorStatus.textContent = "正在翻译 " + (event.index + 1) + "/" + event.total + " 句...";
+};
+
+async function runTranslatorDocument(text, direction) {
+  var jobId = "doc-" + Date.now() + "-" + (++_translatorDocumentSeq);
+  state.translator.document = { jobId: jobId, sentences: [] };
+  state.translator.lastResult = null;
+  state.translator.tokenOrder = [];
+  try {
+    var ret = await callApi("translator_translate_document", text, direction, jobId);
+    if (!ret || ret.ok === false) throw new Error(ret?.message || "翻译服务不可用");
+  } catch (err) {
+    if (state.translator.document?.jobId === jobId) finishTranslatorDocument(err.message);
+  }
+}
+
+var _translatorReadinessTimer = null;
+
+async function pollTranslatorReadiness() {
+  if (!state.features.translator || state.translator.patternsReady || _translatorReadinessTimer) return;
+  try {
+    var ret = await callApi("translator_status");
+    state.translator.patternsReady = Boolean(ret?.patterns_ready);
+  } catch (_) {}
+  if (!state.translator.patternsReady) {
+    _translatorReadinessTimer = setTimeout(function () {
+      _translatorReadinessTimer = null;
+      pollTranslatorReadiness();
+    }, 1500);
+  } else if (state.translator.lastResult?.patterns_ready === false && !state.translator.isBusy) {
+    els.translatorStatus.textContent = "句型库已就绪，重新翻译可按语料句型调整语序。";
+  }
+}
+
 async function runTranslator() {
   var text = String(els.translatorInput.value || "").trim();
   if (!text) {
@@ -350,6 +458,11 @@ async function runTranslator() {
   els.translatorTranslateBtn.disabled = true;
   els.translatorStatus.textContent = "正在翻译...";
   saveModuleSnapshot("translator");
+  if (looksLikeTranslatorDocument(text)) {
+    // Streams per sentence; finishTranslatorDocument clears the busy state.
+    await runTranslatorDocument(text, direction);
+    return;
+  }
   try {
     var ret = await callApi("translator_translate", text, direction);
     state.translator.lastResult = ret;
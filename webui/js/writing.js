@@ -295,9 +295,22 @@ function applyAppSettings(settings) {
     var showBtn = String(settings?.update_check_status || "") === "云端版本未变化，无需下载";
     els.forceDownloadBtn.classList.toggle("hidden", !showBtn);
   }
+  applySemanticStatus(settings?.semantic_status);
   document.body.classList.toggle("alic-font", state.settings.alicFont);
 }
 
+function applySemanticStatus(status) {
+  if (!status) return;
+  state.settings.semanticStatus = status;
+  if (!els.semanticWarmupStatus) return;
+  var text = String(status.message || "");
+  if (status.state === "indexing" && status.progress != null) {
+    text += " " + Math.round(Number(status.progress) * 100) + "%";
+  }
+  els.semanticWarmupStatus.textContent = status.state === "disabled" ? "" : text;
+  els.semanticWarmupStatus.classList.toggle("model-status-ok", Boolean(status.ready));
+}
+
 function renderExcludedWords(words) {
   var source = Array.isArray(words) ? words : [];
   var normalized = [], seen = new Set();
@@ -734,6 +747,7 @@ function bindAppSettingsEvents() {
       if (els.updateCheckStatus) {
         els.updateCheckStatus.textContent = String(ret?.update_check_status || "就绪");
       }
+      applySemanticStatus(ret?.semantic_status);
       if (els.forceDownloadBtn) {
         var showBtn = String(ret?.update_check_status || "") === "云端版本未变化，无需下载";
         els.forceDownloadBtn.classList.toggle("hidden", !showBtn);
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import os
 import re
 import sqlite3
 import sys
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 
 def _get_default_db_path() -> str:
@@ -22,6 +25,117 @@ def _quote_identifier(name: str) -> str:
     return '"' + str(name).replace('"', '""') + '"'
 
 
+# Substring search index. The FTS5 tables live in the connection's temp schema
+# so translated.db stays byte-identical (the update checker compares SHA1s).
+# Temp triggers keep them in sync with writes made on this connection; commits
+# from other connections are picked up through PRAGMA data_version.
+_SEARCH_INDEX_MIN_QUERY = 3
+_SEARCH_INDEX_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS temp.headword_fts USING fts5(words, tokenize='trigram')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS temp.sense_fts USING fts5(explanation, tokenize='trigram')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS temp.phrase_fts USING fts5(phrase, tokenize='trigram')",
+    "CREATE TEMP TRIGGER IF NOT EXISTS headword_fts_ai AFTER INSERT ON main.dictionary_headwords BEGIN "
+    "INSERT INTO headword_fts(rowid, words) VALUES (new.id, new.words); END",
+    "CREATE TEMP TRIGGER IF NOT EXISTS headword_fts_ad AFTER DELETE ON main.dictionary_headwords BEGIN "
+    "DELETE FROM headword_fts WHERE rowid = old.id; END",
+    "CREATE TEMP TRIGGER IF NOT EXISTS headword_fts_au AFTER UPDATE ON main.dictionary_headwords BEGIN "
+    "DELETE FROM headword_fts WHERE rowid = old.id; "
+    "INSERT INTO headword_fts(rowid, words) VALUES (new.id, new.words); END",
+    "CREATE TEMP TRIGGER IF NOT EXISTS sense_fts_ai AFTER INSERT ON main.dictionary BEGIN "
+    "INSERT INTO sense_fts(rowid, explanation) VALUES (new.id, new.explanation); END",
+    "CREATE TEMP TRIGGER IF NOT EXISTS sense_fts_ad AFTER DELETE ON main.dictionary BEGIN "
+    "DELETE FROM sense_fts WHERE rowid = old.id; END",
+    "CREATE TEMP TRIGGER IF NOT EXISTS sense_fts_au AFTER UPDATE ON main.dictionary BEGIN "
+    "DELETE FROM sense_fts WHERE rowid = old.id; "
+    "INSERT INTO sense_fts(rowid, explanation) VALUES (new.id, new.explanation); END",
+    "CREATE TEMP TRIGGER IF NOT EXISTS phrase_fts_ai AFTER INSERT ON main.phrase BEGIN "
+    "INSERT INTO phrase_fts(rowid, phrase) VALUES (new.id, new.PHRASE); END",
+    "CREATE TEMP TRIGGER IF NOT EXISTS phrase_fts_ad AFTER DELETE ON main.phrase BEGIN "
+    "DELETE FROM phrase_fts WHERE rowid = old.id; END",
+    "CREATE TEMP TRIGGER IF NOT EXISTS phrase_fts_au AFTER UPDATE ON main.phrase BEGIN "
+    "DELETE FROM phrase_fts WHERE rowid = old.id; "
+    "INSERT INTO phrase_fts(rowid, phrase) VALUES (new.id, new.PHRASE); END",
+)
+_HEADWORD_COLUMNS = "h.words, h.display_explanation, h.display_class"
+_HEADWORD_STATS_COLUMNS = _HEADWORD_COLUMNS + ", COALESCE(h.count, 0), COALESCE(h.variety, 0)"
+_PHRASE_COLUMNS = "p.PHRASE, p.explanation"
+_PHRASE_STATS_COLUMNS = "p.PHRASE, p.explanation, '', COALESCE(p.count, 0), COALESCE(p.variety, 0)"
+_SEARCH_INDEX_REBUILD = (
+    "DELETE FROM temp.headword_fts",
+    "INSERT INTO temp.headword_fts(rowid, words) SELECT id, words FROM main.dictionary_headwords",
+    "DELETE FROM temp.sense_fts",
+    "INSERT INTO temp.sense_fts(rowid, explanation) SELECT id, explanation FROM main.dictionary",
+    "DELETE FROM temp.phrase_fts",
+    "INSERT INTO temp.phrase_fts(rowid, phrase) SELECT id, PHRASE FROM main.phrase",
+)
+
+# Positional lyric index used by example lookup. Like the search index it is a
+# temp-schema cache; update_song_lyric re-indexes the edited song directly.
+_LYRIC_INDEX_DDL = (
+    "CREATE TABLE IF NOT EXISTS temp.lyric_tokens ("
+    "word_lower TEXT NOT NULL, song_id INTEGER NOT NULL, paragraph_no INTEGER NOT NULL, "
+    "line_no INTEGER NOT NULL, char_start INTEGER NOT NULL, char_end INTEGER NOT NULL, "
+    "is_line_start INTEGER NOT NULL, is_line_end INTEGER NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS temp.idx_lyric_tokens_word "
+    "ON lyric_tokens(word_lower, song_id, paragraph_no)",
+    "CREATE TABLE IF NOT EXISTS temp.lyric_paragraphs ("
+    "song_id INTEGER NOT NULL, paragraph_no INTEGER NOT NULL, "
+    "char_start INTEGER NOT NULL, char_end INTEGER NOT NULL, "
+    "PRIMARY KEY (song_id, paragraph_no))",
+)
+_LYRIC_TOKEN_PATTERN = re.compile(r"\w+")
+
+_CJK_RE = re.compile(r"[\u3400-\u9fff]")
+_POS_RE = re.compile(
+    r"\b(?:adj|adv|art|conj|interj|n|num|prep|pron|v|vi|vt)\.?",
+    re.IGNORECASE,
+)
+
+
+def normalize_chinese_term(raw: str) -> str:
+    term = str(raw or "").strip()
+    term = re.sub(r"[\"'“”‘’《》<>【】\[\]{}（）()]", "", term)
+    term = re.sub(r"\s+", "", term)
+    term = term.strip("。.!?？：:；;，,、")
+    if not term or not _CJK_RE.search(term):
+        return ""
+    if term in {"不译", "未找到释义"}:
+        return ""
+    if len(term) > 12:
+        return ""
+    return term
+
+
+def extract_chinese_terms(explanation: str) -> List[str]:
+    """Split a dictionary explanation into the Chinese terms it glosses."""
+    source = str(explanation or "")
+    if not source or not _CJK_RE.search(source):
+        return []
+    cleaned = re.sub(r"[（(]\s*\d+\s*[）)]", "，", source)
+    cleaned = _POS_RE.sub("，", cleaned)
+    parts = re.split(r"[,，、;；/|｜\n\r\t]+", cleaned)
+    terms: List[str] = []
+    seen = set()
+
+    def add(raw: str) -> None:
+        term = normalize_chinese_term(raw)
+        if not term or term in seen:
+            return
+        seen.add(term)
+        terms.append(term)
+
+    for part in parts:
+        add(part)
+        normalized = normalize_chinese_term(part)
+        if not normalized:
+            continue
+        if normalized.startswith("表") and len(normalized) > 2:
+            add(normalized[1:])
+        if normalized.endswith("的") and len(normalized) > 1:
+            add(normalized[:-1])
+    return terms
+
+
 class DictionaryConfig:
     REQUIRED_TABLES = {
         "dictionary": ["headword_id", "words", "explanation", "class", "sense_order"],
@@ -34,9 +148,23 @@ class DictionaryConfig:
 
 
 class HistoryManager:
-    def __init__(self, file_path: str = "search_history.json", max_records: int = 10):
+    """Search history kept in memory and written behind on a debounce timer.
+
+    Changes only mark the history dirty; a daemon timer writes the latest
+    snapshot ``flush_delay`` seconds after the first pending change, so bursts
+    of searches coalesce into one write. Call ``flush()`` before exiting.
+    """
+
+    def __init__(
+        self, file_path: str = "search_history.json", max_records: int = 10, flush_delay: float = 1.0,
+    ):
         self.file_path = file_path
         self.max_records = max_records
+        self.flush_delay = max(0.0, float(flush_delay))
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._dirty = False
+        self._timer: Optional[threading.Timer] = None
         self.history = self._load_history()
 
     def _load_history(self) -> List[str]:
@@ -50,38 +178,66 @@ class HistoryManager:
         return []
 
     def _save_history(self) -> None:
-        try:
-            with open(self.file_path, "w", encoding="utf-8") as f:
-                json.dump(self.history, f, ensure_ascii=False, indent=2)
-        except OSError:
-            pass
+        with self._lock:
+            self._dirty = True
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> None:
+        """Write pending changes now (temp file + rename, so a crash never truncates it)."""
+        # The file write happens outside _lock so searches never wait on disk;
+        # _write_lock keeps an older snapshot from landing after a newer one.
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                self._dirty = False
+                snapshot = list(self.history)
+            temp_path = f"{self.file_path}.tmp"
+            try:
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(snapshot, f, ensure_ascii=False, indent=2)
+                os.replace(temp_path, self.file_path)
+            except OSError:
+                pass
 
     def add_record(self, record: str) -> None:
         if not record.strip():
             return
-        if record in self.history:
-            self.history.remove(record)
-        self.history.insert(0, record)
-        if len(self.history) > self.max_records:
-            self.history = self.history[:self.max_records]
-        self._save_history()
+        with self._lock:
+            if record in self.history:
+                self.history.remove(record)
+            self.history.insert(0, record)
+            if len(self.history) > self.max_records:
+                self.history = self.history[:self.max_records]
+            self._save_history()
 
     def get_history(self) -> List[str]:
-        return self.history.copy()
+        with self._lock:
+            return self.history.copy()
 
     def clear_history(self) -> None:
-        self.history.clear()
-        self._save_history()
+        with self._lock:
+            self.history.clear()
+            self._save_history()
 
     def delete_record(self, record: str) -> None:
-        if record in self.history:
-            self.history.remove(record)
-            self._save_history()
+        with self._lock:
+            if record in self.history:
+                self.history.remove(record)
+                self._save_history()
 
     def delete_index(self, index: int) -> None:
-        if 0 <= index < len(self.history):
-            self.history.pop(index)
-            self._save_history()
+        with self._lock:
+            if 0 <= index < len(self.history):
+                self.history.pop(index)
+                self._save_history()
 
 
 class DatabaseHandler:
@@ -90,6 +246,10 @@ class DatabaseHandler:
         self.conn: Optional[sqlite3.Connection] = None
         self.cursor: Optional[sqlite3.Cursor] = None
         self.last_error = ""
+        self._search_index_version: Optional[int] = None
+        self._search_index_failed = False
+        self._lyric_index_version: Optional[int] = None
+        self.change_counter = 0
 
     def connect(self) -> bool:
         try:
@@ -105,6 +265,7 @@ class DatabaseHandler:
                 return False
 
             self.close()
+            self.change_counter += 1
             self.conn = sqlite3.connect(self.db_name, check_same_thread=False)
             self.conn.execute("PRAGMA cache_size = -1000")
             self.conn.execute("PRAGMA synchronous = OFF")
@@ -148,33 +309,89 @@ class DatabaseHandler:
             self.last_error = f"数据库结构验证失败: {exc}"
             return False
 
-    def search_words(
-        self, query: str, is_exact: bool
-    ) -> Tuple[List[Tuple[str, str, str]], List[Tuple[str, str, str]]]:
+    def content_version(self) -> Tuple[int, int]:
+        """Return a token that changes whenever the database content may have changed.
+
+        PRAGMA data_version only moves for commits made by other connections,
+        so writes through this handler bump change_counter as well.
+        """
         if not self.cursor:
-            return [], []
+            return -1, self.change_counter
+        try:
+            self.cursor.execute("PRAGMA data_version")
+            return int(self.cursor.fetchone()[0]), self.change_counter
+        except sqlite3.Error:
+            return -1, self.change_counter
+
+    def _ensure_search_index(self) -> bool:
+        """Create the trigram index on first use and rebuild it after external commits."""
+        if not self.cursor or not self.conn or self._search_index_failed:
+            return False
+        try:
+            self.cursor.execute("PRAGMA data_version")
+            version = int(self.cursor.fetchone()[0])
+            if self._search_index_version == version:
+                return True
+            for statement in _SEARCH_INDEX_DDL:
+                self.cursor.execute(statement)
+            for statement in _SEARCH_INDEX_REBUILD:
+                self.cursor.execute(statement)
+            # End the implicit transaction so no read lock is held on main.
+            self.conn.commit()
+            self._search_index_version = version
+            return True
+        except sqlite3.Error as exc:
+            # SQLite builds without FTS5 or the trigram tokenizer keep the LIKE scan.
+            self.last_error = f"搜索索引不可用: {exc}"
+            self._search_index_failed = True
+            return False
+
+    def _use_search_index(self, query: str) -> bool:
+        # Trigram lookups need at least three characters; shorter patterns are
+        # answered by the plain LIKE scan, which the index could not narrow anyway.
+        return len(query) >= _SEARCH_INDEX_MIN_QUERY and self._ensure_search_index()
+
+    def _query_words(
+        self, query: str, is_exact: bool, columns: str,
+    ) -> Tuple[List[Tuple], List[Tuple]]:
         if is_exact:
             self.cursor.execute(
-                "SELECT words, display_explanation, display_class FROM dictionary_headwords WHERE words = ? LIMIT 20",
+                f"SELECT {columns} FROM dictionary_headwords h WHERE h.words = ? LIMIT 20",
                 (query,),
             )
             alice_res = self.cursor.fetchall()
             self.cursor.execute(
-                "SELECT DISTINCT h.words, h.display_explanation, h.display_class "
+                f"SELECT DISTINCT {columns} "
                 "FROM dictionary d JOIN dictionary_headwords h ON h.id = d.headword_id "
                 "WHERE d.explanation = ? LIMIT 20",
                 (query,),
             )
             chinese_res = self.cursor.fetchall()
+        elif self._use_search_index(query):
+            self.cursor.execute(
+                f"SELECT {columns} "
+                "FROM headword_fts f JOIN dictionary_headwords h ON h.id = f.rowid "
+                "WHERE f.words LIKE ? ORDER BY f.rowid LIMIT 20",
+                (f"%{query}%",),
+            )
+            alice_res = self.cursor.fetchall()
+            self.cursor.execute(
+                f"SELECT DISTINCT {columns} "
+                "FROM sense_fts f JOIN dictionary d ON d.id = f.rowid "
+                "JOIN dictionary_headwords h ON h.id = d.headword_id "
+                "WHERE f.explanation LIKE ? LIMIT 20",
+                (f"%{query}%",),
+            )
+            chinese_res = self.cursor.fetchall()
         else:
             self.cursor.execute(
-                "SELECT words, display_explanation, display_class FROM dictionary_headwords "
-                "WHERE LOWER(words) LIKE LOWER(?) LIMIT 20",
+                f"SELECT {columns} FROM dictionary_headwords h "
+                "WHERE LOWER(h.words) LIKE LOWER(?) LIMIT 20",
                 (f"%{query}%",),
             )
             alice_res = self.cursor.fetchall()
             self.cursor.execute(
-                "SELECT DISTINCT h.words, h.display_explanation, h.display_class "
+                f"SELECT DISTINCT {columns} "
                 "FROM dictionary d JOIN dictionary_headwords h ON h.id = d.headword_id "
                 "WHERE LOWER(d.explanation) LIKE LOWER(?) LIMIT 20",
                 (f"%{query}%",),
@@ -182,38 +399,178 @@ class DatabaseHandler:
             chinese_res = self.cursor.fetchall()
         return alice_res, chinese_res
 
-    def search_phrases(self, query: str, is_exact: bool) -> List[Tuple[str, str]]:
-        if not self.cursor:
-            return []
+    def _query_phrases(self, query: str, is_exact: bool, columns: str) -> List[Tuple]:
         if is_exact:
             self.cursor.execute(
-                "SELECT PHRASE, explanation FROM phrase WHERE PHRASE = ? LIMIT 20",
+                f"SELECT {columns} FROM phrase p WHERE p.PHRASE = ? LIMIT 20",
                 (query,),
             )
+        elif self._use_search_index(query):
+            self.cursor.execute(
+                f"SELECT {columns} FROM phrase_fts f JOIN phrase p ON p.id = f.rowid "
+                "WHERE f.phrase LIKE ? ORDER BY f.rowid LIMIT 20",
+                (f"%{query}%",),
+            )
         else:
             self.cursor.execute(
-                "SELECT PHRASE, explanation FROM phrase WHERE LOWER(PHRASE) LIKE LOWER(?) LIMIT 20",
+                f"SELECT {columns} FROM phrase p WHERE LOWER(p.PHRASE) LIKE LOWER(?) LIMIT 20",
                 (f"%{query}%",),
             )
         return self.cursor.fetchall()
 
+    def search_words(
+        self, query: str, is_exact: bool
+    ) -> Tuple[List[Tuple[str, str, str]], List[Tuple[str, str, str]]]:
+        if not self.cursor:
+            return [], []
+        return self._query_words(query, is_exact, _HEADWORD_COLUMNS)
+
+    def search_phrases(self, query: str, is_exact: bool) -> List[Tuple[str, str]]:
+        if not self.cursor:
+            return []
+        return self._query_phrases(query, is_exact, _PHRASE_COLUMNS)
+
+    def search_entries(
+        self, query: str, is_exact: bool, is_phrase: bool = False,
+    ) -> Dict[str, List[Tuple[str, str, str, int, int]]]:
+        """Search headwords or phrases together with their count/variety stats.
+
+        Returns {"alice": rows, "chinese": rows} for words and {"phrase": rows}
+        for phrases, each row being (word, explanation, word_class, count, variety).
+        """
+        if not self.cursor:
+            return {"phrase": []} if is_phrase else {"alice": [], "chinese": []}
+        if is_phrase:
+            return {"phrase": self._query_phrases(query, is_exact, _PHRASE_STATS_COLUMNS)}
+        alice_res, chinese_res = self._query_words(query, is_exact, _HEADWORD_STATS_COLUMNS)
+        return {"alice": alice_res, "chinese": chinese_res}
+
     def get_all_words(self) -> List[Tuple[str, str]]:
         if not self.cursor:
             return []
         self.cursor.execute("SELECT words, display_explanation FROM dictionary_headwords")
         return self.cursor.fetchall()
 
-    def find_songs_with_word(self, word: str) -> List[Tuple[str, str, str]]:
+    def get_autocomplete_rows(self) -> Dict[str, List[Tuple]]:
+        """Return headword, sense and phrase rows with their count/variety stats."""
+        if not self.cursor:
+            return {"headwords": [], "senses": [], "phrases": []}
+        self.cursor.execute(
+            "SELECT words, display_explanation, COALESCE(count, 0), COALESCE(variety, 0) "
+            "FROM dictionary_headwords"
+        )
+        headwords = self.cursor.fetchall()
+        self.cursor.execute(
+            "SELECT words, explanation, COALESCE(count, 0), COALESCE(variety, 0) FROM dictionary"
+        )
+        senses = self.cursor.fetchall()
+        self.cursor.execute(
+            "SELECT PHRASE, explanation, COALESCE(count, 0), COALESCE(variety, 0) FROM phrase"
+        )
+        phrases = self.cursor.fetchall()
+        return {"headwords": headwords, "senses": senses, "phrases": phrases}
+
+    def find_songs_with_word(self, word: str) -> List[Tuple[str, str, str, int]]:
         if not self.cursor or not word:
             return []
         pattern = f"%{word}%"
         self.cursor.execute(
-            "SELECT title, lyric, Album FROM songs "
+            "SELECT title, lyric, Album, id FROM songs "
             "WHERE LOWER(lyric) LIKE LOWER(?) OR LOWER(title) LIKE LOWER(?) OR LOWER(Album) LIKE LOWER(?)",
             (pattern, pattern, pattern),
         )
         return self.cursor.fetchall()
 
+    def _ensure_lyric_index(self) -> bool:
+        """Build the positional lyric index, rebuilding it after external commits."""
+        if not self.cursor or not self.conn:
+            return False
+        try:
+            self.cursor.execute("PRAGMA data_version")
+            version = int(self.cursor.fetchone()[0])
+            if self._lyric_index_version == version:
+                return True
+            for statement in _LYRIC_INDEX_DDL:
+                self.cursor.execute(statement)
+            self.cursor.execute("DELETE FROM temp.lyric_tokens")
+            self.cursor.execute("DELETE FROM temp.lyric_paragraphs")
+            self.cursor.execute("SELECT id, lyric FROM songs")
+            for song_id, lyric in self.cursor.fetchall():
+                self._insert_lyric_index_rows(song_id, lyric)
+            self.conn.commit()
+            self._lyric_index_version = version
+            return True
+        except sqlite3.Error as exc:
+            self.last_error = f"歌词索引不可用: {exc}"
+            return False
+
+    def _insert_lyric_index_rows(self, song_id: int, lyric: Optional[str]) -> None:
+        paragraph_rows = []
+        token_rows = []
+        for paragraph_no, paragraph in enumerate(TextProcessor.split_paragraphs(lyric or "")):
+            paragraph_rows.append((song_id, paragraph_no, paragraph["start"], paragraph["end"]))
+            for line in paragraph["lines"]:
+                if line["is_annotation"]:
+                    continue
+                raw = line["raw"]
+                for match in _LYRIC_TOKEN_PATTERN.finditer(raw):
+                    token_rows.append((
+                        match.group().lower(), song_id, paragraph_no, line["line_no"],
+                        line["start"] + match.start(), line["start"] + match.end(),
+                        int(TextProcessor.is_boundary_text(raw[:match.start()])),
+                        int(TextProcessor.is_boundary_text(raw[match.end():])),
+                    ))
+        self.cursor.executemany("INSERT INTO temp.lyric_paragraphs VALUES (?, ?, ?, ?)", paragraph_rows)
+        self.cursor.executemany("INSERT INTO temp.lyric_tokens VALUES (?, ?, ?, ?, ?, ?, ?, ?)", token_rows)
+
+    def _reindex_song_lyric(self, title: str) -> None:
+        self.cursor.execute("SELECT id, lyric FROM songs WHERE title = ?", (title,))
+        for song_id, lyric in self.cursor.fetchall():
+            TextProcessor.invalidate_paragraphs(song_id)
+            if self._lyric_index_version is None:
+                continue
+            self.cursor.execute("DELETE FROM temp.lyric_tokens WHERE song_id = ?", (song_id,))
+            self.cursor.execute("DELETE FROM temp.lyric_paragraphs WHERE song_id = ?", (song_id,))
+            self._insert_lyric_index_rows(song_id, lyric)
+
+    def find_word_paragraphs(
+        self, word: str, position: str = "any",
+    ) -> Optional[List[Tuple[str, str, str, List[Tuple[int, int]], int]]]:
+        """Return (title, lyric, album, paragraph spans, song id) for songs whose lyric contains word.
+
+        Only single-token words can be answered from the index; None tells the
+        caller to fall back to scanning find_songs_with_word results.
+        """
+        if not self.cursor or not word or not _LYRIC_TOKEN_PATTERN.fullmatch(word):
+            return None
+        if not self._ensure_lyric_index():
+            return None
+        condition = {"start": " AND is_line_start = 1", "end": " AND is_line_end = 1"}.get(position, "")
+        self.cursor.execute(
+            "SELECT s.id, s.title, s.lyric, s.Album, p.char_start, p.char_end "
+            "FROM (SELECT DISTINCT song_id, paragraph_no FROM temp.lyric_tokens "
+            f"WHERE word_lower = ?{condition}) t "
+            "JOIN temp.lyric_paragraphs p ON p.song_id = t.song_id AND p.paragraph_no = t.paragraph_no "
+            "JOIN songs s ON s.id = t.song_id "
+            "ORDER BY t.song_id, t.paragraph_no",
+            (word.lower(),),
+        )
+        songs: List[Tuple[str, str, str, List[Tuple[int, int]], int]] = []
+        current_id = None
+        for song_id, title, lyric, album, start, end in self.cursor.fetchall():
+            if song_id != current_id:
+                songs.append((title, lyric, album, [], song_id))
+                current_id = song_id
+            songs[-1][3].append((start, end))
+        return songs
+
+    def get_song(self, song_id: int) -> Optional[Tuple[str, str, str]]:
+        """Return (title, album, lyric) for a song id."""
+        if not self.cursor:
+            return None
+        self.cursor.execute("SELECT title, Album, lyric FROM songs WHERE id = ?", (song_id,))
+        return self.cursor.fetchone()
+
     def update_song_lyric(self, title: str, album: str, new_lyric: str) -> bool:
         if not self.cursor or not self.conn:
             return False
@@ -228,7 +585,9 @@ class DatabaseHandler:
                     (new_lyric, title.strip()),
                 )
             if self.cursor.rowcount > 0:
+                self._reindex_song_lyric(title.strip())
                 self.conn.commit()
+                self.change_counter += 1
                 return True
             return False
         except sqlite3.Error as exc:
@@ -266,13 +625,22 @@ class DatabaseHandler:
             self.conn.close()
             self.conn = None
             self.cursor = None
+        self._search_index_version = None
+        self._lyric_index_version = None
 
 
 class TextProcessor:
     _WHITESPACE_PATTERN = re.compile(r"\s+")
     _COLON_PATTERN = re.compile(r"[：:]")
     _BOUNDARY_PUNCTUATION = re.compile(r"^[\s\.,!?;，。！？；…'\"“”‘’()（）\[\]【】<>《》—-]*$")
-    _compiled_patterns = {}
+    _PATTERN_CACHE_SIZE = 512
+    _compiled_patterns: "OrderedDict[Any, re.Pattern]" = OrderedDict()
+    _pattern_cache_lock = threading.Lock()
+    # Split lyrics keyed by (song id, lyric digest); the digest keeps an edited
+    # lyric from ever reading a stale entry even before it is invalidated.
+    _PARAGRAPH_CACHE_SIZE = 256
+    _paragraph_cache: "OrderedDict[Tuple[Any, bytes], List[dict]]" = OrderedDict()
+    _paragraph_cache_lock = threading.Lock()
 
     @staticmethod
     def normalize_text(text: str) -> str:
@@ -290,45 +658,92 @@ class TextProcessor:
     def is_annotation_line(line: str) -> bool:
         return bool(line and TextProcessor._COLON_PATTERN.search(line))
 
+    @staticmethod
+    def is_boundary_text(text: str) -> bool:
+        """Return whether text holds only whitespace and sentence punctuation."""
+        return bool(TextProcessor._BOUNDARY_PUNCTUATION.fullmatch(text))
+
     @staticmethod
     def split_paragraphs(lyric: str) -> List[dict]:
         if not lyric:
             return []
-        lines = lyric.splitlines()
         paragraphs = []
         current_lines = []
+        offset = 0
 
         def flush() -> None:
             if current_lines:
                 paragraphs.append(TextProcessor._build_paragraph(current_lines))
                 current_lines.clear()
 
-        for raw_line in lines:
+        # Pair each line with its terminated form to track character offsets.
+        for line_no, (raw_line, full_line) in enumerate(
+            zip(lyric.splitlines(), lyric.splitlines(keepends=True))
+        ):
+            line = (line_no, offset, raw_line)
+            offset += len(full_line)
             if not raw_line.strip():
                 if current_lines:
-                    current_lines.append(raw_line)
+                    current_lines.append(line)
                 continue
             if not TextProcessor.is_annotation_line(raw_line):
                 flush()
-                current_lines.append(raw_line)
+                current_lines.append(line)
             elif current_lines:
-                current_lines.append(raw_line)
+                current_lines.append(line)
 
         flush()
         return paragraphs
 
     @staticmethod
-    def _build_paragraph(lines: List[str]) -> dict:
+    def _build_paragraph(lines: List[Tuple[int, int, str]]) -> dict:
         items = []
-        for raw in lines:
+        for line_no, start, raw in lines:
             items.append(
                 {
                     "raw": raw,
                     "normalized": TextProcessor.normalize_text(raw),
                     "is_annotation": TextProcessor.is_annotation_line(raw),
+                    "line_no": line_no,
+                    "start": start,
                 }
             )
-        return {"lines": items, "text": "\n".join(item["raw"] for item in items)}
+        text = "\n".join(item["raw"] for item in items)
+        return {
+            "lines": items,
+            "text": text,
+            "normalized": TextProcessor.normalize_text(text),
+            "start": items[0]["start"],
+            "end": items[-1]["start"] + len(items[-1]["raw"]),
+        }
+
+    @classmethod
+    def get_paragraphs(cls, lyric: str, song_id: Any = None) -> List[dict]:
+        """Return split_paragraphs(lyric) from a bounded LRU; treat the result as read-only."""
+        if not lyric:
+            return []
+        key = (song_id, hashlib.blake2b(lyric.encode("utf-8"), digest_size=16).digest())
+        with cls._paragraph_cache_lock:
+            paragraphs = cls._paragraph_cache.get(key)
+            if paragraphs is not None:
+                cls._paragraph_cache.move_to_end(key)
+                return paragraphs
+        paragraphs = cls.split_paragraphs(lyric)
+        with cls._paragraph_cache_lock:
+            cls._paragraph_cache[key] = paragraphs
+            while len(cls._paragraph_cache) > cls._PARAGRAPH_CACHE_SIZE:
+                cls._paragraph_cache.popitem(last=False)
+        return paragraphs
+
+    @classmethod
+    def invalidate_paragraphs(cls, song_id: Any = None) -> None:
+        """Drop cached paragraphs for one song, or all of them when song_id is None."""
+        with cls._paragraph_cache_lock:
+            if song_id is None:
+                cls._paragraph_cache.clear()
+                return
+            for key in [key for key in cls._paragraph_cache if key[0] == song_id]:
+                del cls._paragraph_cache[key]
 
     @staticmethod
     def extract_valid_examples(lyric: str, search_word: str) -> List[str]:
@@ -339,42 +754,97 @@ class TextProcessor:
         """Return whether a whole-word match is at a sentence line boundary."""
         if position not in {"start", "end"}:
             return True
-        pattern = cls._get_compiled_pattern(word)
-        for raw_line in paragraph.splitlines():
-            if cls.is_annotation_line(raw_line):
-                continue
-            text = cls.normalize_text(raw_line)
+        texts = (
+            cls.normalize_text(raw_line) for raw_line in paragraph.splitlines()
+            if not cls.is_annotation_line(raw_line)
+        )
+        return cls._texts_match_position(texts, cls._get_compiled_pattern(word), position)
+
+    @classmethod
+    def _texts_match_position(cls, texts: Any, pattern: re.Pattern, position: str) -> bool:
+        for text in texts:
             if not text:
                 continue
             match = pattern.search(text)
             while match:
-                if position == "start" and cls._BOUNDARY_PUNCTUATION.fullmatch(text[:match.start()]):
+                if position == "start" and cls.is_boundary_text(text[:match.start()]):
                     return True
-                if position == "end" and cls._BOUNDARY_PUNCTUATION.fullmatch(text[match.end():]):
+                if position == "end" and cls.is_boundary_text(text[match.end():]):
                     return True
                 match = pattern.search(text, match.end())
         return False
 
-    @staticmethod
-    def extract_all_valid_paragraphs(lyric: str, search_word: Optional[str] = None) -> List[str]:
-        if not lyric:
-            return []
-        paragraphs = TextProcessor.split_paragraphs(lyric)
-        valid = []
-        has_search_word = bool(search_word)
-        pattern = TextProcessor._get_compiled_pattern(search_word) if has_search_word else None
+    @classmethod
+    def find_valid_paragraphs(
+        cls, lyric: str, search_word: Optional[str] = None, position: str = "any", song_id: Any = None,
+    ) -> List[dict]:
+        """Return the cached paragraph dicts (text, normalized, start, end, lines) holding search_word."""
+        if not search_word:
+            return [paragraph for paragraph in cls.get_paragraphs(lyric, song_id) if paragraph["text"].strip()]
+        return cls.find_paragraphs_for_words(lyric, [search_word], position, song_id)[search_word]
 
-        for paragraph in paragraphs:
+    @classmethod
+    def find_paragraphs_for_words(
+        cls, lyric: str, words: List[str], position: str = "any", song_id: Any = None,
+    ) -> Dict[str, List[dict]]:
+        """Return {word: valid paragraphs} for several words with one pass over each line.
+
+        Single-token words share one alternation: a whole-word match of a \\w+
+        token is a whole \\w run, so the alternatives can never overlap. Other
+        words (phrases) are still matched with their own pattern.
+        """
+        result: Dict[str, List[dict]] = {word: [] for word in words if word}
+        if not lyric or not result:
+            return result
+        tokens: Dict[str, List[str]] = {}
+        others: List[str] = []
+        for word in result:
+            if _LYRIC_TOKEN_PATTERN.fullmatch(word):
+                tokens.setdefault(word.lower(), []).append(word)
+            else:
+                others.append(word)
+        groups = tuple(sorted(tokens))
+        batch = cls._get_batch_pattern(groups) if groups else None
+        check_position = position in {"start", "end"}
+        for paragraph in cls.get_paragraphs(lyric, song_id):
             if not paragraph["text"].strip():
                 continue
-            if has_search_word and not any(
-                pattern.search(line["raw"])
-                for line in paragraph["lines"]
-                if not line["is_annotation"]
-            ):
-                continue
-            valid.append(paragraph["text"])
-        return valid
+            lines = [line for line in paragraph["lines"] if not line["is_annotation"]]
+            found = set()
+            if batch is not None:
+                present = {match.lastindex for line in lines for match in batch.finditer(line["raw"])}
+                if check_position and present:
+                    present &= cls._batch_position_hits(batch, lines, position)
+                for group in present:
+                    found.update(tokens[groups[group - 1]])
+            for word in others:
+                pattern = cls._get_compiled_pattern(word)
+                if not any(pattern.search(line["raw"]) for line in lines):
+                    continue
+                if check_position and not cls._texts_match_position(
+                    (line["normalized"] for line in lines), pattern, position,
+                ):
+                    continue
+                found.add(word)
+            for word in found:
+                result[word].append(paragraph)
+        return result
+
+    @classmethod
+    def _batch_position_hits(cls, batch: re.Pattern, lines: List[dict], position: str) -> set:
+        hits = set()
+        for line in lines:
+            text = line["normalized"]
+            for match in batch.finditer(text):
+                if position == "start" and cls.is_boundary_text(text[:match.start()]):
+                    hits.add(match.lastindex)
+                elif position == "end" and cls.is_boundary_text(text[match.end():]):
+                    hits.add(match.lastindex)
+        return hits
+
+    @staticmethod
+    def extract_all_valid_paragraphs(lyric: str, search_word: Optional[str] = None) -> List[str]:
+        return [paragraph["text"] for paragraph in TextProcessor.find_valid_paragraphs(lyric, search_word)]
 
     @staticmethod
     def find_paragraph_positions(lyric: str, paragraph: str) -> Tuple[int, int]:
@@ -383,9 +853,9 @@ class TextProcessor:
 
         target = TextProcessor.normalize_text(paragraph)
         offset = 0
-        for block in TextProcessor.split_paragraphs(lyric):
+        for block in TextProcessor.get_paragraphs(lyric):
             block_text = block["text"]
-            if TextProcessor.normalize_text(block_text) == target:
+            if block["normalized"] == target:
                 start_pos = lyric.find(block_text, offset)
                 if start_pos != -1:
                     return start_pos, start_pos + len(block_text)
@@ -398,8 +868,25 @@ class TextProcessor:
             return start_pos, start_pos + len(paragraph)
         return 0, min(len(paragraph), len(lyric))
 
+    @classmethod
+    def _cached_pattern(cls, key: Any, source: str) -> re.Pattern:
+        with cls._pattern_cache_lock:
+            pattern = cls._compiled_patterns.get(key)
+            if pattern is not None:
+                cls._compiled_patterns.move_to_end(key)
+                return pattern
+            pattern = re.compile(source, re.IGNORECASE)
+            cls._compiled_patterns[key] = pattern
+            while len(cls._compiled_patterns) > cls._PATTERN_CACHE_SIZE:
+                cls._compiled_patterns.popitem(last=False)
+            return pattern
+
     @classmethod
     def _get_compiled_pattern(cls, word: str) -> re.Pattern:
-        if word not in cls._compiled_patterns:
-            cls._compiled_patterns[word] = re.compile(r"\b" + re.escape(word) + r"\b", re.IGNORECASE)
-        return cls._compiled_patterns[word]
+        return cls._cached_pattern(word, r"\b" + re.escape(word) + r"\b")
+
+    @classmethod
+    def _get_batch_pattern(cls, words: Tuple[str, ...]) -> re.Pattern:
+        """One whole-word alternation; match.lastindex - 1 is the index into words."""
+        alternatives = "|".join(f"({re.escape(word)})" for word in words)
+        return cls._cached_pattern(words, r"\b(?:" + alternatives + r")\b")
@@ -1,37 +1,174 @@
 from __future__ import annotations
 
+import bisect
+import heapq
 import logging
 import re
 import threading
 from collections import defaultdict
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from webui_backend.build_mode import is_lite_build
-from webui_backend.dictionary_core import DatabaseHandler, DictionaryConfig, HistoryManager, TextProcessor
+from webui_backend.dictionary_core import (
+    DatabaseHandler,
+    DictionaryConfig,
+    HistoryManager,
+    TextProcessor,
+    extract_chinese_terms,
+)
+from webui_backend.search_utils import ResultCache, lev_distance, lev_ratio
 
 logger = logging.getLogger(__name__)
 
-try:
-    from Levenshtein import distance as _lev_distance
-    from Levenshtein import ratio as _lev_ratio
-except Exception:
-    from difflib import SequenceMatcher
-
-    def _lev_distance(left: str, right: str) -> int:
-        previous = list(range(len(right) + 1))
-        for left_index, left_char in enumerate(left, 1):
-            current = [left_index]
-            for right_index, right_char in enumerate(right, 1):
-                current.append(min(
-                    current[-1] + 1,
-                    previous[right_index] + 1,
-                    previous[right_index - 1] + (left_char != right_char),
-                ))
-            previous = current
-        return previous[-1]
-
-    def _lev_ratio(left: str, right: str) -> float:
-        return SequenceMatcher(None, left, right).ratio()
+# Deletion variants grow combinatorially with length; longer headwords are
+# indexed this deep and scored directly for queries allowed a larger distance.
+_SPELLING_INDEX_MAX_DEPTH = 2
+
+
+def _spelling_max_distance(length: int) -> int:
+    if length <= 4:
+        return 1
+    if length <= 8:
+        return 2
+    return max(2, round(length * 0.25))
+
+
+def _deletion_variants(word: str, depth: int) -> set:
+    variants = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {item[:i] + item[i + 1:] for item in frontier for i in range(len(item))}
+        variants |= frontier
+    return variants
+
+
+class _SpellingIndex:
+    """SymSpell-style deletion index over the casefolded dictionary headwords.
+
+    Two strings within Levenshtein distance d share a string reachable by at
+    most d deletions from each, so a lookup only scores headwords that share a
+    deletion variant with the query instead of the whole lexicon. Until
+    ``build`` has run, lookups fall back to a length-filtered scan.
+    """
+
+    def __init__(self, rows: List[Tuple[str, str]], version: Any = None, build: bool = True) -> None:
+        self.version = version
+        self.entries: List[Tuple[str, str, str]] = []
+        seen = set()
+        for word, explanation in rows:
+            word = str(word or "").strip()
+            normalized = word.casefold()
+            if not word or normalized in seen:
+                continue
+            seen.add(normalized)
+            self.entries.append((normalized, word, str(explanation or "").strip()))
+        self.words: Tuple[str, ...] = tuple(entry[0] for entry in self.entries)
+        self.max_length = max((len(word) for word in self.words), default=0)
+        self._variants: Optional[Dict[str, List[int]]] = None
+        self._deep: List[int] = []
+        if build:
+            self.adopt(self.deletion_map(self.words))
+
+    @property
+    def indexed(self) -> bool:
+        return self._variants is not None
+
+    @classmethod
+    def deletion_map(cls, words: Tuple[str, ...]) -> Tuple[Dict[str, List[int]], List[int]]:
+        """Return (variant -> headword indexes, headwords indexed below their full depth)."""
+        variants: Dict[str, List[int]] = defaultdict(list)
+        deep = []
+        for index, word in enumerate(words):
+            depth = cls._word_depth(len(word))
+            if depth > _SPELLING_INDEX_MAX_DEPTH:
+                deep.append(index)
+            for variant in _deletion_variants(word, min(depth, _SPELLING_INDEX_MAX_DEPTH)):
+                variants[variant].append(index)
+        return dict(variants), deep
+
+    def adopt(self, deletion_map: Tuple[Dict[str, List[int]], List[int]]) -> None:
+        self._variants, self._deep = deletion_map
+
+    @staticmethod
+    def _word_depth(length: int) -> int:
+        # Deepest distance any query could be allowed while still within reach
+        # of a headword of this length (queries longer than ~4/3 of it cannot).
+        return max(
+            _spelling_max_distance(query_length)
+            for query_length in range(2, 2 * length + 8)
+            if abs(query_length - length) <= _spelling_max_distance(query_length)
+        )
+
+    def lookup(self, query: str, max_distance: int) -> List[Tuple[str, str, str]]:
+        """Return (normalized, word, explanation) candidates in lexicon order."""
+        if len(query) - max_distance > self.max_length:
+            return []
+        if self._variants is None:
+            return [entry for entry in self.entries if abs(len(entry[0]) - len(query)) <= max_distance]
+        indexes = set()
+        for variant in _deletion_variants(query, max_distance):
+            indexes.update(self._variants.get(variant, ()))
+        if max_distance > _SPELLING_INDEX_MAX_DEPTH:
+            indexes.update(self._deep)
+        return [self.entries[index] for index in sorted(indexes)]
+
+
+class _AutocompleteIndex:
+    """Immutable sorted array of casefolded completions searched with bisect.
+
+    Built on the worker thread and swapped in as a whole, so lookups from the
+    UI thread never touch SQLite and need no lock.
+    """
+
+    def __init__(self, rows: Dict[str, List[Tuple]], version: Any = None) -> None:
+        self.version = version
+        self.signature = self.rows_signature(rows)
+        best: Dict[Tuple[str, str], Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+
+        def add(text: str, kind: str, word: str, explanation: str, count: int, variety: int) -> None:
+            text = str(text or "").strip()
+            if not text:
+                return
+            key = (text.casefold(), kind)
+            stats = (int(count or 0), int(variety or 0))
+            current = best.get(key)
+            if current is not None and current[0] >= stats:
+                return
+            best[key] = (stats, {
+                "text": text, "kind": kind, "word": word,
+                "explanation": str(explanation or "").strip(),
+                "count": stats[0], "variety": stats[1],
+            })
+
+        for word, explanation, count, variety in rows.get("headwords", ()):
+            add(word, "alice", str(word or "").strip(), explanation, count, variety)
+        for phrase, explanation, count, variety in rows.get("phrases", ()):
+            add(phrase, "phrase", str(phrase or "").strip(), explanation, count, variety)
+        for word, explanation, count, variety in rows.get("senses", ()):
+            for term in extract_chinese_terms(explanation):
+                add(term, "chinese", str(word or "").strip(), explanation, count, variety)
+
+        ordered = sorted(best.items(), key=lambda item: (item[0][0], item[0][1]))
+        self.keys: List[str] = [key[0] for key, _ in ordered]
+        self.items: List[Dict[str, Any]] = [item for _, (_, item) in ordered]
+        self._ranks: List[Tuple[int, int, int, str]] = [
+            (-item["count"], -item["variety"], len(item["text"]), key[0])
+            for key, (_, item) in ordered
+        ]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @staticmethod
+    def rows_signature(rows: Dict[str, List[Tuple]]) -> int:
+        return hash(tuple(tuple(rows.get(kind, ())) for kind in ("headwords", "phrases", "senses")))
+
+    def lookup(self, prefix: str, limit: int) -> List[Dict[str, Any]]:
+        start = bisect.bisect_left(self.keys, prefix)
+        # Every key sharing the prefix sorts before prefix + U+10FFFF.
+        stop = bisect.bisect_left(self.keys, prefix + "\U0010ffff", start)
+        best = heapq.nsmallest(limit, range(start, stop), key=self._ranks.__getitem__)
+        return [dict(self.items[index]) for index in best]
 
 
 class DictionaryService:
@@ -45,7 +182,13 @@ class DictionaryService:
         self.history_manager = HistoryManager()
         self.similarity_matcher = self._create_similarity_matcher() if self.enable_semantic else None
         self._similarity_index_built = False
-        self._spelling_candidates: List[Tuple[str, str]] | None = None
+        # Set while a background warm-up builds the index; searches skip
+        # semantic suggestions instead of building it a second time.
+        self._similarity_warming = False
+        self._spelling_index: _SpellingIndex | None = None
+        self._result_cache = ResultCache()
+        self._autocomplete_index: _AutocompleteIndex | None = None
+        self.refresh_autocomplete()
 
     def _create_similarity_matcher(self) -> Any:
         try:
@@ -61,50 +204,98 @@ class DictionaryService:
         if not self.db_handler.conn:
             self.db_handler.connect()
 
-    def _build_similarity_index(self) -> None:
+    def _build_similarity_index(self, word_explanation_pairs: Optional[List[Tuple[str, str]]] = None) -> None:
         if self.similarity_matcher is None:
             return
         try:
-            word_explanation_pairs = self.db_handler.get_all_words()
+            if word_explanation_pairs is None:
+                word_explanation_pairs = self.db_handler.get_all_words()
             if word_explanation_pairs:
-                self.similarity_matcher.build_index(word_explanation_pairs)
+                from webui_backend.similarity_matcher import configured_index_options
+
+                self.similarity_matcher.build_index(word_explanation_pairs, **configured_index_options())
         except Exception:
             logger.warning("构建相似度索引时发生异常", exc_info=True)
 
+    def defer_similarity_index(self) -> None:
+        """Stop searches from building the index; warm_up_similarity_index will."""
+        with self._lock:
+            if not self._similarity_index_built:
+                self._similarity_warming = True
+
+    def warm_up_similarity_index(self) -> bool:
+        """Build the similarity index without holding the service lock (any thread)."""
+        with self._lock:
+            if self.similarity_matcher is None or self._similarity_index_built:
+                self._similarity_warming = False
+                return self.semantic_ready
+            self._similarity_warming = True
+            self._ensure_connection()
+            pairs = self.db_handler.get_all_words()
+        try:
+            self._build_similarity_index(pairs)
+        finally:
+            with self._lock:
+                self._similarity_warming = False
+                self._similarity_index_built = True
+        return self.semantic_ready
+
+    @property
+    def semantic_ready(self) -> bool:
+        return self.similarity_matcher is not None and self._similarity_index_built and self.similarity_matcher.available
+
     @staticmethod
     def _is_chinese_query(query: str) -> bool:
         return re.search(r"[\u3400-\u9fff]", query or "") is not None
 
+    def _current_spelling_index(self) -> _SpellingIndex:
+        """Return the spelling index for the current headwords (service lock held).
+
+        Lyric saves and other writes move content_version without touching
+        headwords; those only refresh the explanations. New or renamed
+        headwords get a fresh deletion map built on a background thread.
+        """
+        version = self.db_handler.content_version()
+        current = self._spelling_index
+        if current is not None and current.version == version:
+            return current
+        fresh = self._spelling_index = _SpellingIndex(self.db_handler.get_all_words(), version, build=False)
+        if current is not None and current.words == fresh.words:
+            if current.indexed:
+                fresh.adopt((current._variants, current._deep))
+        else:
+            threading.Thread(
+                target=self._build_spelling_index, args=(fresh.words,), name="SpellingIndex", daemon=True,
+            ).start()
+        return fresh
+
+    def _build_spelling_index(self, words: Tuple[str, ...]) -> None:
+        try:
+            deletion_map = _SpellingIndex.deletion_map(words)
+        except Exception:
+            logger.warning("构建拼写索引时发生异常", exc_info=True)
+            return
+        with self._lock:
+            current = self._spelling_index
+            if current is not None and current.words == words and not current.indexed:
+                current.adopt(deletion_map)
+
     def _find_spelling_suggestions(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         normalized_query = (query or "").strip().casefold()
         if len(normalized_query) < 2:
             return []
-        if self._spelling_candidates is None:
-            self._spelling_candidates = [
-                (str(word or "").strip(), str(explanation or "").strip())
-                for word, explanation in self.db_handler.get_all_words()
-                if str(word or "").strip()
-            ]
+        spelling_index = self._current_spelling_index()
 
         query_length = len(normalized_query)
-        if query_length <= 4:
-            max_distance = 1
-        elif query_length <= 8:
-            max_distance = 2
-        else:
-            max_distance = max(2, round(query_length * 0.25))
-
+        max_distance = _spelling_max_distance(query_length)
         ranked: List[Tuple[int, float, str, str]] = []
-        seen = set()
-        for word, explanation in self._spelling_candidates:
-            normalized_word = word.casefold()
-            if normalized_word in seen or abs(len(normalized_word) - query_length) > max_distance:
+        for normalized_word, word, explanation in spelling_index.lookup(normalized_query, max_distance):
+            if abs(len(normalized_word) - query_length) > max_distance:
                 continue
-            seen.add(normalized_word)
-            distance = int(_lev_distance(normalized_query, normalized_word))
+            distance = int(lev_distance(normalized_query, normalized_word))
             if distance == 0 or distance > max_distance:
                 continue
-            ranked.append((distance, float(_lev_ratio(normalized_query, normalized_word)), word, explanation))
+            ranked.append((distance, float(lev_ratio(normalized_query, normalized_word)), word, explanation))
 
         ranked.sort(key=lambda item: (item[0], -item[1], abs(len(item[2]) - query_length), item[2].casefold()))
         return [
@@ -118,6 +309,16 @@ class DictionaryService:
             for distance, similarity, word, explanation in ranked[:max(1, int(top_k))]
         ]
 
+    @staticmethod
+    def _build_entries(rows: List[Tuple[str, str, str, int, int]], kind: str) -> List[Dict[str, Any]]:
+        return [
+            {
+                "word": word, "explanation": explanation, "word_class": word_class,
+                "kind": kind, "count": count, "variety": variety,
+            }
+            for word, explanation, word_class, count, variety in rows
+        ]
+
     def search(
         self, query: str, exact_match: bool = False, position_filter: str = "any",
     ) -> Dict[str, Any]:
@@ -128,82 +329,115 @@ class DictionaryService:
                 "is_phrase": False, "sections": [], "message": "请输入要查询的词。",
                 "suggestions": [],
             }
+        position_filter = position_filter if position_filter in {"start", "end"} else "any"
         with self._lock:
             self._ensure_connection()
-            effective_exact = bool(exact_match)
-            is_phrase = re.match(r"^\w+(\s+\w+)+$", normalized_query) is not None
-            sections: List[Dict[str, Any]] = []
-            if is_phrase:
-                phrase_rows = self.db_handler.search_phrases(normalized_query, effective_exact)
-                phrase_entries = []
-                for phrase, explanation in phrase_rows:
-                    stats = self.db_handler.get_phrase_stats(phrase, effective_exact) or (0, 0)
-                    phrase_entries.append({
-                        "word": phrase, "explanation": explanation, "word_class": "",
-                        "kind": "phrase", "count": stats[0], "variety": stats[1],
-                    })
-                if phrase_entries:
-                    sections.append({
-                        "title": "爱丽丝语词组 -> 中文", "kind": "phrase", "entries": phrase_entries,
-                    })
-            else:
-                alice_rows, chinese_rows = self.db_handler.search_words(normalized_query, effective_exact)
-                alice_entries = []
-                for word, explanation, word_class in alice_rows:
-                    stats = self.db_handler.get_word_stats(word, effective_exact) or (0, 0)
-                    alice_entries.append({
-                        "word": word, "explanation": explanation, "word_class": word_class,
-                        "kind": "alice", "count": stats[0], "variety": stats[1],
-                    })
-                chinese_entries = []
-                for word, explanation, word_class in chinese_rows:
-                    stats = self.db_handler.get_word_stats(word, effective_exact) or (0, 0)
-                    chinese_entries.append({
-                        "word": word, "explanation": explanation, "word_class": word_class,
-                        "kind": "chinese", "count": stats[0], "variety": stats[1],
-                    })
-                if alice_entries:
-                    sections.append({"title": "爱丽丝语 -> 中文", "kind": "alice", "entries": alice_entries})
-                if chinese_entries:
-                    sections.append({"title": "中文 -> 爱丽丝语", "kind": "chinese", "entries": chinese_entries})
+            # Results found before the semantic index was ready lack its
+            # suggestions. The version stays shared with get_examples, since
+            # ResultCache drops everything whenever it changes.
+            key = ("search", normalized_query, bool(exact_match), position_filter, self._similarity_index_built)
+            version = self.db_handler.content_version()
+            self._refresh_autocomplete_for(version)
+            result = self._result_cache.get(key, version)
+            if result is None:
+                result = self._search_uncached(normalized_query, bool(exact_match), position_filter)
+                self._result_cache.put(key, result)
             self.history_manager.add_record(normalized_query)
-            context_examples: Dict[str, Any] | None = None
-            suggestions: List[Dict[str, Any]] = []
-            if self.enable_fuzzy and not sections and not is_phrase:
-                if self._is_chinese_query(normalized_query):
-                    if self.similarity_matcher is not None and not self._similarity_index_built:
+            return {**result, "history": self.history_manager.get_history()}
+
+    def _search_uncached(
+        self, normalized_query: str, effective_exact: bool, position_filter: str,
+    ) -> Dict[str, Any]:
+        is_phrase = re.match(r"^\w+(\s+\w+)+$", normalized_query) is not None
+        sections: List[Dict[str, Any]] = []
+        if is_phrase:
+            rows = self.db_handler.search_entries(normalized_query, effective_exact, is_phrase=True)
+            phrase_entries = self._build_entries(rows["phrase"], "phrase")
+            if phrase_entries:
+                sections.append({
+                    "title": "爱丽丝语词组 -> 中文", "kind": "phrase", "entries": phrase_entries,
+                })
+        else:
+            rows = self.db_handler.search_entries(normalized_query, effective_exact)
+            alice_entries = self._build_entries(rows["alice"], "alice")
+            chinese_entries = self._build_entries(rows["chinese"], "chinese")
+            if alice_entries:
+                sections.append({"title": "爱丽丝语 -> 中文", "kind": "alice", "entries": alice_entries})
+            if chinese_entries:
+                sections.append({"title": "中文 -> 爱丽丝语", "kind": "chinese", "entries": chinese_entries})
+        context_examples: Dict[str, Any] | None = None
+        suggestions: List[Dict[str, Any]] = []
+        semantic_pending = False
+        if self.enable_fuzzy and not sections and not is_phrase:
+            if self._is_chinese_query(normalized_query):
+                if self.similarity_matcher is not None and not self._similarity_index_built:
+                    if self._similarity_warming:
+                        semantic_pending = True
+                    else:
                         self._build_similarity_index()
                         self._similarity_index_built = True
-                    if self.similarity_matcher is not None:
-                        suggestions = self.similarity_matcher.find_similar(normalized_query)
-                else:
-                    context_examples = self._get_examples_payload(normalized_query, position_filter)
-                    if context_examples.get("examples"):
-                        sections.append({
-                            "title": "上下文命中（词典未收录）",
+                if self.similarity_matcher is not None and not semantic_pending:
+                    suggestions = self.similarity_matcher.find_similar(normalized_query)
+            else:
+                context_examples = self._get_examples_payload(normalized_query, position_filter)
+                if context_examples.get("examples"):
+                    sections.append({
+                        "title": "上下文命中（词典未收录）",
+                        "kind": "context",
+                        "entries": [{
+                            "word": normalized_query,
+                            "explanation": "词典中未收录该词，但在歌词上下文中找到了匹配。",
+                            "word_class": "未收录词",
                             "kind": "context",
-                            "entries": [{
-                                "word": normalized_query,
-                                "explanation": "词典中未收录该词，但在歌词上下文中找到了匹配。",
-                                "word_class": "未收录词",
-                                "kind": "context",
-                                "count": context_examples.get("total_after", 0),
-                                "variety": len(context_examples.get("song_stats", [])),
-                            }],
-                        })
-                    suggestions = self._find_spelling_suggestions(normalized_query)
-            return {
-                "ok": True, "query": normalized_query, "exact_match": effective_exact,
-                "is_phrase": is_phrase, "sections": sections,
-                "history": self.history_manager.get_history(),
-                "message": "" if sections else f"未搜索到对应单词：'{normalized_query}'。",
-                "suggestions": suggestions,
-                "context_examples": context_examples,
-                "features": {
-                    "fuzzy_search": self.enable_fuzzy,
-                    "semantic_search": self.enable_semantic,
-                },
-            }
+                            "count": context_examples.get("total_after", 0),
+                            "variety": len(context_examples.get("song_stats", [])),
+                        }],
+                    })
+                suggestions = self._find_spelling_suggestions(normalized_query)
+        return {
+            "ok": True, "query": normalized_query, "exact_match": effective_exact,
+            "is_phrase": is_phrase, "sections": sections,
+            "message": "" if sections else f"未搜索到对应单词：'{normalized_query}'。" + (
+                "语义模型正在后台加载，稍后重试可获得词义相似推荐。" if semantic_pending else ""
+            ),
+            "suggestions": suggestions,
+            "context_examples": context_examples,
+            "features": {
+                "fuzzy_search": self.enable_fuzzy,
+                "semantic_search": self.enable_semantic,
+            },
+        }
+
+    def refresh_autocomplete(self) -> None:
+        """Rebuild the completion index if the database moved (worker thread only)."""
+        with self._lock:
+            self._ensure_connection()
+            self._refresh_autocomplete_for(self.db_handler.content_version())
+
+    def _refresh_autocomplete_for(self, version: Any) -> None:
+        current = self._autocomplete_index
+        if current is not None and current.version == version:
+            return
+        try:
+            rows = self.db_handler.get_autocomplete_rows()
+            if current is not None and current.signature == _AutocompleteIndex.rows_signature(rows):
+                # Lyric saves move the version without touching completion rows.
+                current.version = version
+                return
+            self._autocomplete_index = _AutocompleteIndex(rows, version)
+        except Exception:
+            logger.warning("构建自动补全索引时发生异常", exc_info=True)
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> Dict[str, Any]:
+        normalized_prefix = (prefix or "").strip().casefold()
+        index = self._autocomplete_index
+        if not normalized_prefix or index is None:
+            return {"ok": index is not None, "prefix": normalized_prefix, "items": []}
+        try:
+            limit = max(1, min(50, int(limit)))
+        except (TypeError, ValueError):
+            limit = 10
+        return {"ok": True, "prefix": normalized_prefix, "items": index.lookup(normalized_prefix, limit)}
 
     def get_history(self) -> List[str]:
         with self._lock:
@@ -213,43 +447,83 @@ class DictionaryService:
         normalized_word = (word or "").strip()
         if not normalized_word:
             return {
-                "ok": False, "word": "", "examples": [], "song_stats": [],
+                "ok": False, "word": "", "songs": {}, "examples": [], "song_stats": [],
                 "total_before": 0, "total_after": 0, "deduplication_rate": 0,
                 "message": "请输入要查询例句的词。",
             }
+        position_filter = position_filter if position_filter in {"start", "end"} else "any"
         with self._lock:
             self._ensure_connection()
-            return self._get_examples_payload(normalized_word, position_filter)
+            key = ("examples", normalized_word, position_filter)
+            version = self.db_handler.content_version()
+            self._refresh_autocomplete_for(version)
+            payload = self._result_cache.get(key, version)
+            if payload is None:
+                payload = self._get_examples_payload(normalized_word, position_filter)
+                self._result_cache.put(key, payload)
+            return payload
+
+    def invalidate_cache(self) -> None:
+        """Drop cached results after a write made outside this service."""
+        with self._lock:
+            self._result_cache.clear()
+
+    def cache_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return self._result_cache.stats()
 
     def _get_examples_payload(self, word: str, position_filter: str = "any") -> Dict[str, Any]:
         position_filter = position_filter if position_filter in {"start", "end"} else "any"
-        songs = self.db_handler.find_songs_with_word(word)
-        examples, song_stats = self._process_and_deduplicate_examples(songs, word, position_filter)
+        indexed_songs = self.db_handler.find_word_paragraphs(word, position_filter)
+        if indexed_songs is not None:
+            examples, song_stats = self._deduplicate_indexed_examples(indexed_songs)
+        else:
+            songs = self.db_handler.find_songs_with_word(word)
+            examples, song_stats = self._process_and_deduplicate_examples(songs, word, position_filter)
         valid_stats = {k: v for k, v in song_stats.items() if v["before"] > 0}
         total_before = sum(v["before"] for v in valid_stats.values())
         total_after = len(examples)
         dedup_rate = ((total_before - total_after) / total_before * 100) if total_before > 0 else 0
+        # Examples reference a songs table by id; the UI fetches a lyric through
+        # get_song_lyric only when the context view is opened.
+        payload_songs: Dict[int, Dict[str, str]] = {}
         payload_examples = []
         for index, example in enumerate(examples):
-            lyric = example["lyric"]
-            paragraph = example["paragraph"]
-            start_pos, end_pos = TextProcessor.find_paragraph_positions(lyric, paragraph)
+            song_id = example["song_id"]
+            if song_id not in payload_songs:
+                payload_songs[song_id] = {"title": example["title"], "album": example["album"]}
             payload_examples.append({
-                "id": index, "paragraph": paragraph, "title": example["title"],
-                "album": example["album"], "lyric": lyric, "start": start_pos, "end": end_pos,
+                "id": index, "song_id": song_id, "paragraph": example["paragraph"],
+                "start": example["start"], "end": example["end"],
             })
         payload_stats = [
             {"album": album, "title": title, "before": stats["before"], "after": stats["after"]}
             for (album, title), stats in sorted(valid_stats.items())
         ]
         return {
-            "ok": True, "word": word, "examples": payload_examples,
+            "ok": True, "word": word, "songs": payload_songs, "examples": payload_examples,
             "position_filter": position_filter,
             "song_stats": payload_stats, "total_before": total_before, "total_after": total_after,
             "deduplication_rate": round(dedup_rate, 2),
             "message": "" if payload_examples else f"未找到包含 '{word}' 的例句。",
         }
 
+    def get_song_lyric(self, song_id: int) -> Dict[str, Any]:
+        try:
+            song_id = int(song_id)
+        except (TypeError, ValueError):
+            return {"ok": False, "song_id": song_id, "message": "无效的歌曲编号。"}
+        with self._lock:
+            self._ensure_connection()
+            row = self.db_handler.get_song(song_id)
+        if row is None:
+            return {"ok": False, "song_id": song_id, "message": "未找到该歌曲。"}
+        title, album, lyric = row
+        return {
+            "ok": True, "song_id": song_id, "title": (title or "").strip(),
+            "album": (album or "").strip(), "lyric": lyric or "",
+        }
+
     def update_song_lyric(self, title: str, album: str, new_lyric: str) -> Dict[str, Any]:
         normalized_title = (title or "").strip()
         normalized_album = (album or "").strip()
@@ -259,39 +533,61 @@ class DictionaryService:
         with self._lock:
             self._ensure_connection()
             success = self.db_handler.update_song_lyric(normalized_title, normalized_album, lyric)
+            if success:
+                self.refresh_autocomplete()
             return {"ok": bool(success), "message": "歌词已保存。" if success else "保存失败，请检查数据库状态。"}
 
+    def _deduplicate_indexed_examples(
+        self, songs: List[Tuple[str, str, str, List[Tuple[int, int]], int]],
+    ) -> Tuple[List[Dict[str, Any]], Dict[Tuple[str, str], Dict[str, int]]]:
+        unique_examples: List[Dict[str, Any]] = []
+        seen_examples = set()
+        song_stats: Dict[Tuple[str, str], Dict[str, int]] = defaultdict(lambda: {"before": 0, "after": 0})
+        for title, lyric, album, spans, song_id in songs:
+            if not title or not album:
+                continue
+            stripped_album = album.strip()
+            stripped_title = title.strip()
+            after_count = 0
+            for start, end in spans:
+                paragraph = lyric[start:end]
+                example_id = (TextProcessor.normalize_text(paragraph), stripped_album, stripped_title)
+                if example_id in seen_examples:
+                    continue
+                seen_examples.add(example_id)
+                unique_examples.append({
+                    "paragraph": paragraph, "title": stripped_title, "album": stripped_album,
+                    "song_id": song_id, "start": start, "end": end,
+                })
+                after_count += 1
+            song_stats[(stripped_album, stripped_title)] = {"before": len(spans), "after": after_count}
+        return unique_examples, song_stats
+
     def _process_and_deduplicate_examples(
-        self, songs: List[Tuple[str, str, str]], word: str, position_filter: str = "any",
-    ) -> Tuple[List[Dict[str, str]], Dict[Tuple[str, str], Dict[str, int]]]:
-        unique_examples: List[Dict[str, str]] = []
+        self, songs: List[Tuple[str, str, str, int]], word: str, position_filter: str = "any",
+    ) -> Tuple[List[Dict[str, Any]], Dict[Tuple[str, str], Dict[str, int]]]:
+        unique_examples: List[Dict[str, Any]] = []
         seen_examples = set()
         song_stats: Dict[Tuple[str, str], Dict[str, int]] = defaultdict(lambda: {"before": 0, "after": 0})
-        for title, lyric, album in songs:
+        for title, lyric, album, song_id in songs:
             if not title or not album:
                 continue
             stripped_album = album.strip()
             stripped_title = title.strip()
             song_key = (stripped_album, stripped_title)
-            raw_paragraphs = TextProcessor.extract_valid_examples(lyric, word)
-            if position_filter != "any":
-                raw_paragraphs = [
-                    paragraph for paragraph in raw_paragraphs
-                    if TextProcessor.matches_position(paragraph, word, position_filter)
-                ]
-            before_count = len(raw_paragraphs)
+            paragraphs = TextProcessor.find_valid_paragraphs(lyric, word, position_filter, song_id)
+            before_count = len(paragraphs)
             if before_count == 0:
                 continue
             after_count = 0
-            for paragraph in raw_paragraphs:
-                normalized_paragraph = TextProcessor.normalize_text(paragraph)
-                example_id = (normalized_paragraph, stripped_album, stripped_title)
+            for paragraph in paragraphs:
+                example_id = (paragraph["normalized"], stripped_album, stripped_title)
                 if example_id in seen_examples:
                     continue
                 seen_examples.add(example_id)
                 unique_examples.append({
-                    "paragraph": paragraph, "title": stripped_title,
-                    "album": stripped_album, "lyric": lyric,
+                    "paragraph": paragraph["text"], "title": stripped_title, "album": stripped_album,
+                    "song_id": song_id, "start": paragraph["start"], "end": paragraph["end"],
                 })
                 after_count += 1
             song_stats[song_key]["before"] = before_count
@@ -300,4 +596,7 @@ class DictionaryService:
 
     def close(self) -> None:
         with self._lock:
+            self.history_manager.flush()
             self.db_handler.close()
+            if self.similarity_matcher is not None:
+                self.similarity_matcher.close()
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+try:
+    from Levenshtein import distance as lev_distance
+    from Levenshtein import ratio as lev_ratio
+except Exception:
+    from difflib import SequenceMatcher
+
+    def lev_distance(left: str, right: str) -> int:
+        previous = list(range(len(right) + 1))
+        for left_index, left_char in enumerate(left, 1):
+            current = [left_index]
+            for right_index, right_char in enumerate(right, 1):
+                current.append(min(
+                    current[-1] + 1,
+                    previous[right_index] + 1,
+                    previous[right_index - 1] + (left_char != right_char),
+                ))
+            previous = current
+        return previous[-1]
+
+    def lev_ratio(left: str, right: str) -> float:
+        return SequenceMatcher(None, left, right).ratio()
+
+
+class ResultCache:
+    """Bounded LRU of service results, dropped whenever the DB version moves."""
+
+    def __init__(self, max_size: int = 128) -> None:
+        self.max_size = max(1, int(max_size))
+        self._items: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._version: Any = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, version: Any) -> Optional[Dict[str, Any]]:
+        if version != self._version:
+            self._items.clear()
+            self._version = version
+        value = self._items.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Dict[str, Any]) -> None:
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits, "misses": self.misses,
+            "size": len(self._items), "max_size": self.max_size,
+        }
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_THREAD_PRIORITY_BELOW_NORMAL = -1
+_STATUS_MESSAGES = {
+    "disabled": "Lite 版不使用语义模型。",
+    "pending": "语义模型等待后台加载。",
+    "loading_model": "正在后台加载语义模型...",
+    "indexing": "正在后台构建语义索引...",
+    "ready": "语义模型已就绪。",
+    "unavailable": "语义模型不可用，已跳过词义相似推荐。",
+    "failed": "语义模型后台加载失败，已跳过词义相似推荐。",
+}
+
+
+def _lower_thread_priority() -> None:
+    """Best effort: run the calling thread below normal OS priority."""
+    try:
+        if os.name == "nt":
+            import ctypes
+
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), _THREAD_PRIORITY_BELOW_NORMAL)
+        elif sys.platform.startswith("linux"):
+            # Linux accepts a thread id here and renices only that thread.
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+    except Exception:
+        pass
+
+
+class SemanticWarmup:
+    """Loads the text2vec model and builds the similarity indexes off the worker thread.
+
+    Services are told to defer their lazy index build first, so a search that
+    arrives meanwhile returns without semantic suggestions instead of waiting
+    for the model on the worker thread.
+    """
+
+    def __init__(self, enabled: bool, delay: float = 0.5) -> None:
+        self._lock = threading.Lock()
+        self._enabled = bool(enabled)
+        self._delay = max(0.0, float(delay))
+        self._thread: Optional[threading.Thread] = None
+        self._state = "pending" if self._enabled else "disabled"
+        self._progress = 0.0
+        self.done = threading.Event()
+        if not self._enabled:
+            self.done.set()
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._state,
+                "ready": self._state == "ready",
+                "progress": round(self._progress, 2),
+                "message": _STATUS_MESSAGES[self._state],
+            }
+
+    def start(self, worker_ready: threading.Event, services: Callable[[], List[Any]]) -> bool:
+        with self._lock:
+            if not self._enabled or self._thread is not None:
+                return False
+            self._thread = threading.Thread(
+                target=self._run, args=(worker_ready, services), name="SemanticWarmup", daemon=True,
+            )
+            self._thread.start()
+        return True
+
+    def _set_state(self, state: str, progress: Optional[float] = None) -> None:
+        with self._lock:
+            self._state = state
+            if progress is not None:
+                self._progress = progress
+
+    def _run(self, worker_ready: threading.Event, services: Callable[[], List[Any]]) -> None:
+        _lower_thread_priority()
+        try:
+            worker_ready.wait()
+            targets = [service for service in services() if service is not None]
+            if not targets:
+                self._set_state("unavailable", 1.0)
+                return
+            for service in targets:
+                service.defer_similarity_index()
+            # Let the first UI calls through before the model competes for CPU.
+            time.sleep(self._delay)
+            self._set_state("loading_model", 0.0)
+            from webui_backend.similarity_matcher import get_semantic_engine
+
+            model_ready = get_semantic_engine().ensure_model()
+            self._set_state("indexing", 1.0 / (len(targets) + 1))
+            available = False
+            for done, service in enumerate(targets, 2):
+                # Still called without a model so the deferral is lifted.
+                available = service.warm_up_similarity_index() or available
+                self._set_state("indexing", done / (len(targets) + 1))
+            self._set_state("ready" if model_ready and available else "unavailable", 1.0)
+        except Exception:
+            logger.warning("语义模型后台预热失败", exc_info=True)
+            self._set_state("failed", 1.0)
+        finally:
+            self.done.set()
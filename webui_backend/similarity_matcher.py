@@ -1,16 +1,44 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
+import math
 import os
 import site
 import sys
-from typing import Any, Dict, List, Tuple
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 _EXTERNAL_PATH_ENV = "ALICIAN_EXTERNAL_LIB_PATH"
 _MODEL_PATH_ENV = "ALICIAN_TEXT2VEC_MODEL_PATH"
 _BUNDLED_MODEL_DIR = "text2vec_model"
+_EMBEDDING_CACHE_ENV = "ALICIAN_EMBEDDING_CACHE_PATH"
+_STORAGE_ENV = "ALICIAN_EMBEDDING_STORAGE"
+_SEARCH_ENV = "ALICIAN_SIMILARITY_SEARCH"
+# Cached rows are kept for every explanation ever encoded; once they outnumber
+# the explanations being indexed by this factor the cache is rewritten.
+_EMBEDDING_CACHE_MAX_GROWTH = 4
+# float32 keeps the matrix as encoded; float16 and int8 (per-row scale) trade
+# a little precision for 2x / 4x less memory and rescore their best
+# candidates against the float32 cache file when it is memory-mapped.
+# NumPy has no float16 BLAS and widens float16 slowly, so float16 only saves
+# memory: it scores about 10x slower than float32, int8 about 2.5x.
+STORAGE_MODES = ("float32", "float16", "int8")
+_RESCORE_FACTOR = 4
+_SCORE_CHUNK_ROWS = 1024
+# "ivf" groups a matcher's rows into about sqrt(n) k-means lists and scans only
+# the lists nearest to the query. Below _IVF_MIN_ROWS brute force is faster.
+SEARCH_MODES = ("flat", "ivf")
+_IVF_MIN_ROWS = 4096
+_IVF_NPROBE = 8
+_IVF_TRAIN_ITERATIONS = 12
+_IVF_TRAIN_ROWS_PER_LIST = 64
+_IVF_KEPT_FILES = 8
 
 
 def _add_optional_dependency_paths() -> None:
@@ -104,86 +132,603 @@ def _load_optional_dependencies() -> bool:
     return True
 
 
-class SimilarityMatcher:
+def _embedding_cache_dir() -> str:
+    configured_path = os.environ.get(_EMBEDDING_CACHE_ENV, "").strip()
+    if configured_path:
+        return configured_path
+    try:
+        from model_manager import default_embedding_cache_path
+    except Exception:
+        return ""
+    return default_embedding_cache_path()
+
+
+def configured_index_options() -> Dict[str, str]:
+    """Storage and search modes the app passes to build_index; float32/flat unless overridden.
+
+    float32 stays the default because it is also the fastest to score.
+    """
+    options = {"storage": "float32", "search": "flat"}
+    for name, env_name, modes in (("storage", _STORAGE_ENV, STORAGE_MODES), ("search", _SEARCH_ENV, SEARCH_MODES)):
+        value = os.environ.get(env_name, "").strip().lower()
+        if value in modes:
+            options[name] = value
+        elif value:
+            logger.warning(f"忽略无效的 {env_name}: {value}")
+    return options
+
+
+def _model_revision() -> str:
+    try:
+        from model_manager import MODEL_REVISION
+    except Exception:
+        return ""
+    return MODEL_REVISION
+
+
+def _explanation_hash(explanation: str) -> str:
+    return hashlib.sha1(explanation.encode("utf-8")).hexdigest()
+
+
+class _EmbeddingCache:
+    """Normalized float32 embeddings on disk, one row per explanation hash.
+
+    ``manifest.json`` lists the row hashes and names the ``.npy`` data file.
+    Every write goes to a new data file, so a matrix another matcher still
+    has memory-mapped is never replaced underneath it. A ``namespace`` gets
+    its own subdirectory, so compacting one corpus never drops another's rows.
+    """
+
+    def __init__(self, directory: str, revision: str, namespace: str = "") -> None:
+        self.revision = revision
+        self.directory = os.path.join(directory, revision, namespace) if namespace else os.path.join(directory, revision)
+        self._manifest_path = os.path.join(self.directory, "manifest.json")
+
+    def load(self) -> Tuple[List[str], Any]:
+        try:
+            with open(self._manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("revision") != self.revision:
+                return [], None
+            hashes = [str(item) for item in manifest["hashes"]]
+            matrix = _NP.load(os.path.join(self.directory, manifest["file"]), mmap_mode="r")
+        except FileNotFoundError:
+            return [], None
+        except Exception as e:
+            logger.warning(f"向量缓存读取失败，将重新编码: {e}")
+            return [], None
+        if matrix.ndim != 2 or matrix.shape[0] != len(hashes) or matrix.dtype != _NP.float32:
+            return [], None
+        return hashes, matrix
+
+    def store(self, hashes: List[str], matrix: Any) -> Any:
+        """Write ``matrix`` under a new file name and return it memory-mapped."""
+        os.makedirs(self.directory, exist_ok=True)
+        file_name = f"embeddings-{uuid.uuid4().hex}.npy"
+        _NP.save(os.path.join(self.directory, file_name), _NP.ascontiguousarray(matrix, dtype=_NP.float32))
+        temp_path = self._manifest_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"revision": self.revision, "file": file_name, "hashes": hashes}, f)
+        os.replace(temp_path, self._manifest_path)
+        for name in os.listdir(self.directory):
+            if name.startswith("embeddings-") and name != file_name:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    # Still mapped by another matcher (Windows); removed next time.
+                    pass
+        return _NP.load(os.path.join(self.directory, file_name), mmap_mode="r")
+
+    def load_ivf(self, key: str) -> Optional[Tuple[Any, Any]]:
+        path = os.path.join(self.directory, f"ivf-{key}.npz")
+        try:
+            with _NP.load(path) as data:
+                centroids, assignments = data["centroids"], data["assignments"]
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"IVF 索引读取失败，将重新训练: {e}")
+            return None
+        try:
+            # The newest files survive pruning in store_ivf.
+            os.utime(path)
+        except OSError:
+            pass
+        return centroids, assignments
+
+    def store_ivf(self, key: str, centroids: Any, assignments: Any) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"ivf-{key}.npz")
+        with open(path + ".tmp", "wb") as f:
+            _NP.savez(f, centroids=centroids, assignments=assignments)
+        os.replace(path + ".tmp", path)
+        stored = sorted(
+            (os.path.join(self.directory, name) for name in os.listdir(self.directory)
+             if name.startswith("ivf-") and name.endswith(".npz")),
+            key=os.path.getmtime, reverse=True,
+        )
+        for stale in stored[_IVF_KEPT_FILES:]:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+
+def _model_bytes(model: Any) -> int:
+    # SentenceModel keeps the transformer in ``bert``; count its parameters.
+    module = getattr(model, "bert", model)
+    try:
+        return int(sum(param.numel() * param.element_size() for param in module.parameters()))
+    except Exception:
+        return 0
+
+
+def _quantize(embeddings: Any, storage: str) -> Tuple[Any, Any]:
+    """Return (stored matrix, per-row scales or None) for a storage mode."""
+    if storage == "float32":
+        return embeddings, None
+    if storage == "float16":
+        return _NP.asarray(embeddings, dtype=_NP.float16), None
+    peaks = _NP.abs(embeddings).max(axis=1) if len(embeddings) else _NP.zeros(0, dtype=_NP.float32)
+    scales = (_NP.maximum(peaks, 1e-12) / 127.0).astype(_NP.float32)
+    return _NP.rint(embeddings / scales[:, None]).astype(_NP.int8), scales
+
+
+@dataclass(frozen=True)
+class _IndexData:
+    """One published version of a shared index; ``stored`` row i embeds explanations[i]."""
+
+    explanations: Tuple[str, ...] = ()
+    stored: Any = None
+    scales: Any = None
+    # The float32 matrix when it is stored or memory-mapped, else None.
+    source: Any = None
+
+    @property
+    def nbytes(self) -> int:
+        if self.stored is None:
+            return 0
+        return int(self.stored.nbytes) + (int(self.scales.nbytes) if self.scales is not None else 0)
+
+    def dequantize(self, rows: Any) -> Any:
+        """float32 copies of the stored ``rows``."""
+        vectors = self.stored[rows].astype(_NP.float32, copy=False)
+        if self.scales is not None:
+            vectors *= self.scales[rows, None]
+        return vectors
+
+
+class _SharedIndex:
+    """Embedding rows for every explanation registered against one cache directory."""
+
+    def __init__(self, cache: Optional[_EmbeddingCache], storage: str) -> None:
+        self.cache = cache
+        self.storage = storage
+        # ``rows`` and ``refs`` are only touched under the engine lock. ``data``
+        # is replaced in one assignment and never modified, so readers take a
+        # single reference to it without locking.
+        self.rows: Dict[str, int] = {}
+        self.refs: List[int] = []
+        self.data = _IndexData()
+
+    def extend(self, explanations: List[str], source: Any = None, fresh: Any = None) -> None:
+        """Append ``explanations`` given the full ``source`` matrix or just their ``fresh`` rows."""
+        data = self.data
+        if source is not None:
+            stored, scales = _quantize(source, self.storage)
+        else:
+            stored, scales = _quantize(fresh, self.storage)
+            if data.stored is not None:
+                stored = _NP.concatenate([data.stored, stored])
+                if scales is not None:
+                    scales = _NP.concatenate([data.scales, scales])
+            if self.storage == "float32":
+                source = stored
+        if self.storage != "float32" and not isinstance(source, _NP.memmap):
+            source = None
+        for explanation in explanations:
+            self.rows[explanation] = len(self.refs)
+            self.refs.append(0)
+        self.data = _IndexData(data.explanations + tuple(explanations), stored, scales, source)
+
+
+def _nearest_centroids(vectors: Any, centroids: Any) -> Any:
+    assignments = _NP.empty(len(vectors), dtype=_NP.int32)
+    step = _SCORE_CHUNK_ROWS * 4
+    for start in range(0, len(vectors), step):
+        chunk = _NP.asarray(vectors[start:start + step], dtype=_NP.float32)
+        assignments[start:start + step] = _NP.argmax(chunk @ centroids.T, axis=1)
+    return assignments
+
+
+def _train_ivf(vectors: Any, list_count: int, seed: int = 0) -> Tuple[Any, Any]:
+    """Spherical k-means on a sample of ``vectors``; returns (centroids, assignments)."""
+    rng = _NP.random.default_rng(seed)
+    sample_size = min(len(vectors), list_count * _IVF_TRAIN_ROWS_PER_LIST)
+    sample = _NP.asarray(vectors[_NP.sort(rng.choice(len(vectors), sample_size, replace=False))], dtype=_NP.float32)
+    centroids = sample[rng.choice(sample_size, list_count, replace=False)].copy()
+    for _ in range(_IVF_TRAIN_ITERATIONS):
+        assignments = _nearest_centroids(sample, centroids)
+        sums = _NP.zeros_like(centroids)
+        _NP.add.at(sums, assignments, sample)
+        empty = _NP.bincount(assignments, minlength=list_count) == 0
+        if empty.any():
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()), replace=False)]
+        centroids = sums / _NP.maximum(_NP.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+    return centroids, _nearest_centroids(vectors, centroids)
+
+
+class _IvfIndex:
+    """Inverted lists over one matcher's row positions, grouped by nearest centroid."""
+
+    def __init__(self, centroids: Any, assignments: Any) -> None:
+        self.centroids = _NP.asarray(centroids, dtype=_NP.float32)
+        self.assignments = _NP.asarray(assignments, dtype=_NP.int32)
+        self.order = _NP.argsort(self.assignments, kind="stable")
+        counts = _NP.bincount(self.assignments, minlength=len(self.centroids))
+        self.offsets = _NP.concatenate([[0], _NP.cumsum(counts)])
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.centroids.nbytes + self.assignments.nbytes + self.order.nbytes + self.offsets.nbytes)
+
+    def candidates(self, query_embedding: Any, nprobe: int) -> Any:
+        """Sorted positions in the ``nprobe`` lists nearest to the query."""
+        nprobe = max(1, min(nprobe, len(self.centroids)))
+        closeness = self.centroids @ query_embedding
+        probe = _NP.argpartition(closeness, len(closeness) - nprobe)[len(closeness) - nprobe:]
+        positions = _NP.concatenate([self.order[self.offsets[item]:self.offsets[item + 1]] for item in probe])
+        positions.sort()
+        return positions
+
+
+class _QueryBuffers:
+    """Score buffers reused across queries against one index shape."""
+
+    def __init__(self, total: int, dimension: int, selected: int, storage: str) -> None:
+        self.total = total
+        self.scores = _NP.empty(total, dtype=_NP.float32)
+        self.selected = _NP.empty(selected, dtype=_NP.float32)
+        rows = min(total, _SCORE_CHUNK_ROWS) if storage != "float32" else 0
+        self.block = _NP.empty((rows, dimension), dtype=_NP.float32)
+
+
+class SemanticEngine:
+    """Process-wide text2vec model and embedding rows shared by every matcher.
+
+    Matchers attach when created and detach on close. The rows they index are
+    reference counted; an index is dropped once no matcher uses any of its
+    rows, and the model is released with the last matcher.
+    """
+
     def __init__(self) -> None:
+        self._lock = threading.RLock()
         self._model: Any = None
-        self._explanations: List[str] = []
-        self._explanation_to_words: Dict[str, List[str]] = {}
-        self._embeddings: Any = None
+        self._clients = 0
+        self._indexes: Dict[Tuple[str, str], _SharedIndex] = {}
+
+    def attach(self) -> None:
+        with self._lock:
+            self._clients += 1
+
+    def detach(self) -> None:
+        with self._lock:
+            self._clients = max(0, self._clients - 1)
+            if self._clients == 0:
+                self._model = None
+                self._indexes.clear()
+
+    def ensure_model(self) -> bool:
+        with self._lock:
+            if self._model is not None:
+                return True
+            if not _load_optional_dependencies():
+                return False
+            try:
+                model_path = _model_path()
+                # Full builds bundle a CPU model. Pinning inference to CPU prevents
+                # target machines from requiring CUDA or other GPU runtimes.
+                self._model = _SENTENCE_MODEL_CLS(model_path, device="cpu")
+                logger.info(f"text2vec SentenceModel 加载成功: {model_path}")
+                return True
+            except Exception as e:
+                logger.warning(f"text2vec 模型加载失败: {e}")
+                self._model = None
+                return False
+
+    def encode(self, texts: List[str]) -> Any:
+        embeddings = _NP.asarray(self._model.encode(texts), dtype=float)
+        norms = _NP.linalg.norm(embeddings, axis=1, keepdims=True)
+        return (embeddings / _NP.maximum(norms, 1e-12)).astype(_NP.float32)
+
+    def register(self, key: Tuple[str, str, str], explanations: List[str]) -> Any:
+        """Return row ids for ``explanations``, embedding the ones not seen yet.
+
+        ``key`` is (cache directory, namespace, storage mode); each has its own index.
+        """
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                cache_dir, namespace, storage = key
+                revision = _model_revision()
+                cache = _EmbeddingCache(cache_dir, revision, namespace) if cache_dir and revision else None
+                index = self._indexes[key] = _SharedIndex(cache, storage)
+            new = list(dict.fromkeys(explanation for explanation in explanations if explanation not in index.rows))
+            if new:
+                if index.data.stored is None or index.cache is not None:
+                    # Rows already held come back from the cache file, so the
+                    # grown matrix can stay memory-mapped.
+                    index.extend(new, source=self._embed(index.cache, list(index.data.explanations) + new))
+                else:
+                    index.extend(new, fresh=self._embed(None, new))
+            rows = [index.rows[explanation] for explanation in explanations]
+            for row in rows:
+                index.refs[row] += 1
+            return _NP.asarray(rows, dtype=_NP.intp)
+
+    def release(self, key: Tuple[str, str, str], rows: Any) -> None:
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                return
+            for row in rows:
+                index.refs[int(row)] -= 1
+            if not any(index.refs):
+                del self._indexes[key]
+
+    def index(self, key: Tuple[str, str, str]) -> Optional[_SharedIndex]:
+        return self._indexes.get(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            indexes = list(self._indexes.values())
+            model_bytes = _model_bytes(self._model) if self._model is not None else 0
+            embedding_bytes = sum(index.data.nbytes for index in indexes)
+            return {
+                "clients": self._clients,
+                "model_loaded": self._model is not None,
+                "model_bytes": model_bytes,
+                "indexes": len(indexes),
+                "rows": sum(len(index.refs) for index in indexes),
+                "live_rows": sum(sum(1 for ref in index.refs if ref > 0) for index in indexes),
+                "embedding_bytes": embedding_bytes,
+                "mapped_bytes": sum(
+                    int(index.data.source.nbytes) for index in indexes
+                    if isinstance(index.data.source, _NP.memmap)
+                ),
+                "total_bytes": model_bytes + embedding_bytes,
+            }
+
+    def _embed(self, cache: Optional[_EmbeddingCache], explanations: List[str]) -> Any:
+        """Embed explanations, encoding only the ones missing from the on-disk cache."""
+        if cache is None:
+            return self.encode(explanations)
+
+        wanted = [_explanation_hash(explanation) for explanation in explanations]
+        hashes, stored = cache.load()
+        rows = {item: row for row, item in enumerate(hashes)}
+        missing = [index for index, item in enumerate(wanted) if item not in rows]
+        if missing:
+            fresh = self.encode([explanations[index] for index in missing])
+            if stored is not None and stored.shape[1] != fresh.shape[1]:
+                hashes, stored, rows = [], None, {}
+                missing = list(range(len(wanted)))
+                fresh = self.encode(explanations)
+            hashes = hashes + [wanted[index] for index in missing]
+            stored = fresh if stored is None else _NP.concatenate([stored, fresh])
+            rows = {item: row for row, item in enumerate(hashes)}
+            if len(hashes) > _EMBEDDING_CACHE_MAX_GROWTH * len(wanted):
+                stored = stored[[rows[item] for item in wanted]]
+                hashes = list(wanted)
+                rows = {item: row for row, item in enumerate(hashes)}
+            try:
+                stored = cache.store(hashes, stored)
+            except Exception as e:
+                logger.warning(f"向量缓存写入失败: {e}")
+        logger.info(f"向量缓存复用 {len(wanted) - len(missing)} 条，新编码 {len(missing)} 条")
+
+        selection = [rows[item] for item in wanted]
+        if selection == list(range(len(hashes))):
+            return stored
+        return _NP.asarray(stored[selection])
+
+
+_ENGINE = SemanticEngine()
+
+
+def get_semantic_engine() -> SemanticEngine:
+    return _ENGINE
+
+
+@dataclass(frozen=True)
+class _MatcherState:
+    """What one build_index call published; find_similar reads it as a whole."""
+
+    index_key: Tuple[str, str, str]
+    rows: Any
+    explanations: Tuple[str, ...]
+    explanation_to_words: Dict[str, List[str]]
+    ivf: Optional[_IvfIndex] = None
+    nprobe: int = _IVF_NPROBE
+
+
+class SimilarityMatcher:
+    def __init__(self, cache_dir: Optional[str] = None, namespace: str = "") -> None:
+        # None uses the per-user cache directory; an empty string disables it.
+        # Corpora other than the word explanations pass their own namespace.
+        self._cache_dir = cache_dir
+        self._namespace = namespace
+        self._engine = get_semantic_engine()
+        self._engine.attach()
+        self._closed = False
+        self._state: Optional[_MatcherState] = None
+        # Held by the query that owns the reusable buffers; a concurrent query
+        # scores into its own.
+        self._buffers_lock = threading.Lock()
+        self._buffers: Optional[_QueryBuffers] = None
         self._ready = False
 
     @property
     def available(self) -> bool:
         return self._ready
 
-    def _ensure_model(self) -> bool:
-        if self._model is not None:
-            return True
-        if not _load_optional_dependencies():
-            return False
-        try:
-            model_path = _model_path()
-            # Full builds bundle a CPU model. Pinning inference to CPU prevents
-            # target machines from requiring CUDA or other GPU runtimes.
-            self._model = _SENTENCE_MODEL_CLS(model_path, device="cpu")
-            logger.info(f"text2vec SentenceModel 加载成功: {model_path}")
-            return True
-        except Exception as e:
-            logger.warning(f"text2vec 模型加载失败: {e}")
-            self._model = None
-            return False
-
-    def build_index(self, word_explanation_pairs: List[Tuple[str, str]]) -> None:
-        if not self._ensure_model():
+    def build_index(
+        self,
+        word_explanation_pairs: List[Tuple[str, str]],
+        storage: str = "float32",
+        search: str = "flat",
+        nprobe: int = _IVF_NPROBE,
+    ) -> None:
+        if storage not in STORAGE_MODES:
+            raise ValueError(f"未知的向量存储方式: {storage}")
+        if search not in SEARCH_MODES:
+            raise ValueError(f"未知的相似度检索方式: {search}")
+        if self._closed or not self._engine.ensure_model():
             return
 
-        self._explanation_to_words.clear()
+        explanation_to_words: Dict[str, List[str]] = {}
         for word, explanation in word_explanation_pairs:
             exp = (explanation or "").strip()
             if not exp:
                 continue
-            if exp not in self._explanation_to_words:
-                self._explanation_to_words[exp] = []
-            if word not in self._explanation_to_words[exp]:
-                self._explanation_to_words[exp].append(word)
-
-        self._explanations = list(self._explanation_to_words.keys())
-        if not self._explanations:
+            if exp not in explanation_to_words:
+                explanation_to_words[exp] = []
+            if word not in explanation_to_words[exp]:
+                explanation_to_words[exp].append(word)
+
+        explanations = tuple(explanation_to_words)
+        if not explanations:
+            self._publish(None)
             return
 
         try:
-            embeddings = _NP.asarray(self._model.encode(self._explanations), dtype=float)
-            norms = _NP.linalg.norm(embeddings, axis=1, keepdims=True)
-            self._embeddings = embeddings / _NP.maximum(norms, 1e-12)
+            cache_dir = _embedding_cache_dir() if self._cache_dir is None else self._cache_dir
+            index_key = (cache_dir, self._namespace, storage)
+            rows = self._engine.register(index_key, list(explanations))
+            ivf = None
+            if search == "ivf" and len(rows) >= _IVF_MIN_ROWS:
+                ivf = self._load_or_train_ivf(self._engine.index(index_key), rows, explanations)
+            self._publish(_MatcherState(index_key, rows, explanations, explanation_to_words, ivf, nprobe))
             self._ready = True
-            logger.info(f"相似度索引构建完成，共 {len(self._explanations)} 条中文释义")
+            logger.info(f"相似度索引构建完成，共 {len(explanations)} 条中文释义")
         except Exception as e:
             logger.warning(f"相似度索引构建失败: {e}")
             self._ready = False
 
-    def find_similar(self, query: str, top_k: int = 3) -> List[Dict[str, Any]]:
-        if not self._ready or self._model is None or self._embeddings is None:
+    def _publish(self, state: Optional[_MatcherState]) -> None:
+        """Swap in ``state``, then release the rows the previous one held."""
+        previous, self._state = self._state, state
+        if previous is not None:
+            self._engine.release(previous.index_key, previous.rows)
+
+    def _load_or_train_ivf(self, index: _SharedIndex, rows: Any, explanations: Tuple[str, ...]) -> _IvfIndex:
+        data = index.data
+        list_count = max(1, int(round(math.sqrt(len(rows)))))
+        digest = hashlib.sha1(f"{list_count}:{data.stored.shape[1]}".encode("utf-8"))
+        for explanation in explanations:
+            digest.update(explanation.encode("utf-8") + b"\0")
+        key = digest.hexdigest()
+        stored = index.cache.load_ivf(key) if index.cache is not None else None
+        if stored is not None and stored[0].shape == (list_count, data.stored.shape[1]) and len(stored[1]) == len(rows):
+            return _IvfIndex(*stored)
+
+        centroids, assignments = _train_ivf(data.dequantize(rows), list_count)
+        logger.info(f"IVF 索引训练完成，共 {list_count} 个聚类")
+        if index.cache is not None:
+            try:
+                index.cache.store_ivf(key, centroids, assignments)
+            except Exception as e:
+                logger.warning(f"IVF 索引写入失败: {e}")
+        return _IvfIndex(centroids, assignments)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._ready = False
+        self._publish(None)
+        self._engine.detach()
+
+    def _score(self, index: _SharedIndex, data: _IndexData, rows: Any, query_embedding: Any, reuse: bool) -> Any:
+        """Score every indexed row, into the reused buffers if ``reuse``; returns the scores of ``rows``."""
+        stored = data.stored
+        total = int(stored.shape[0])
+        buffers = self._buffers if reuse else None
+        if buffers is None or buffers.total != total or len(buffers.selected) != len(rows):
+            buffers = _QueryBuffers(total, int(stored.shape[1]), len(rows), index.storage)
+            if reuse:
+                self._buffers = buffers
+        if buffers.block.shape[0] == 0:
+            _NP.dot(stored, query_embedding, out=buffers.scores)
+        else:
+            # BLAS needs float32 operands: widen one chunk at a time.
+            for start in range(0, total, buffers.block.shape[0]):
+                chunk = stored[start:start + buffers.block.shape[0]]
+                block = buffers.block[:len(chunk)]
+                _NP.copyto(block, chunk)
+                _NP.dot(block, query_embedding, out=buffers.scores[start:start + len(chunk)])
+            if data.scales is not None:
+                _NP.multiply(buffers.scores, data.scales, out=buffers.scores)
+        _NP.take(buffers.scores, rows, out=buffers.selected)
+        return _NP.clip(buffers.selected, -1.0, 1.0, out=buffers.selected)
+
+    @staticmethod
+    def _top_indices(scores: Any, count: int) -> Any:
+        """Indices of the ``count`` best scores, best first."""
+        total = len(scores)
+        count = min(count, total)
+        if count <= 0:
+            return _NP.zeros(0, dtype=_NP.intp)
+        if count < total:
+            candidates = _NP.argpartition(scores, total - count)[total - count:]
+            candidates.sort()
+        else:
+            candidates = _NP.arange(total)
+        return candidates[_NP.argsort(scores[candidates], kind="stable")[::-1]]
+
+    def find_similar(self, query: str, top_k: int = 3, nprobe: Optional[int] = None) -> List[Dict[str, Any]]:
+        # One reference each to the matcher state and the index data, so a
+        # concurrent build_index or register cannot mix two versions.
+        state = self._state
+        if not self._ready or state is None:
             return []
 
         query = (query or "").strip()
         if not query:
             return []
 
+        reuse = self._buffers_lock.acquire(blocking=False)
         try:
-            query_embedding = _NP.asarray(self._model.encode([query]), dtype=float)
-            query_norms = _NP.linalg.norm(query_embedding, axis=1, keepdims=True)
-            query_embedding = query_embedding / _NP.maximum(query_norms, 1e-12)
-            scores = _NP.clip(_NP.dot(query_embedding, self._embeddings.T)[0], -1.0, 1.0)
-
-            top_indices = _NP.argsort(scores)[-top_k:][::-1]
+            index = self._engine.index(state.index_key)
+            data = index.data if index is not None else None
+            if data is None or data.stored is None:
+                return []
+            query_embedding = self._engine.encode([query])[0]
+            rows = state.rows
+            if state.ivf is None:
+                positions, scores = None, self._score(index, data, rows, query_embedding, reuse)
+            else:
+                positions = state.ivf.candidates(query_embedding, nprobe or state.nprobe)
+                scores = _NP.clip(data.dequantize(rows[positions]) @ query_embedding, -1.0, 1.0)
+
+            if index.storage == "float32" or data.source is None:
+                top = self._top_indices(scores, top_k)
+                top_scores = scores[top]
+            else:
+                candidates = self._top_indices(scores, top_k * _RESCORE_FACTOR)
+                local = candidates if positions is None else positions[candidates]
+                exact = _NP.clip(_NP.dot(data.source[rows[local]], query_embedding), -1.0, 1.0)
+                order = self._top_indices(exact, top_k)
+                top, top_scores = candidates[order], exact[order]
+            top_indices = top if positions is None else positions[top]
 
             results: List[Dict[str, Any]] = []
-            for idx in top_indices:
-                score = float(scores[idx])
+            for idx, score in zip(top_indices, top_scores):
+                score = float(score)
                 if score <= 0:
                     continue
-                explanation = self._explanations[idx]
-                words = self._explanation_to_words.get(explanation, [])
+                explanation = state.explanations[idx]
+                words = state.explanation_to_words.get(explanation, [])
                 results.append(
                     {
                         "explanation": explanation,
@@ -196,3 +741,6 @@ class SimilarityMatcher:
         except Exception as e:
             logger.warning(f"相似度搜索失败: {e}")
             return []
+        finally:
+            if reuse:
+                self._buffers_lock.release()
@@ -1,28 +1,61 @@
 from __future__ import annotations
 
+import hashlib
 import os
+import pickle
 import re
 import sqlite3
 import threading
 import logging
 import math
-from collections import Counter, defaultdict
+from functools import lru_cache
+from collections import Counter, OrderedDict, defaultdict, deque
 from pathlib import Path
-from typing import Any, Counter as CounterType, DefaultDict, Dict, List, Optional, Tuple
+from typing import Any, Counter as CounterType, DefaultDict, Dict, Iterable, List, Optional, Tuple
 
-from webui_backend.dictionary_service import _lev_ratio
-from webui_backend.similarity_matcher import SimilarityMatcher
+from webui_backend.dictionary_core import extract_chinese_terms, normalize_chinese_term
+from webui_backend.search_utils import ResultCache, lev_ratio
+from webui_backend.similarity_matcher import SimilarityMatcher, configured_index_options
+
+logger = logging.getLogger(__name__)
 
 
 _CJK_RE = re.compile(r"[\u3400-\u9fff]")
 _CJK_RUN_RE = re.compile(r"[\u3400-\u9fff]+")
 _ALICIAN_PART_RE = re.compile(r"[A-Za-z][A-Za-z'-]*|\d+|\s+|[^\sA-Za-z\d]+")
 _CHINESE_PART_RE = re.compile(r"[\u3400-\u9fff]+|[A-Za-z][A-Za-z'-]*|\d+|\s+|[^\sA-Za-z\d\u3400-\u9fff]+")
-_POS_RE = re.compile(
-    r"\b(?:adj|adv|art|conj|interj|n|num|prep|pron|v|vi|vt)\.?",
-    re.IGNORECASE,
-)
 _TEMPLATE_SLOT_RE = re.compile(r"(?:\.{2,}|…+)")
+# A sentence runs to terminal punctuation (plus closing quotes), a line break
+# or the end of the text; the whitespace after it is kept as its separator.
+_SENTENCE_RE = re.compile(
+    r"(\S[^\n。！？!?；;…]*?(?:[。！？!?；;…]+[”’」』）)\"']*|\.+(?=\s|$)|(?=\n)|$))(\s*)",
+    re.S,
+)
+_SIMILAR_WORD_THRESHOLD = 0.72
+_SIMILAR_WORD_MEMO_SIZE = 512
+# Translated sentences kept for repeated input (retyped lines, documents).
+_TRANSLATION_MEMO_SIZE = 1024
+# Bump whenever the compiled state below, _LexiconEntry or _TermAutomaton
+# changes shape or meaning; snapshots written by another version are ignored
+# and rebuilt.
+_SNAPSHOT_VERSION = 3
+_SNAPSHOT_FIELDS = (
+    "_entries",
+    "_word_entries",
+    "_word_by_lower",
+    "_best_by_lower",
+    "_templates_by_lower",
+    "_similar_by_length",
+    "_phrases",
+    "_phrase_trie",
+    "_term_candidates",
+    "_term_automaton",
+    "_entry_cjk_chars",
+    "_char_index",
+    "_sentence_patterns",
+    "_core_sentence_patterns",
+    "_sentence_pattern_examples",
+)
 _CHINESE_NEGATION_FORMS = tuple(sorted({
     "不可能", "不可以", "不会", "不能", "不可", "不要", "不必", "不得",
     "没有", "没能", "未能", "未曾", "从未", "并不", "并非", "绝不", "毫不",
@@ -30,6 +63,17 @@ _CHINESE_NEGATION_FORMS = tuple(sorted({
 }, key=len, reverse=True))
 
 
+# The lexicon is built from these rows alone; lyrics only feed sentence patterns.
+_WORD_ROWS_SQL = (
+    "SELECT words, explanation, class, count, variety, sense_order FROM dictionary "
+    "WHERE words IS NOT NULL AND TRIM(words) <> '' ORDER BY headword_id, sense_order"
+)
+_PHRASE_ROWS_SQL = (
+    "SELECT PHRASE, explanation, count, variety FROM phrase "
+    "WHERE PHRASE IS NOT NULL AND TRIM(PHRASE) <> ''"
+)
+
+
 def _default_db_path() -> str:
     env_db = os.environ.get("ALICIAN_DB_PATH")
     if env_db:
@@ -37,6 +81,42 @@ def _default_db_path() -> str:
     return str(Path(__file__).resolve().parent.parent / "translated.db")
 
 
+def _database_fingerprint(db_path: str) -> str:
+    digest = hashlib.sha1()
+    for path in (db_path, db_path + "-wal"):
+        if not os.path.exists(path):
+            continue
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+class _FrozenDict(dict):
+    """Read-only dict for shared cached results; still serialises as a plain dict."""
+
+    __slots__ = ()
+
+    def _readonly(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("缓存的翻译结果是只读的")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return _FrozenDict, (dict(self),)
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return _FrozenDict((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
 def _as_int(value: Any) -> int:
     try:
         return int(value)
@@ -44,20 +124,145 @@ def _as_int(value: Any) -> int:
         return 0
 
 
+class _TermAutomaton:
+    """Aho-Corasick automaton over the Chinese lexicon terms.
+
+    ``longest_matches`` reports the longest term starting at every position of
+    a run in one left-to-right pass, which is what greedy segmentation needs.
+    """
+
+    def __init__(self, terms: Iterable[str]) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._depth: List[int] = [0]
+        # Lengths of every term ending at a state, own match first, then the
+        # ones inherited through the failure chain.
+        self._outputs: List[Tuple[int, ...]] = [()]
+        own: List[int] = [0]
+        for term in terms:
+            if not term:
+                continue
+            state = 0
+            for char in term:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._depth.append(self._depth[state] + 1)
+                    self._outputs.append(())
+                    own.append(0)
+                state = nxt
+            own[state] = len(term)
+
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        for state in queue:
+            self._outputs[state] = (own[state],) if own[state] else ()
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                inherited = self._outputs[self._fail[nxt]]
+                self._outputs[nxt] = ((own[nxt],) if own[nxt] else ()) + inherited
+                queue.append(nxt)
+
+    def longest_at(self, text: str, start: int) -> int:
+        """Length of the longest term starting at ``start`` (0 if none)."""
+        state = 0
+        best = 0
+        for index in range(start, len(text)):
+            state = self._goto[state].get(text[index], -1)
+            if state < 0:
+                break
+            if self._outputs[state] and self._outputs[state][0] == self._depth[state]:
+                best = self._depth[state]
+        return best
+
+    def longest_matches(self, text: str) -> List[int]:
+        """For every position, the length of the longest term starting there."""
+        longest = [0] * len(text)
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length in outputs[state]:
+                start = end - length + 1
+                if length > longest[start]:
+                    longest[start] = length
+        return longest
+
+
+class _LexiconEntry:
+    """A dictionary sense or phrase; ``entry_id`` is its index in ``_entries``."""
+
+    __slots__ = (
+        "entry_id", "kind", "target", "explanation", "word_class",
+        "count", "variety", "sense_order", "terms", "phrase_words",
+    )
+
+    def __init__(
+        self, entry_id: int, kind: str, target: str, explanation: str, word_class: str,
+        count: int, variety: int, sense_order: int,
+    ) -> None:
+        self.entry_id = entry_id
+        self.kind = kind
+        self.target = target
+        self.explanation = explanation
+        self.word_class = word_class
+        self.count = count
+        self.variety = variety
+        self.sense_order = sense_order
+        self.terms: set = set()
+        self.phrase_words: List[str] = []
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # Positional arguments unpickle much faster than the generic slot state.
+        return (
+            _LexiconEntry,
+            (
+                self.entry_id, self.kind, self.target, self.explanation, self.word_class,
+                self.count, self.variety, self.sense_order,
+            ),
+            (self.terms, self.phrase_words),
+        )
+
+    def __setstate__(self, state: Tuple[set, List[str]]) -> None:
+        self.terms, self.phrase_words = state
+
+
 class TranslationService:
     """Bidirectional translator with dictionary and corpus-backed grammar."""
 
-    def __init__(self, db_path: Optional[str] = None) -> None:
+    def __init__(self, db_path: Optional[str] = None, snapshot_path: Optional[str] = None) -> None:
         self._lock = threading.RLock()
         self._db_path = db_path or _default_db_path()
         self._conn = sqlite3.connect(self._db_path, check_same_thread=False)
         self._conn.row_factory = sqlite3.Row
-        self._entries: List[Dict[str, Any]] = []
-        self._word_entries: List[Dict[str, Any]] = []
-        self._word_by_lower: Dict[str, List[Dict[str, Any]]] = {}
-        self._phrases: List[Dict[str, Any]] = []
-        self._term_candidates: Dict[str, List[Dict[str, Any]]] = {}
-        self._max_term_len = 1
+        self._entries: List[_LexiconEntry] = []
+        self._word_entries: List[_LexiconEntry] = []
+        # Buckets keep load order (headword, sense_order); alternatives and
+        # tie-breaks depend on it. Ranked lookups are precomputed per word.
+        self._word_by_lower: Dict[str, Tuple[_LexiconEntry, ...]] = {}
+        self._best_by_lower: Dict[str, _LexiconEntry] = {}
+        self._templates_by_lower: Dict[str, Tuple[Tuple[int, _LexiconEntry], ...]] = {}
+        # Distinct lowercased headwords grouped by length for approximate
+        # matching: (load position, word, first entry), plus recent answers.
+        self._similar_by_length: Dict[int, List[Tuple[int, str, _LexiconEntry]]] = {}
+        self._similar_memo: "OrderedDict[str, Tuple[Optional[_LexiconEntry], float]]" = OrderedDict()
+        self._phrases: List[_LexiconEntry] = []
+        # Word-level trie over phrase_words; the None key holds the phrase
+        # ending at that node (the first one loaded wins for duplicates).
+        self._phrase_trie: Dict[Optional[str], Any] = {}
+        self._term_candidates: Dict[str, List[int]] = {}
+        self._term_automaton = _TermAutomaton(())
+        self._entry_cjk_chars: List[frozenset] = []
+        self._char_index: Dict[str, List[int]] = {}
         self._sentence_patterns: DefaultDict[
             Tuple[Tuple[str, int], ...], CounterType[Tuple[str, ...]]
         ] = defaultdict(Counter)
@@ -67,15 +272,131 @@ class TranslationService:
         self._sentence_pattern_examples: Dict[Tuple[str, ...], str] = {}
         self._similarity_matcher = SimilarityMatcher()
         self._similarity_index_built = False
+        self._similarity_warming = False
         self._jieba: Any = None
-        self._load_entries()
-        self._load_sentence_patterns()
-        self._try_load_jieba()
+        # Pattern mining runs in the background; until it finishes, translation
+        # works without attested-pattern reordering.
+        self._patterns_ready = threading.Event()
+        self._pattern_cancel = threading.Event()
+        self._pattern_thread: Optional[threading.Thread] = None
+        # None keeps the snapshot next to the database; an empty string disables it.
+        self._snapshot_path = self._db_path + ".translator-cache" if snapshot_path is None else snapshot_path
+        self._fingerprint = ""
+        # Sentence results keyed by (direction, text); the cache version is the
+        # state generation plus pattern readiness. The generation moves when
+        # the lexicon is rebuilt or re-mined patterns differ from the old ones.
+        self._translation_memo = ResultCache(_TRANSLATION_MEMO_SIZE)
+        self._state_generation = 0
+        self._loaded_data_version = -1
+        self._lexicon_signature = ""
+        self.loaded_from_snapshot = False
+        self._load_state()
+
+    @property
+    def patterns_ready(self) -> bool:
+        return self._patterns_ready.is_set()
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        return self._patterns_ready.wait(timeout)
+
+    def status(self) -> Dict[str, Any]:
+        ready = self.patterns_ready
+        return {
+            "ok": True,
+            "patterns_ready": ready,
+            "message": "句型库已就绪。" if ready else "句型库正在后台加载，暂不按语料句型调整语序。",
+        }
+
+    def cache_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return self._translation_memo.stats()
 
     def close(self) -> None:
+        self._pattern_cancel.set()
+        if self._pattern_thread is not None:
+            self._pattern_thread.join()
         with self._lock:
+            self._similarity_matcher.close()
             self._conn.close()
 
+    def _data_version(self) -> int:
+        try:
+            return int(self._conn.execute("PRAGMA data_version").fetchone()[0])
+        except sqlite3.Error:
+            return -1
+
+    def _read_lexicon_signature(self) -> str:
+        digest = hashlib.sha1()
+        try:
+            for sql in (_WORD_ROWS_SQL, _PHRASE_ROWS_SQL):
+                for row in self._conn.execute(sql):
+                    digest.update(repr(tuple(row)).encode("utf-8"))
+        except sqlite3.Error:
+            return ""
+        return digest.hexdigest()
+
+    def _load_state(self) -> None:
+        """Compile the lexicon for the current database content.
+
+        The snapshot is used when it matches; otherwise the entries are built
+        here and sentence patterns are mined on a background thread.
+        """
+        self._loaded_data_version = self._data_version()
+        self._lexicon_signature = self._read_lexicon_signature()
+        self._fingerprint = _database_fingerprint(self._db_path)
+        self._state_generation += 1
+        self._pattern_cancel = threading.Event()
+        self.loaded_from_snapshot = self._load_snapshot()
+        if self.loaded_from_snapshot:
+            self._patterns_ready.set()
+        else:
+            self._load_entries()
+            self._start_pattern_miner()
+        self._similar_memo.clear()
+        self._try_load_jieba()
+
+    def _start_pattern_miner(self, refresh_fingerprint: bool = False) -> None:
+        self._pattern_thread = threading.Thread(
+            target=self._mine_sentence_patterns, args=(self._pattern_cancel, refresh_fingerprint),
+            name="TranslationPatternMiner", daemon=True,
+        )
+        self._pattern_thread.start()
+
+    def _refresh_if_changed(self) -> None:
+        """Follow commits made by another connection to the database.
+
+        Only a change to the dictionary or phrase rows rebuilds the lexicon.
+        Anything else, such as a lyric save, keeps the lexicon, its automaton
+        and the memo, and mines the sentence patterns again in the background.
+        """
+        data_version = self._data_version()
+        if data_version == self._loaded_data_version:
+            return
+        self._loaded_data_version = data_version
+        if self._read_lexicon_signature() == self._lexicon_signature:
+            # Translation keeps the current patterns until the new ones are in.
+            self._pattern_cancel.set()
+            self._pattern_cancel = threading.Event()
+            self._start_pattern_miner(refresh_fingerprint=True)
+            return
+        logger.info("词典数据已变更，重新加载翻译词库")
+        # The old miner may be waiting for the lock we hold, so it is only
+        # cancelled here; it checks the flag again before publishing anything.
+        self._pattern_cancel.set()
+        self._patterns_ready.clear()
+        self._entries = []
+        self._word_entries = []
+        self._phrases = []
+        self._term_candidates = {}
+        self._sentence_patterns = defaultdict(Counter)
+        self._core_sentence_patterns = defaultdict(Counter)
+        self._sentence_pattern_examples = {}
+        # Created before the old matcher detaches so the shared model stays loaded.
+        previous_matcher, self._similarity_matcher = self._similarity_matcher, SimilarityMatcher()
+        previous_matcher.close()
+        self._similarity_index_built = False
+        self._load_state()
+
     def translate(self, text: str, direction: str = "auto") -> Dict[str, Any]:
         source = str(text or "").strip()
         if not source:
@@ -91,9 +412,150 @@ class TranslationService:
 
         normalized_direction = self._normalize_direction(direction, source)
         with self._lock:
+            self._refresh_if_changed()
+            # Patterns are published under this lock, so readiness cannot
+            # change while the sentence is being translated.
+            patterns_ready = self.patterns_ready
+            key = (normalized_direction, source)
+            version = (self._state_generation, patterns_ready, self._similarity_index_built)
+            cached = self._translation_memo.get(key, version)
+            if cached is not None:
+                return cached
             if normalized_direction == "alician_to_zh":
-                return self._translate_alician_to_zh(source, normalized_direction)
-            return self._translate_zh_to_alician(source, normalized_direction)
+                result = self._translate_alician_to_zh(source, normalized_direction)
+            else:
+                result = self._translate_zh_to_alician(source, normalized_direction)
+            result["patterns_ready"] = patterns_ready
+            # Results are shared between callers from here on.
+            frozen = _freeze(result)
+            self._translation_memo.put(key, frozen)
+            return frozen
+
+    def _snapshot_header(self) -> Tuple[int, str]:
+        # Fingerprint of the content the state was built from, so a commit
+        # made while patterns are mined cannot be stamped onto older state.
+        return _SNAPSHOT_VERSION, self._fingerprint
+
+    def _load_snapshot(self) -> bool:
+        """Restore the compiled lexicon and patterns if they match the database."""
+        if not self._snapshot_path:
+            return False
+        try:
+            with open(self._snapshot_path, "rb") as f:
+                if pickle.load(f) != self._snapshot_header():
+                    return False
+                state = pickle.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception as exc:
+            logger.warning("翻译快照读取失败，将重新构建: %s", exc)
+            return False
+        if not isinstance(state, dict) or set(state) != set(_SNAPSHOT_FIELDS):
+            return False
+        for name in _SNAPSHOT_FIELDS:
+            setattr(self, name, state[name])
+        return True
+
+    def _save_snapshot(self) -> None:
+        # The header is pickled separately so a stale snapshot is rejected
+        # without unpickling the state behind it.
+        if not self._snapshot_path:
+            return
+        temp_path = self._snapshot_path + ".tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                pickle.dump(self._snapshot_header(), f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(
+                    {name: getattr(self, name) for name in _SNAPSHOT_FIELDS}, f, protocol=pickle.HIGHEST_PROTOCOL,
+                )
+            os.replace(temp_path, self._snapshot_path)
+        except Exception as exc:
+            logger.warning("翻译快照写入失败: %s", exc)
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    def translate_batch(self, texts: Iterable[Any], direction: str = "auto") -> Dict[str, Any]:
+        """Translate texts independently; identical texts are translated once."""
+        results: List[Dict[str, Any]] = []
+        seen: Dict[str, Dict[str, Any]] = {}
+        for text in texts:
+            key = str(text or "").strip()
+            if key not in seen:
+                seen[key] = self.translate(key, direction)
+            results.append(seen[key])
+        return {"ok": True, "direction": direction or "auto", "results": results}
+
+    @staticmethod
+    def split_sentences(text: str) -> List[Tuple[str, str]]:
+        """Split text into (sentence, separator) pairs that join back to the stripped text."""
+        return [(sentence, separator) for sentence, separator in _SENTENCE_RE.findall(str(text or "").strip())]
+
+    def iter_document(self, text: str, direction: str = "auto") -> Iterable[Dict[str, Any]]:
+        """Translate a document sentence by sentence, yielding each result as it is ready.
+
+        The direction is resolved once for the whole text, and repeated
+        sentences reuse the earlier result instead of being translated again.
+        """
+        source = str(text or "").strip()
+        normalized_direction = self._normalize_direction(direction, source)
+        pieces = self.split_sentences(source)
+        translated: Dict[str, Dict[str, Any]] = {}
+        for index, (sentence, separator) in enumerate(pieces):
+            result = translated.get(sentence)
+            repeated = result is not None
+            if result is None:
+                result = translated[sentence] = self.translate(sentence, normalized_direction)
+            yield {
+                "index": index,
+                "total": len(pieces),
+                "direction": normalized_direction,
+                "source_text": sentence,
+                "separator": separator,
+                "repeated": repeated,
+                "result": result,
+            }
+
+    def translate_document(self, text: str, direction: str = "auto") -> Dict[str, Any]:
+        source = str(text or "").strip()
+        sentences = list(self.iter_document(source, direction))
+        if not sentences:
+            return self.translate(source, direction)
+        return self._merge_document(source, sentences)
+
+    def _merge_document(self, source: str, sentences: List[Dict[str, Any]]) -> Dict[str, Any]:
+        direction = sentences[0]["direction"]
+        tokens: List[Dict[str, Any]] = []
+        texts: List[str] = []
+        stats = {"exact": 0, "approximate": 0, "unknown": 0}
+        for item in sentences:
+            result = item["result"]
+            tokens.extend(result["tokens"])
+            for key in stats:
+                stats[key] += int(result["stats"].get(key, 0))
+            texts.append(result["result_text"])
+            separator = item["separator"]
+            if "\n" in separator:
+                texts.append("\n" * separator.count("\n"))
+            elif direction == "zh_to_alician":
+                texts.append(" ")
+            if separator:
+                tokens.append(self._token(separator, separator, "space", "sentence_break", 1.0))
+        return {
+            "ok": True,
+            "direction": direction,
+            "source_text": source,
+            "result_text": "".join(texts).strip(),
+            "tokens": tokens,
+            "stats": stats,
+            "message": self._message(stats),
+            "sentences": [
+                {"source_text": item["source_text"], "result_text": item["result"]["result_text"], "repeated": item["repeated"]}
+                for item in sentences
+            ],
+            "patterns_ready": self.patterns_ready,
+        }
 
     def _normalize_direction(self, direction: str, text: str) -> str:
         value = str(direction or "auto").strip()
@@ -103,12 +565,11 @@ class TranslationService:
 
     def _load_entries(self) -> None:
         cur = self._conn.cursor()
-        cur.execute(
-            "SELECT words, explanation, class, count, variety, sense_order FROM dictionary "
-            "WHERE words IS NOT NULL AND TRIM(words) <> '' ORDER BY headword_id, sense_order"
-        )
+        buckets: Dict[str, List[_LexiconEntry]] = {}
+        cur.execute(_WORD_ROWS_SQL)
         for row in cur.fetchall():
             entry = self._make_entry(
+                entry_id=len(self._entries),
                 kind="word",
                 target=row["words"],
                 explanation=row["explanation"],
@@ -119,15 +580,14 @@ class TranslationService:
             )
             self._entries.append(entry)
             self._word_entries.append(entry)
-            self._word_by_lower.setdefault(entry["target"].lower(), []).append(entry)
+            buckets.setdefault(entry.target.lower(), []).append(entry)
             self._index_chinese_terms(entry)
+        self._index_word_senses(buckets)
 
-        cur.execute(
-            "SELECT PHRASE, explanation, count, variety FROM phrase "
-            "WHERE PHRASE IS NOT NULL AND TRIM(PHRASE) <> ''"
-        )
+        cur.execute(_PHRASE_ROWS_SQL)
         for row in cur.fetchall():
             entry = self._make_entry(
+                entry_id=len(self._entries),
                 kind="phrase",
                 target=row["PHRASE"],
                 explanation=row["explanation"],
@@ -136,59 +596,157 @@ class TranslationService:
                 variety=row["variety"],
                 sense_order=1,
             )
-            words = [part.lower() for part in re.findall(r"[A-Za-z][A-Za-z'-]*", entry["target"])]
+            words = [part.lower() for part in re.findall(r"[A-Za-z][A-Za-z'-]*", entry.target)]
             if words:
-                entry["phrase_words"] = words
+                entry.phrase_words = words
                 self._phrases.append(entry)
             self._entries.append(entry)
             self._index_chinese_terms(entry)
-        self._phrases.sort(key=lambda item: len(item.get("phrase_words", [])), reverse=True)
+        self._phrases.sort(key=lambda item: len(item.phrase_words), reverse=True)
+        self._phrase_trie = self._build_phrase_trie(self._phrases)
+        self._term_automaton = _TermAutomaton(self._term_candidates)
+        self._index_entry_characters()
+
+    def _index_entry_characters(self) -> None:
+        """Map every character of an entry's explanation and terms to its position in _entries."""
+        char_index: DefaultDict[str, List[int]] = defaultdict(list)
+        self._entry_cjk_chars = []
+        for entry_id, entry in enumerate(self._entries):
+            explanation = entry.explanation
+            self._entry_cjk_chars.append(frozenset(ch for ch in explanation if _CJK_RE.match(ch)))
+            for char in set(explanation).union(*entry.terms):
+                char_index[char].append(entry_id)
+        self._char_index = dict(char_index)
+
+    def _index_word_senses(self, buckets: Dict[str, List[_LexiconEntry]]) -> None:
+        self._word_by_lower = {word: tuple(bucket) for word, bucket in buckets.items()}
+        self._best_by_lower = {
+            word: min(bucket, key=lambda entry: (entry.sense_order, -entry.count, -entry.variety))
+            for word, bucket in buckets.items()
+        }
+        templates_by_lower = {}
+        for word, bucket in buckets.items():
+            templates = [
+                (self._template_arity(entry.explanation), entry) for entry in bucket
+            ]
+            # Stable sort: the first eligible template is the lowest sense_order,
+            # earliest loaded, exactly what min() over the bucket used to pick.
+            templates = sorted(
+                (item for item in templates if item[0] > 0), key=lambda item: item[1].sense_order,
+            )
+            if templates:
+                templates_by_lower[word] = tuple(templates)
+        self._templates_by_lower = templates_by_lower
+
+        similar_by_length: DefaultDict[int, List[Tuple[int, str, _LexiconEntry]]] = defaultdict(list)
+        for position, (word, bucket) in enumerate(buckets.items()):
+            similar_by_length[len(word)].append((position, word, bucket[0]))
+        self._similar_by_length = dict(similar_by_length)
+        self._similar_memo.clear()
+
+    @staticmethod
+    def _build_phrase_trie(phrases: List[_LexiconEntry]) -> Dict[Optional[str], Any]:
+        trie: Dict[Optional[str], Any] = {}
+        for phrase in phrases:
+            node = trie
+            for word in phrase.phrase_words:
+                node = node.setdefault(word, {})
+            node.setdefault(None, phrase)
+        return trie
 
     @staticmethod
     def _pattern_signature(families: List[str]) -> Tuple[Tuple[str, int], ...]:
         return tuple(sorted(Counter(families).items()))
 
-    def _load_sentence_patterns(self) -> None:
-        """Index fully recognized POS patterns attested in the song corpus."""
+    def _mine_sentence_patterns(self, cancel: threading.Event, refresh_fingerprint: bool = False) -> None:
+        try:
+            # Taken before the lyrics are read, off the translating thread.
+            fingerprint = _database_fingerprint(self._db_path) if refresh_fingerprint else None
+            if not self._load_sentence_patterns(cancel):
+                return
+            with self._lock:
+                if cancel.is_set():
+                    return
+                if fingerprint is not None:
+                    self._fingerprint = fingerprint
+                self._save_snapshot()
+                self._patterns_ready.set()
+        except Exception:
+            logger.warning("句型库构建失败，翻译将不按语料句型调整语序。", exc_info=True)
+
+    def _load_sentence_patterns(self, cancel: Optional[threading.Event] = None) -> bool:
+        """Index fully recognized POS patterns attested in the song corpus.
+
+        Lyrics are streamed over a private connection and the tables are
+        swapped in under the lock once complete. Returns False if cancelled.
+        """
+        sentence_patterns: DefaultDict[
+            Tuple[Tuple[str, int], ...], CounterType[Tuple[str, ...]]
+        ] = defaultdict(Counter)
+        core_sentence_patterns: DefaultDict[
+            Tuple[Tuple[str, int], ...], CounterType[Tuple[str, ...]]
+        ] = defaultdict(Counter)
+        sentence_pattern_examples: Dict[Tuple[str, ...], str] = {}
+        conn = sqlite3.connect(self._db_path)
         try:
-            rows = self._conn.execute(
-                "SELECT lyric FROM songs WHERE lyric IS NOT NULL AND TRIM(lyric) <> ''"
-            ).fetchall()
+            rows = conn.execute("SELECT lyric FROM songs WHERE lyric IS NOT NULL AND TRIM(lyric) <> ''")
+            for (lyric,) in rows:
+                if cancel is not None and cancel.is_set():
+                    return False
+                for raw_line in str(lyric or "").splitlines():
+                    line = raw_line.strip()
+                    if not line or re.search(r"[：:]", line):
+                        continue
+                    words = re.findall(r"[A-Za-z][A-Za-z'-]*", line)
+                    if len(words) < 3 or len(words) > 12:
+                        continue
+                    families: List[str] = []
+                    recognized = True
+                    for word in words:
+                        entry = self._best_word_entry(word)
+                        if not entry:
+                            recognized = False
+                            break
+                        families.append(self._pos_family(entry.word_class))
+                    if not recognized or families.count("v") != 1:
+                        continue
+                    if sum(family in {"n", "pron"} for family in families) < 1:
+                        continue
+                    pattern = tuple(families)
+                    sentence_patterns[self._pattern_signature(families)][pattern] += 1
+                    core_pattern = tuple(
+                        family for family in families if family in {"n", "pron", "v"}
+                    )
+                    core_sentence_patterns[
+                        self._pattern_signature(list(core_pattern))
+                    ][core_pattern] += 1
+                    sentence_pattern_examples.setdefault(pattern, line)
         except sqlite3.Error:
-            return
+            # Same as an empty corpus: translate without attested patterns.
+            logger.warning("读取歌词句型失败", exc_info=True)
+            sentence_patterns.clear()
+            core_sentence_patterns.clear()
+            sentence_pattern_examples.clear()
+        finally:
+            conn.close()
 
-        for row in rows:
-            for raw_line in str(row["lyric"] or "").splitlines():
-                line = raw_line.strip()
-                if not line or re.search(r"[：:]", line):
-                    continue
-                words = re.findall(r"[A-Za-z][A-Za-z'-]*", line)
-                if len(words) < 3 or len(words) > 12:
-                    continue
-                families: List[str] = []
-                recognized = True
-                for word in words:
-                    entry = self._best_word_entry(word)
-                    if not entry:
-                        recognized = False
-                        break
-                    families.append(self._pos_family(entry["word_class"]))
-                if not recognized or families.count("v") != 1:
-                    continue
-                if sum(family in {"n", "pron"} for family in families) < 1:
-                    continue
-                pattern = tuple(families)
-                self._sentence_patterns[self._pattern_signature(families)][pattern] += 1
-                core_pattern = tuple(
-                    family for family in families if family in {"n", "pron", "v"}
-                )
-                self._core_sentence_patterns[
-                    self._pattern_signature(list(core_pattern))
-                ][core_pattern] += 1
-                self._sentence_pattern_examples.setdefault(pattern, line)
+        with self._lock:
+            if cancel is not None and cancel.is_set():
+                return False
+            if (
+                sentence_patterns != self._sentence_patterns
+                or core_sentence_patterns != self._core_sentence_patterns
+                or sentence_pattern_examples != self._sentence_pattern_examples
+            ):
+                self._sentence_patterns = sentence_patterns
+                self._core_sentence_patterns = core_sentence_patterns
+                self._sentence_pattern_examples = sentence_pattern_examples
+                self._state_generation += 1
+        return True
 
     def _make_entry(
         self,
+        entry_id: int,
         kind: str,
         target: Any,
         explanation: Any,
@@ -196,17 +754,17 @@ class TranslationService:
         count: Any,
         variety: Any,
         sense_order: Any = 1,
-    ) -> Dict[str, Any]:
-        return {
-            "kind": kind,
-            "target": str(target or "").strip(),
-            "explanation": str(explanation or "").strip(),
-            "word_class": str(word_class or "").strip(),
-            "count": _as_int(count),
-            "variety": _as_int(variety),
-            "sense_order": max(1, _as_int(sense_order)),
-            "terms": set(),
-        }
+    ) -> _LexiconEntry:
+        return _LexiconEntry(
+            entry_id=entry_id,
+            kind=kind,
+            target=str(target or "").strip(),
+            explanation=str(explanation or "").strip(),
+            word_class=str(word_class or "").strip(),
+            count=_as_int(count),
+            variety=_as_int(variety),
+            sense_order=max(1, _as_int(sense_order)),
+        )
 
     def _try_load_jieba(self) -> None:
         try:
@@ -225,54 +783,22 @@ class TranslationService:
                 except Exception:
                     pass
 
-    def _index_chinese_terms(self, entry: Dict[str, Any]) -> None:
-        for term in self._extract_terms(entry["explanation"]):
-            entry["terms"].add(term)
+    def _index_chinese_terms(self, entry: _LexiconEntry) -> None:
+        for term in self._extract_terms(entry.explanation):
+            entry.terms.add(term)
             bucket = self._term_candidates.setdefault(term, [])
-            if entry not in bucket:
-                bucket.append(entry)
-            self._max_term_len = max(self._max_term_len, len(term))
+            # Entries are indexed one at a time, so a repeat can only be the last id.
+            if not bucket or bucket[-1] != entry.entry_id:
+                bucket.append(entry.entry_id)
 
-    def _extract_terms(self, explanation: str) -> List[str]:
-        source = str(explanation or "")
-        if not source or not _CJK_RE.search(source):
-            return []
-        cleaned = re.sub(r"[（(]\s*\d+\s*[）)]", "，", source)
-        cleaned = _POS_RE.sub("，", cleaned)
-        parts = re.split(r"[,，、;；/|｜\n\r\t]+", cleaned)
-        terms: List[str] = []
-        seen = set()
-
-        def add(raw: str) -> None:
-            term = self._normalize_term(raw)
-            if not term or term in seen:
-                return
-            seen.add(term)
-            terms.append(term)
+    def _term_entries(self, term: str) -> List[_LexiconEntry]:
+        return [self._entries[entry_id] for entry_id in self._term_candidates.get(term, ())]
 
-        for part in parts:
-            add(part)
-            normalized = self._normalize_term(part)
-            if not normalized:
-                continue
-            if normalized.startswith("表") and len(normalized) > 2:
-                add(normalized[1:])
-            if normalized.endswith("的") and len(normalized) > 1:
-                add(normalized[:-1])
-        return terms
+    def _extract_terms(self, explanation: str) -> List[str]:
+        return extract_chinese_terms(explanation)
 
     def _normalize_term(self, raw: str) -> str:
-        term = str(raw or "").strip()
-        term = re.sub(r"[\"'“”‘’《》<>【】\[\]{}（）()]", "", term)
-        term = re.sub(r"\s+", "", term)
-        term = term.strip("。.!?？：:；;，,、")
-        if not term or not _CJK_RE.search(term):
-            return ""
-        if term in {"不译", "未找到释义"}:
-            return ""
-        if len(term) > 12:
-            return ""
-        return term
+        return normalize_chinese_term(raw)
 
     def _translate_zh_to_alician(self, text: str, direction: str) -> Dict[str, Any]:
         tokens: List[Dict[str, Any]] = []
@@ -343,8 +869,8 @@ class TranslationService:
             entry = self._best_word_entry(target_word)
             if not entry:
                 continue
-            token["target"] = entry["target"]
-            token["explanation"] = entry["explanation"]
+            token["target"] = entry.target
+            token["explanation"] = entry.explanation
             token["word_class"] = "adv."
             token["method"] = "grammar_function"
             token["confidence"] = 1.0
@@ -475,10 +1001,10 @@ class TranslationService:
         """Use attested sentence patterns to resolve ambiguous Chinese terms."""
         if len(tokens) < 3 or len(tokens) > 8:
             return tokens
-        option_rows: List[List[Optional[Dict[str, Any]]]] = []
+        option_rows: List[List[Optional[_LexiconEntry]]] = []
         for token in tokens:
             source = str(token.get("source") or "")
-            candidates = self._term_candidates.get(source) or []
+            candidates = self._term_entries(source)
             current_family = self._pos_family(str(token.get("word_class") or ""))
             if (
                 token.get("status") != "exact" or not candidates
@@ -487,29 +1013,29 @@ class TranslationService:
             ):
                 option_rows.append([None])
                 continue
-            by_family: Dict[str, Dict[str, Any]] = {}
+            by_family: Dict[str, _LexiconEntry] = {}
             for entry in candidates:
-                family = self._pos_family(entry.get("word_class", ""))
+                family = self._pos_family(entry.word_class)
                 current = by_family.get(family)
                 if current is None or self._sense_base_score(entry) > self._sense_base_score(current):
                     by_family[family] = entry
             option_rows.append(list(by_family.values())[:4] or [None])
 
-        beams: List[Tuple[float, List[Optional[Dict[str, Any]]], List[str]]] = [(0.0, [], [])]
+        beams: List[Tuple[float, List[Optional[_LexiconEntry]], List[str]]] = [(0.0, [], [])]
         for token, options in zip(tokens, option_rows):
-            expanded: List[Tuple[float, List[Optional[Dict[str, Any]]], List[str]]] = []
+            expanded: List[Tuple[float, List[Optional[_LexiconEntry]], List[str]]] = []
             for score, selected, families in beams:
                 for entry in options:
                     if entry is None:
                         family = self._pos_family(str(token.get("word_class") or ""))
                         entry_score = 0.0
                     else:
-                        family = self._pos_family(entry.get("word_class", ""))
+                        family = self._pos_family(entry.word_class)
                         entry_score = self._sense_base_score(entry) * 0.25
                     expanded.append((score + entry_score, selected + [entry], families + [family]))
             beams = sorted(expanded, key=lambda item: item[0], reverse=True)[:128]
 
-        best: Optional[Tuple[float, List[Optional[Dict[str, Any]]], List[str]]] = None
+        best: Optional[Tuple[float, List[Optional[_LexiconEntry]], List[str]]] = None
         for base_score, selected, families in beams:
             if families.count("v") != 1 or not any(
                 family in {"n", "pron"} for family in families
@@ -533,13 +1059,13 @@ class TranslationService:
         resolved: List[Dict[str, Any]] = []
         for token, entry in zip(tokens, selected):
             if entry is None or (
-                token.get("target") == entry.get("target")
-                and token.get("word_class") == entry.get("word_class")
+                token.get("target") == entry.target
+                and token.get("word_class") == entry.word_class
             ):
                 resolved.append(token)
                 continue
             replacement = self._entry_to_token(str(token.get("source") or ""), entry, "exact")
-            alternatives = self._term_candidates.get(str(token.get("source") or "")) or []
+            alternatives = self._term_entries(str(token.get("source") or ""))
             replacement["alternatives"] = [self._alternative(item, 1.0 if item is entry else 0.0) for item in alternatives]
             replacement["method"] = "sentence_pattern_sense"
             replacement["note"] = "已依据数据库句子范式选择当前词性和义项。"
@@ -642,38 +1168,38 @@ class TranslationService:
 
     def _translate_chinese_run(self, text: str) -> List[Dict[str, Any]]:
         tokens: List[Dict[str, Any]] = []
+        longest = self._term_automaton.longest_matches(text)
         i = 0
         while i < len(text):
-            match = self._find_longest_term(text, i)
+            matched_term = text[i:i + longest[i]]
             negative = self._negative_form_at(text, i)
             # Preserve longer complete lexical entries such as “无数”; otherwise
             # consume the whole negative phrase before character-level matching.
-            matched_term = match[0] if match else ""
             if negative and len(negative) >= len(matched_term):
                 tokens.append(self._grammar_function_token(negative, "Nai"))
                 i += len(negative)
                 continue
-            if match:
-                term, candidates = match
-                tokens.append(self._entry_to_token(term, self._choose_candidate(candidates, term), "exact"))
-                i += len(term)
+            if matched_term:
+                candidates = self._term_entries(matched_term)
+                tokens.append(self._entry_to_token(
+                    matched_term, self._choose_candidate(candidates, matched_term), "exact",
+                ))
+                i += len(matched_term)
                 continue
 
             start = i
             i += 1
-            while i < len(text) and self._find_longest_term(text, i) is None:
+            while i < len(text) and not longest[i]:
                 i += 1
             tokens.extend(self._translate_unknown_chinese_segment(text[start:i], allow_jieba=True))
         return tokens
 
-    def _find_longest_term(self, text: str, start: int) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
-        max_len = min(self._max_term_len, len(text) - start)
-        for size in range(max_len, 0, -1):
-            term = text[start:start + size]
-            candidates = self._term_candidates.get(term)
-            if candidates:
-                return term, candidates
-        return None
+    def _find_longest_term(self, text: str, start: int) -> Optional[Tuple[str, List[_LexiconEntry]]]:
+        size = self._term_automaton.longest_at(text, start)
+        if not size:
+            return None
+        term = text[start:start + size]
+        return term, self._term_entries(term)
 
     def _translate_unknown_chinese_segment(
         self, segment: str, allow_jieba: bool,
@@ -689,7 +1215,7 @@ class TranslationService:
             if len(parts) > 1 and "".join(parts) == segment:
                 split_tokens: List[Dict[str, Any]] = []
                 for part in parts:
-                    exact = self._term_candidates.get(part)
+                    exact = self._term_entries(part)
                     if exact:
                         split_tokens.append(self._entry_to_token(part, self._choose_candidate(exact, part), "exact"))
                     else:
@@ -718,13 +1244,14 @@ class TranslationService:
 
     def _find_chinese_candidate(
         self, query: str,
-    ) -> Tuple[Optional[Dict[str, Any]], str, float, List[Dict[str, Any]]]:
-        scored: List[Tuple[float, Dict[str, Any]]] = []
+    ) -> Tuple[Optional[_LexiconEntry], str, float, List[Dict[str, Any]]]:
+        scored: List[Tuple[float, _LexiconEntry]] = []
         query_set = set(query)
-        for entry in self._entries:
+        for entry_id in self._chinese_candidate_ids(query_set):
+            entry = self._entries[entry_id]
             score = 0.0
-            explanation = entry["explanation"]
-            terms = entry.get("terms", set())
+            explanation = entry.explanation
+            terms = entry.terms
             if query in terms:
                 score = max(score, 95.0)
             if explanation == query:
@@ -741,14 +1268,14 @@ class TranslationService:
                     coverage = len(query) / max(len(term), 1)
                     score = max(score, 28.0 + coverage * 28.0)
             if score <= 0 and len(query) >= 2 and query_set:
-                exp_chars = {ch for ch in explanation if _CJK_RE.match(ch)}
+                exp_chars = self._entry_cjk_chars[entry_id]
                 if exp_chars:
                     overlap = len(query_set & exp_chars) / max(len(query_set), 1)
                     if overlap >= 0.6:
                         score = 22.0 + overlap * 18.0
             if score > 0:
-                score += min(entry["count"], 20) * 0.08 + min(entry["variety"], 10) * 0.12
-                if entry["kind"] == "phrase" and len(query) >= 2:
+                score += min(entry.count, 20) * 0.08 + min(entry.variety, 10) * 0.12
+                if entry.kind == "phrase" and len(query) >= 2:
                     score += 3.0
                 scored.append((score, entry))
         scored.sort(key=lambda item: item[0], reverse=True)
@@ -771,9 +1298,23 @@ class TranslationService:
             return semantic
         return None, "missing", 0.0, []
 
+    def _chinese_candidate_ids(self, query_set: set) -> Iterable[int]:
+        """Entries sharing a character with the query, in lexicon order.
+
+        Every rule in _find_chinese_candidate needs a shared character (a term
+        or explanation containing the query, a term inside it, or CJK overlap),
+        so nothing else can score. Bigrams would miss the overlap rule.
+        """
+        if not query_set:
+            return range(len(self._entries))
+        ids = set()
+        for char in query_set:
+            ids.update(self._char_index.get(char, ()))
+        return sorted(ids)
+
     def _find_semantic_candidate(
         self, query: str,
-    ) -> Tuple[Optional[Dict[str, Any]], str, float, List[Dict[str, Any]]]:
+    ) -> Tuple[Optional[_LexiconEntry], str, float, List[Dict[str, Any]]]:
         alternatives = self._collect_semantic_alternatives(query, 5)
         if alternatives:
             entry = self._best_word_entry(str(alternatives[0].get("target", "")))
@@ -795,7 +1336,7 @@ class TranslationService:
                 entry = self._best_word_entry(str(word))
                 if not entry:
                     continue
-                if any(item.get("target") == entry["target"] for item in alternatives):
+                if any(item.get("target") == entry.target for item in alternatives):
                     continue
                 alternatives.append(self._alternative(entry, score))
                 if len(alternatives) >= limit:
@@ -804,23 +1345,49 @@ class TranslationService:
                 break
         return alternatives
 
+    def defer_similarity_index(self) -> None:
+        """Stop translations from building the index; warm_up_similarity_index will."""
+        with self._lock:
+            if not self._similarity_index_built:
+                self._similarity_warming = True
+
+    def warm_up_similarity_index(self) -> bool:
+        """Build the semantic index without holding the translation lock (any thread)."""
+        with self._lock:
+            matcher = self._similarity_matcher
+            if self._similarity_index_built:
+                self._similarity_warming = False
+                return matcher.available
+            self._similarity_warming = True
+            pairs = [(entry.target, entry.explanation) for entry in self._word_entries]
+        try:
+            matcher.build_index(pairs, **configured_index_options())
+        finally:
+            with self._lock:
+                self._similarity_warming = False
+                # A reload meanwhile replaced the matcher; it builds lazily.
+                if matcher is self._similarity_matcher:
+                    self._similarity_index_built = True
+        return matcher.available
+
     def _ensure_similarity_index(self) -> None:
-        if self._similarity_index_built:
+        # While warming up, unknown segments go without semantic candidates.
+        if self._similarity_index_built or self._similarity_warming:
             return
-        pairs = [(entry["target"], entry["explanation"]) for entry in self._word_entries]
-        self._similarity_matcher.build_index(pairs)
+        pairs = [(entry.target, entry.explanation) for entry in self._word_entries]
+        self._similarity_matcher.build_index(pairs, **configured_index_options())
         self._similarity_index_built = True
 
-    def _choose_candidate(self, candidates: List[Dict[str, Any]], query: str) -> Dict[str, Any]:
+    def _choose_candidate(self, candidates: List[_LexiconEntry], query: str) -> _LexiconEntry:
         ranked = sorted(
             candidates,
             key=lambda entry: (
-                query in entry.get("terms", set()),
-                entry["explanation"] == query,
-                entry["kind"] == "phrase",
-                entry["count"],
-                entry["variety"],
-                -len(entry["target"]),
+                query in entry.terms,
+                entry.explanation == query,
+                entry.kind == "phrase",
+                entry.count,
+                entry.variety,
+                -len(entry.target),
             ),
             reverse=True,
         )
@@ -844,7 +1411,7 @@ class TranslationService:
 
             phrase, end_index = self._match_phrase(parts, i)
             if phrase:
-                tokens.append(self._entry_to_chinese_token(phrase, phrase["target"], "exact", "phrase"))
+                tokens.append(self._entry_to_chinese_token(phrase, phrase.target, "exact", "phrase"))
                 i = end_index
                 continue
 
@@ -869,7 +1436,7 @@ class TranslationService:
             if similar_entry:
                 token = self._entry_to_chinese_token(similar_entry, part, "approximate", "spelling_similarity")
                 token["confidence"] = round(score, 4)
-                token["note"] = f"未找到精确词条，按拼写相似匹配到 {similar_entry['target']}。"
+                token["note"] = f"未找到精确词条，按拼写相似匹配到 {similar_entry.target}。"
                 token["alternatives"] = [self._alternative(similar_entry, score)]
                 tokens.append(token)
                 i += 1
@@ -902,57 +1469,54 @@ class TranslationService:
 
     def _match_phrase(
         self, parts: List[str], start: int,
-    ) -> Tuple[Optional[Dict[str, Any]], int]:
-        for phrase in self._phrases:
-            words = phrase.get("phrase_words") or []
-            pos = start
-            matched = True
-            for expected in words:
-                while pos < len(parts) and parts[pos].isspace():
-                    pos += 1
-                if pos >= len(parts) or parts[pos].lower() != expected:
-                    matched = False
-                    break
+    ) -> Tuple[Optional[_LexiconEntry], int]:
+        """Return the phrase with the most words starting at parts[start]."""
+        best: Tuple[Optional[_LexiconEntry], int] = (None, start)
+        node = self._phrase_trie
+        pos = start
+        while True:
+            while pos < len(parts) and parts[pos].isspace():
                 pos += 1
-            if matched:
-                return phrase, pos
-        return None, start
+            if pos >= len(parts):
+                break
+            node = node.get(parts[pos].lower())
+            if node is None:
+                break
+            pos += 1
+            if None in node:
+                best = (node[None], pos)
+        return best
 
-    def _best_word_entry(self, word: str) -> Optional[Dict[str, Any]]:
-        candidates = self._word_by_lower.get(str(word or "").lower()) or []
-        if not candidates:
-            return None
-        return sorted(
-            candidates,
-            key=lambda entry: (entry.get("sense_order", 1), -entry["count"], -entry["variety"]),
-        )[0]
+    def _best_word_entry(self, word: str) -> Optional[_LexiconEntry]:
+        return self._best_by_lower.get(str(word or "").lower())
 
     @staticmethod
+    @lru_cache(maxsize=4096)
     def _template_arity(explanation: str) -> int:
         return len(_TEMPLATE_SLOT_RE.findall(str(explanation or "")))
 
     def _sentence_template_entry(
         self, parts: List[str], start: int, word: str,
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Optional[_LexiconEntry]:
         """Prefer a template sense only when its following argument slots exist."""
-        candidates = self._word_by_lower.get(str(word or "").lower()) or []
-        templates = [entry for entry in candidates if self._template_arity(entry["explanation"]) > 0]
+        templates = self._templates_by_lower.get(str(word or "").lower())
         if not templates:
             return None
+        # Only count as many following words as the widest template can use.
+        needed = max(arity for arity, _ in templates)
         following_words = 0
         for part in parts[start + 1:]:
+            if following_words >= needed:
+                break
             if part.isspace():
                 continue
             if not re.fullmatch(r"[A-Za-z][A-Za-z'-]*", part):
                 break
             following_words += 1
-        eligible = [
-            entry for entry in templates
-            if self._template_arity(entry["explanation"]) <= following_words
-        ]
-        if not eligible:
-            return None
-        return min(eligible, key=lambda entry: entry.get("sense_order", 1))
+        for arity, entry in templates:
+            if arity <= following_words:
+                return entry
+        return None
 
     @staticmethod
     def _pos_family(word_class: str) -> str:
@@ -984,15 +1548,14 @@ class TranslationService:
             return 0.0
         return -0.05
 
-    def _sense_base_score(self, entry: Dict[str, Any]) -> float:
-        order = max(1, int(entry.get("sense_order") or 1))
-        frequency = math.log1p(max(0, entry.get("count", 0))) * 0.02
-        return frequency - (order - 1) * 0.18
+    def _sense_base_score(self, entry: _LexiconEntry) -> float:
+        frequency = math.log1p(max(0, entry.count)) * 0.02
+        return frequency - (entry.sense_order - 1) * 0.18
 
-    def _select_contextual_senses(self, parts: List[str]) -> Dict[int, Dict[str, Any]]:
+    def _select_contextual_senses(self, parts: List[str]) -> Dict[int, _LexiconEntry]:
         """Choose one sense per recognized word using sentence-level POS scoring."""
-        selected: Dict[int, Dict[str, Any]] = {}
-        segment: List[Tuple[int, List[Dict[str, Any]]]] = []
+        selected: Dict[int, _LexiconEntry] = {}
+        segment: List[Tuple[int, List[_LexiconEntry]]] = []
 
         def solve() -> None:
             if not segment:
@@ -1011,7 +1574,7 @@ class TranslationService:
                     previous_candidates = segment[position - 1][1]
                     options = [
                         scores[position - 1][j] + self._pos_transition_score(
-                            previous["word_class"], candidate["word_class"]
+                            previous.word_class, candidate.word_class
                         )
                         for j, previous in enumerate(previous_candidates)
                     ]
@@ -1041,20 +1604,44 @@ class TranslationService:
         solve()
         return selected
 
-    def _find_similar_alician_word(self, word: str) -> Tuple[Optional[Dict[str, Any]], float]:
-        best_entry = None
-        best_score = 0.0
+    def _find_similar_alician_word(self, word: str) -> Tuple[Optional[_LexiconEntry], float]:
         query = str(word or "").lower()
         if not query:
             return None, 0.0
-        for entry in self._word_entries:
-            score = _lev_ratio(query, entry["target"].lower())
-            if score > best_score:
-                best_score = score
-                best_entry = entry
-        if best_entry and best_score >= 0.72:
-            return best_entry, best_score
-        return None, 0.0
+        cached = self._similar_memo.get(query)
+        if cached is not None:
+            self._similar_memo.move_to_end(query)
+            return cached
+
+        # ratio() never exceeds 2 * min(len) / (len + len), so whole length
+        # buckets are skipped once they cannot reach the threshold or beat the
+        # current best. Ties keep the earliest loaded word, as a full scan would.
+        query_length = len(query)
+        bounds = sorted(
+            (
+                (2.0 * min(query_length, length) / (query_length + length), length)
+                for length in self._similar_by_length
+            ),
+            reverse=True,
+        )
+        best_entry = None
+        best_score = 0.0
+        best_position = -1
+        for bound, length in bounds:
+            if bound + 1e-9 < max(_SIMILAR_WORD_THRESHOLD, best_score):
+                break
+            for position, target, entry in self._similar_by_length[length]:
+                score = lev_ratio(query, target)
+                if score > best_score or (score == best_score and best_entry is not None and position < best_position):
+                    best_entry, best_score, best_position = entry, score, position
+
+        result: Tuple[Optional[_LexiconEntry], float] = (None, 0.0)
+        if best_entry and best_score >= _SIMILAR_WORD_THRESHOLD:
+            result = (best_entry, best_score)
+        self._similar_memo[query] = result
+        if len(self._similar_memo) > _SIMILAR_WORD_MEMO_SIZE:
+            self._similar_memo.popitem(last=False)
+        return result
 
     @staticmethod
     def _is_nominal_family(family: str) -> bool:
@@ -1188,35 +1775,35 @@ class TranslationService:
                 reordered.append(token)
         return reordered
 
-    def _entry_to_token(self, source: str, entry: Dict[str, Any], status: str) -> Dict[str, Any]:
+    def _entry_to_token(self, source: str, entry: _LexiconEntry, status: str) -> Dict[str, Any]:
         method = "dictionary_term" if status == "exact" else "meaning_overlap"
         return self._token(
             source=source,
-            target=entry["target"],
+            target=entry.target,
             status=status,
             method=method,
             confidence=1.0 if status == "exact" else 0.7,
-            explanation=entry["explanation"],
-            word_class=entry["word_class"],
-            count=entry["count"],
-            variety=entry["variety"],
+            explanation=entry.explanation,
+            word_class=entry.word_class,
+            count=entry.count,
+            variety=entry.variety,
             alternatives=[self._alternative(entry, 1.0)],
             note="词典释义直接命中。" if status == "exact" else "",
         )
 
     def _entry_to_chinese_token(
-        self, entry: Dict[str, Any], source: str, status: str, method: str,
+        self, entry: _LexiconEntry, source: str, status: str, method: str,
     ) -> Dict[str, Any]:
         return self._token(
             source=source,
-            target=entry["explanation"] or f"〔{source}〕",
+            target=entry.explanation or f"〔{source}〕",
             status=status,
             method=method,
             confidence=1.0 if status == "exact" else 0.7,
-            explanation=entry["explanation"],
-            word_class=entry["word_class"],
-            count=entry["count"],
-            variety=entry["variety"],
+            explanation=entry.explanation,
+            word_class=entry.word_class,
+            count=entry.count,
+            variety=entry.variety,
             alternatives=[self._alternative(entry, 1.0)],
             note="词典词条命中。" if status == "exact" else "",
         )
@@ -1255,11 +1842,11 @@ class TranslationService:
     def _punct_token(self, source: str) -> Dict[str, Any]:
         return self._token(source, source, "punct", "punct", 1.0)
 
-    def _alternative(self, entry: Dict[str, Any], score: float) -> Dict[str, Any]:
+    def _alternative(self, entry: _LexiconEntry, score: float) -> Dict[str, Any]:
         return {
-            "target": entry["target"],
-            "explanation": entry["explanation"],
-            "word_class": entry["word_class"],
+            "target": entry.target,
+            "explanation": entry.explanation,
+            "word_class": entry.word_class,
             "score": round(float(score), 4),
         }
 
@@ -1305,15 +1892,15 @@ class TranslationService:
             preferred_families = {"n", "pron", "num"}
         preferred = [
             entry for entry in candidates
-            if self._pos_family(entry.get("word_class", "")) in preferred_families
+            if self._pos_family(entry.word_class) in preferred_families
         ]
         chosen = min(
             preferred or candidates,
-            key=lambda entry: (entry.get("sense_order", 1), -entry.get("count", 0)),
+            key=lambda entry: (entry.sense_order, -entry.count),
         )
-        token["template_resolved_target"] = chosen["explanation"]
-        token["template_resolved_class"] = chosen["word_class"]
-        return str(chosen["explanation"] or token.get("target") or "")
+        token["template_resolved_target"] = chosen.explanation
+        token["template_resolved_class"] = chosen.word_class
+        return str(chosen.explanation or token.get("target") or "")
 
     def _compose_chinese_result(
         self, tokens: List[Dict[str, Any]], resolve_templates: bool = False,
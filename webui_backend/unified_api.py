@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import datetime
+import json
 import os
 import sys
 import threading
 import queue
+import uuid
 import tkinter as tk
 from tkinter import filedialog
 from pathlib import Path
@@ -16,6 +18,7 @@ from webui_backend.build_mode import feature_flags, is_lite_build
 from webui_backend.dictionary_service import DictionaryService
 from webui_backend.writing_service import WritingAssistantService
 from webui_backend.dbmanager_service import DatabaseManagerService
+from webui_backend.semantic_warmup import SemanticWarmup
 from webui_backend.dictionary_core import DictionaryConfig, HistoryManager
 from webui_backend.writing_config import ConfigManager
 
@@ -52,13 +55,19 @@ class UnifiedAPI:
         self._main_window = None
         self._detached_windows: Dict[str, Any] = {}
         self._closed = False
+        # Only the newest document translation streams; older jobs stop early.
+        self._translator_job: Any = None
         self._dictionary_service: Any = None
         self._writing_service: Any = None
         self._translation_service: Any = None
         self._dbmanager_service: Any = None
+        # Loads the text2vec model once the UI is up, off the worker thread.
+        self._semantic_warmup = SemanticWarmup(self._features["semantic_search"])
         _Event = threading.Event
         self._tasks: "queue.Queue[Optional[Tuple[Any, Tuple[Any, ...], Dict[str, Any], Dict[str, Any], _Event]]]" = queue.Queue()
         self._worker_ready = threading.Event()
+        # At most one autocomplete version check waits on the worker.
+        self._autocomplete_refresh_queued = threading.Event()
         self._worker_failed: Optional[BaseException] = None
         self._worker_thread = threading.Thread(
             target=self._worker_loop, name="UnifiedWebUIWorker", daemon=True)
@@ -149,6 +158,23 @@ class UnifiedAPI:
             raise RuntimeError(str(box["error"])) from box["error"]
         return box.get("value")
 
+    def _post(self, func: Any, *args: Any, **kwargs: Any) -> bool:
+        """Queue a task on the worker without waiting for its result."""
+        if self._closed or not self._worker_ready.is_set() or self._worker_failed is not None:
+            return False
+        self._tasks.put((func, args, kwargs, {}, threading.Event()))
+        return True
+
+    def _mark_database_changed(self) -> None:
+        # Writes from the DB manager use their own connection; drop dictionary
+        # results right away instead of waiting for PRAGMA data_version.
+        service = self._dictionary_service
+        if service is not None:
+            service.invalidate_cache()
+            self._post(service.refresh_autocomplete)
+        if self._app_settings is not None:
+            self._app_settings.mark_local_database_changed()
+
     def set_main_window(self, window: Any) -> None:
         self._main_window = window
 
@@ -163,14 +189,21 @@ class UnifiedAPI:
             dictionary_history = []
         app_settings = self._app_settings.get_public_settings() if self._app_settings is not None else {
             "auto_update": True, "auto_update_status": ""}
+        self._semantic_warmup.start(self._worker_ready, self._semantic_services)
         return {
             "initial_tab": self.initial_tab, "startup_query": self.startup_query,
             "startup_exact": self.startup_exact, "dictionary_history": dictionary_history,
             "writing_settings": writing_settings, "writing_status": "后台服务正在加载...",
             "app_settings": app_settings,
             "features": dict(self._features),
+            "semantic_status": self._semantic_warmup.status(),
         }
 
+    def _semantic_services(self) -> List[Any]:
+        if self._closed or self._worker_failed is not None:
+            return []
+        return [self._dictionary_service, self._translation_service]
+
     def detach_native_window(self, app_id: str, x: Optional[int] = None,
                              y: Optional[int] = None) -> Dict[str, Any]:
         app = app_id if app_id in VALID_TABS else ""
@@ -266,10 +299,35 @@ class UnifiedAPI:
     def dictionary_examples(self, word: str, position_filter: str = "any") -> Dict[str, Any]:
         return self._invoke(lambda: self._dictionary_service.get_examples(word, position_filter))
 
+    def dictionary_song_lyric(self, song_id: int) -> Dict[str, Any]:
+        return self._invoke(lambda: self._dictionary_service.get_song_lyric(song_id))
+
+    def dictionary_autocomplete(self, prefix: str, limit: int = 10) -> Dict[str, Any]:
+        # Served from an immutable in-memory index on the calling thread so it
+        # never queues behind a slow translation on the worker.
+        service = self._dictionary_service
+        if service is None:
+            return {"ok": False, "prefix": str(prefix or ""), "items": []}
+        # Commits from other processes are only visible through SQLite, so let
+        # the worker check the version; later keystrokes see the new index.
+        if not self._autocomplete_refresh_queued.is_set():
+            self._autocomplete_refresh_queued.set()
+            if not self._post(self._refresh_autocomplete):
+                self._autocomplete_refresh_queued.clear()
+        return service.autocomplete(prefix, limit)
+
+    def _refresh_autocomplete(self) -> None:
+        self._autocomplete_refresh_queued.clear()
+        if self._dictionary_service is not None:
+            self._dictionary_service.refresh_autocomplete()
+
+    def dictionary_cache_stats(self) -> Dict[str, int]:
+        return self._invoke(lambda: self._dictionary_service.cache_stats())
+
     def dictionary_update_lyric(self, title: str, album: str, lyric: str) -> Dict[str, Any]:
         ret = self._invoke(lambda: self._dictionary_service.update_song_lyric(title, album, lyric))
-        if ret and ret.get("ok") and self._app_settings is not None:
-            self._app_settings.mark_local_database_changed()
+        if ret and ret.get("ok"):
+            self._mark_database_changed()
         return ret
 
     def writing_check_text(self, text: str) -> Dict[str, Any]:
@@ -300,6 +358,93 @@ class UnifiedAPI:
             }
         return self._invoke(lambda: self._translation_service.translate(text, direction))
 
+    def translator_translate_batch(self, texts: List[str], direction: str = "auto") -> Dict[str, Any]:
+        if not self._features["translator"]:
+            return {"ok": False, "direction": direction or "auto", "results": [], "message": "轻量版不包含翻译器。"}
+        items = [str(text or "") for text in (texts or [])]
+        return self._invoke(lambda: self._translation_service.translate_batch(items, direction))
+
+    def translator_translate_document(self, text: str, direction: str = "auto", job_id: Any = None) -> Dict[str, Any]:
+        """Translate sentence by sentence, streaming each result to the translator window.
+
+        Every sentence is its own worker task, so dictionary lookups queued
+        meanwhile are not held up behind a long document. Progress arrives in
+        window.__translatorDocumentProgress({job_id, index, total, result, ...})
+        followed by a {job_id, done: true} event. job_id is generated when the
+        caller gives none. A newer job stops the previous one, which gets a
+        {job_id, done: true, cancelled: true} event if it was still running.
+        """
+        if job_id is None or job_id == "":
+            job_id = f"doc-{uuid.uuid4().hex}"
+        if not self._features["translator"]:
+            return {"ok": False, "job_id": job_id, "message": "轻量版不包含翻译器。"}
+        with self._lock:
+            previous, self._translator_job = self._translator_job, job_id
+            window = self._detached_windows.get("translator") or self._main_window
+        if previous is not None and previous != job_id:
+            self._notify_translator(window, {"job_id": previous, "done": True, "cancelled": True})
+
+        def finish(payload: Dict[str, Any]) -> None:
+            with self._lock:
+                if self._translator_job != job_id:
+                    return
+                self._translator_job = None
+            self._notify_translator(window, payload)
+
+        def step(items: Any) -> None:
+            if job_id != self._translator_job:
+                return
+            try:
+                item = next(items)
+            except StopIteration:
+                finish({"job_id": job_id, "done": True})
+                return
+            except Exception as exc:
+                finish({"job_id": job_id, "done": True, "error": str(exc)})
+                return
+            self._notify_translator(window, dict(item, job_id=job_id))
+            if not self._post(step, items):
+                finish({"job_id": job_id, "done": True, "error": "翻译服务已关闭。"})
+
+        def start() -> Dict[str, Any]:
+            items = iter(self._translation_service.iter_document(text, direction))
+            if not self._post(step, items):
+                with self._lock:
+                    if self._translator_job == job_id:
+                        self._translator_job = None
+                return {"ok": False, "job_id": job_id, "message": "翻译服务已关闭。"}
+            return {"ok": True, "job_id": job_id}
+
+        return self._invoke(start)
+
+    def _notify_translator(self, window: Any, payload: Dict[str, Any]) -> None:
+        if window is None:
+            return
+        try:
+            window.evaluate_js(
+                "window.__translatorDocumentProgress && "
+                f"window.__translatorDocumentProgress({json.dumps(payload)});"
+            )
+        except Exception:
+            pass
+
+    def translator_status(self) -> Dict[str, Any]:
+        # Read directly: the readiness flag is an Event owned by the service.
+        if not self._features["translator"]:
+            return {"ok": False, "patterns_ready": False, "message": "轻量版不包含翻译器。"}
+        service = self._translation_service
+        if service is None:
+            return {"ok": False, "patterns_ready": False, "message": "翻译器正在加载..."}
+        return service.status()
+
+    def app_get_semantic_stats(self) -> Dict[str, Any]:
+        # The engine is shared by both services and guards itself.
+        if not self._features.get("semantic_search", False):
+            return {"ok": False, "message": "Lite 版不使用语义模型。"}
+        from webui_backend.similarity_matcher import get_semantic_engine
+
+        return {"ok": True, **get_semantic_engine().stats()}
+
     def app_get_settings(self) -> Dict[str, Any]:
         if self._app_settings is None:
             return {
@@ -307,8 +452,10 @@ class UnifiedAPI:
                 "alic_hover_enabled": True, "alic_hover_delay": 300,
                 "update_check_status": "就绪", "model_path": "",
                 "model_available": False, "model_status": "模型设置不可用。",
+                "semantic_status": self._semantic_warmup.status(),
             }
         public = self._app_settings.get_public_settings()
+        public["semantic_status"] = self._semantic_warmup.status()
         return public
 
     def app_save_settings(self, settings: Dict[str, Any]) -> Dict[str, Any]:
@@ -439,15 +586,15 @@ class UnifiedAPI:
 
     def dbmanager_add_record(self, table_name: str, values: Dict[str, str]) -> Dict[str, Any]:
         ret = self._invoke(lambda: self._dbmanager_service.add_record(table_name, values))
-        if ret and ret.get("ok") and self._app_settings is not None:
-            self._app_settings.mark_local_database_changed()
+        if ret and ret.get("ok"):
+            self._mark_database_changed()
         return ret
 
     def dbmanager_update_record(self, table_name: str, record_id: int,
                                 values: Dict[str, str]) -> Dict[str, Any]:
         ret = self._invoke(lambda: self._dbmanager_service.update_record(table_name, record_id, values))
-        if ret and ret.get("ok") and self._app_settings is not None:
-            self._app_settings.mark_local_database_changed()
+        if ret and ret.get("ok"):
+            self._mark_database_changed()
         return ret
 
     def dbmanager_batch_update(self, table_name: str, edits: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -465,14 +612,13 @@ class UnifiedAPI:
                     f.write("\n".join(lines) + "\n")
             except Exception:
                 pass
-            if self._app_settings is not None:
-                self._app_settings.mark_local_database_changed()
+            self._mark_database_changed()
         return ret
 
     def dbmanager_delete_records(self, table_name: str, ids: List[int]) -> Dict[str, Any]:
         ret = self._invoke(lambda: self._dbmanager_service.delete_records(table_name, ids))
-        if ret and ret.get("ok") and self._app_settings is not None:
-            self._app_settings.mark_local_database_changed()
+        if ret and ret.get("ok"):
+            self._mark_database_changed()
         return ret
 
     def dbmanager_global_search(self, keyword: str,
@@ -482,8 +628,8 @@ class UnifiedAPI:
     def dbmanager_global_replace(self, keyword: str, replacement: str,
                                  match_records: List[Dict[str, Any]]) -> Dict[str, Any]:
         ret = self._invoke(lambda: self._dbmanager_service.global_replace(keyword, replacement, match_records))
-        if ret and ret.get("ok") and self._app_settings is not None:
-            self._app_settings.mark_local_database_changed()
+        if ret and ret.get("ok"):
+            self._mark_database_changed()
         return ret
 
     def _update_word_count_impl(self) -> Dict[str, Any]:
@@ -497,8 +643,8 @@ class UnifiedAPI:
 
     def dbmanager_update_word_count(self) -> Dict[str, Any]:
         ret = self._invoke(self._update_word_count_impl)
-        if ret and ret.get("ok") and self._app_settings is not None:
-            self._app_settings.mark_local_database_changed()
+        if ret and ret.get("ok"):
+            self._mark_database_changed()
         return ret
 
     def _classify_words_impl(self) -> Dict[str, Any]:
@@ -512,8 +658,8 @@ class UnifiedAPI:
 
     def dbmanager_classify_words(self) -> Dict[str, Any]:
         ret = self._invoke(self._classify_words_impl)
-        if ret and ret.get("ok") and self._app_settings is not None:
-            self._app_settings.mark_local_database_changed()
+        if ret and ret.get("ok"):
+            self._mark_database_changed()
         return ret
 
     def dbmanager_export_db(self) -> Dict[str, Any]:
@@ -565,10 +711,14 @@ class UnifiedAPI:
             if self._closed:
                 return
             self._closed = True
+        service = self._dictionary_service
         try:
             if self._worker_thread.is_alive():
                 self._tasks.put(None)
                 self._worker_thread.join(timeout=8)
         finally:
-            pass
+            # The worker flushes on close; this covers a worker stuck past the
+            # join timeout. flush() is a no-op once nothing is pending.
+            if service is not None:
+                service.history_manager.flush()
 
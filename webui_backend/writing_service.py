@@ -4,7 +4,7 @@ import re
 import threading
 from typing import Any, Dict, List, Optional, Tuple
 
-from webui_backend.dictionary_service import _lev_ratio
+from webui_backend.search_utils import lev_ratio
 from webui_backend.writing_config import ConfigManager
 from webui_backend.writing_database import DatabaseManager
 from webui_backend.writing_highlight import HighlightManager
@@ -229,7 +229,7 @@ class WritingAssistantService:
                 explanations[word] = {"part_of_speech": "", "explanation": "未找到释义"}
                 best_match, best_score = None, 0.0
                 for dict_word in all_words:
-                    score = _lev_ratio(word, dict_word) if strict_case else _lev_ratio(word.lower(), dict_word.lower())
+                    score = lev_ratio(word, dict_word) if strict_case else lev_ratio(word.lower(), dict_word.lower())
                     if score > best_score and score > 0.6:
                         best_score, best_match = score, dict_word
                 if best_match: